@@ -4,11 +4,139 @@ from flask_login import LoginManager, current_user
 from pathlib import Path
 from datetime import datetime, timezone
 from werkzeug.middleware.proxy_fix import ProxyFix
+import threading
+import time
 
 ROOT_DIR = Path(__file__).resolve().parent
 BASE_DIR = ROOT_DIR.parent
 
 
+# Periodically rebuilds the leaderboard snapshots. Every gunicorn worker runs
+# this loop, but claim_leaderboard_refresh() lets only one of them do the work
+# per interval. LEADERBOARD_REFRESH_SECONDS=0 disables it.
+def _start_leaderboard_refresher(app: Flask) -> None:
+    try:
+        interval = int(os.environ.get("LEADERBOARD_REFRESH_SECONDS") or "300")
+    except ValueError:
+        interval = 300
+    if interval <= 0:
+        return
+
+    from backend.database import claim_leaderboard_refresh, refresh_leaderboards
+
+    def _loop():
+        while True:
+            try:
+                if claim_leaderboard_refresh(interval):
+                    refresh_leaderboards()
+            except Exception:
+                app.logger.exception("Leaderboard refresh failed")
+            time.sleep(max(5, min(interval, 60)))
+
+    threading.Thread(target=_loop, name="leaderboard-refresher", daemon=True).start()
+
+
+# Resolves rating artwork queued by add/edit (see artwork_jobs). Jobs are
+# claimed atomically, so every gunicorn worker can run these threads.
+# ARTWORK_WORKERS=0 disables them.
+def _start_artwork_workers(app: Flask) -> None:
+    try:
+        count = int(os.environ.get("ARTWORK_WORKERS") or "1")
+    except ValueError:
+        count = 1
+    try:
+        poll_seconds = float(os.environ.get("ARTWORK_POLL_SECONDS") or "2")
+    except ValueError:
+        poll_seconds = 2.0
+    poll_seconds = max(0.2, min(60.0, poll_seconds))
+    if count <= 0:
+        return
+
+    from backend.database import claim_artwork_job, finish_artwork_job, get_indexed_artwork
+    from backend.routes import resolve_artwork_url
+
+    def _loop():
+        while True:
+            try:
+                job = claim_artwork_job()
+            except Exception:
+                app.logger.exception("Artwork job claim failed")
+                job = None
+            if job is None:
+                time.sleep(poll_seconds)
+                continue
+            error = None
+            try:
+                # Another rating of the same subject may have resolved it since.
+                image_url = get_indexed_artwork(job["mbid"]) or resolve_artwork_url(
+                    job["kind"], job["mbid"]
+                )
+            except Exception as exc:
+                app.logger.exception("Artwork job %s failed", job["job_id"])
+                image_url, error = None, f"{type(exc).__name__}: {exc}"[:500]
+            try:
+                finish_artwork_job(job, image_url, error)
+            except Exception:
+                app.logger.exception("Artwork job %s could not be recorded", job["job_id"])
+
+    for i in range(min(count, 8)):
+        threading.Thread(target=_loop, name=f"artwork-worker-{i}", daemon=True).start()
+
+
+# Copies remote rating artwork into UPLOAD_FOLDER and points ratings at the
+# local copy (see backend/artwork_mirror.py). URLs are claimed, so every
+# gunicorn worker can run it. ARTWORK_MIRROR_SECONDS=0 disables it.
+def _start_artwork_mirror(app: Flask) -> None:
+    try:
+        poll_seconds = float(os.environ.get("ARTWORK_MIRROR_SECONDS") or "10")
+    except ValueError:
+        poll_seconds = 10.0
+    if poll_seconds <= 0:
+        return
+    poll_seconds = max(1.0, min(3600.0, poll_seconds))
+
+    from backend.artwork_mirror import mirror_artwork
+    from backend.database import (
+        claim_unmirrored_artwork,
+        get_stale_mirrored_artwork,
+        record_artwork_mirror,
+        rewrite_rating_image_urls,
+    )
+
+    upload_folder = app.config["UPLOAD_FOLDER"]
+    url_prefix = app.config["UPLOAD_URL_PREFIX"]
+
+    def _loop():
+        while True:
+            # Ratings that picked up an already mirrored remote URL (artwork
+            # jobs, the backfill) are pointed at the local copy.
+            try:
+                for source_url, local_url in get_stale_mirrored_artwork():
+                    rewrite_rating_image_urls(source_url, local_url)
+            except Exception:
+                app.logger.exception("Artwork mirror rewrite failed")
+            try:
+                urls = claim_unmirrored_artwork(limit=10)
+            except Exception:
+                app.logger.exception("Artwork mirror claim failed")
+                urls = []
+            for url in urls:
+                try:
+                    mirrored = mirror_artwork(url, upload_folder, url_prefix)
+                    if mirrored is None:
+                        record_artwork_mirror(url, None)
+                        continue
+                    local_url, byte_count = mirrored
+                    record_artwork_mirror(url, local_url, byte_count)
+                    rewrite_rating_image_urls(url, local_url)
+                except Exception:
+                    app.logger.exception("Artwork mirror failed for %s", url)
+            if not urls:
+                time.sleep(poll_seconds)
+
+    threading.Thread(target=_loop, name="artwork-mirror", daemon=True).start()
+
+
 # Set up code for Flask
 def create_app():
     app = Flask(
@@ -50,10 +178,20 @@ def create_app():
 
     init_db()
 
+    from backend.database import backfill_counters, backfill_subject_trending
+
+    backfill_counters()
+    backfill_subject_trending()
+    _start_leaderboard_refresher(app)
+
     # Register routes with blueprint
     from backend.routes import app as routes_bp
 
     app.register_blueprint(routes_bp)
+    _start_artwork_workers(app)
+    _start_artwork_mirror(app)
+
+    from backend.artwork_mirror import artwork_variant
 
     # User model import
     from backend.database import (
@@ -82,6 +220,10 @@ def create_app():
             return redirect(ref)
         return redirect("/")
 
+    @app.context_processor
+    def inject_artwork_helpers():
+        return {"artwork_variant": artwork_variant}
+
     @app.context_processor
     def inject_auth_sidebar_state():
         return {
@@ -25,6 +25,86 @@ def get_db_connection():
     return sqlite3.connect(DB_PATH)
 
 
+def _subject_key_sql(prefix: str = "") -> str:
+    # Normalized subject identity for a ratings row (artists are grouped by
+    # name only). Shared by the rated_subjects triggers and database.py.
+    return f"""
+        LOWER(TRIM({prefix}rating_type)) || '|' || LOWER(TRIM({prefix}rating_name)) || '|' ||
+        CASE
+            WHEN LOWER(TRIM({prefix}rating_type)) = 'artist' THEN ''
+            ELSE LOWER(TRIM(COALESCE({prefix}content_info_artist, '')))
+        END
+    """
+
+
+def _ensure_fts_index(
+    cur,
+    fts_table: str,
+    content_table: str,
+    rowid_column: str,
+    columns: list[str],
+    tokenize: str = "unicode61 remove_diacritics 2",
+    prefix: str | None = "2 3",
+) -> bool:
+    """
+    Creates an external-content FTS5 index over `columns` of `content_table`,
+    plus the triggers that keep it in sync, and builds it from existing rows
+    the first time. Returns False when this SQLite build has no FTS5; callers
+    then fall back to LIKE scans.
+    """
+    cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (fts_table,),
+    )
+    existed = cur.fetchone() is not None
+
+    cols = ", ".join(columns)
+    new_cols = ", ".join(f"new.{c}" for c in columns)
+    old_cols = ", ".join(f"old.{c}" for c in columns)
+    options = f"tokenize='{tokenize}'" + (f", prefix='{prefix}'" if prefix else "")
+    try:
+        cur.execute(
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+            {cols},
+            content='{content_table}',
+            content_rowid='{rowid_column}',
+            {options}
+            )
+            """
+        )
+    except sqlite3.OperationalError:
+        return False
+
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {content_table} BEGIN
+            INSERT INTO {fts_table} (rowid, {cols}) VALUES (new.{rowid_column}, {new_cols});
+        END
+        """
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {content_table} BEGIN
+            INSERT INTO {fts_table} ({fts_table}, rowid, {cols})
+            VALUES ('delete', old.{rowid_column}, {old_cols});
+        END
+        """
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF {cols} ON {content_table} BEGIN
+            INSERT INTO {fts_table} ({fts_table}, rowid, {cols})
+            VALUES ('delete', old.{rowid_column}, {old_cols});
+            INSERT INTO {fts_table} (rowid, {cols}) VALUES (new.{rowid_column}, {new_cols});
+        END
+        """
+    )
+    if not existed:
+        cur.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+    return True
+
+
 # Database setup
 def init_db():
     conn = get_db_connection()
@@ -68,6 +148,151 @@ def init_db():
     _ensure_column("ratings", "image_url", "image_url TEXT")
     _ensure_column("ratings", "mbid", "mbid TEXT")
     _ensure_column("ratings", "mb_url", "mb_url TEXT")
+
+    # Full-text index for rating search; bm25 weights live in backend/search.py.
+    _ensure_fts_index(
+        cur,
+        "ratings_fts",
+        "ratings",
+        "rating_key",
+        [
+            "rating_name",
+            "content_info_artist",
+            "rating_type",
+            "user",
+            "lyrics_reason",
+            "beat_reason",
+            "flow_reason",
+            "melody_reason",
+            "cohesive_reason",
+        ],
+    )
+
+    # Distinct rated subjects with their rating counts, for charts autocomplete.
+    # Kept in sync with ratings by the triggers below; searched through a
+    # trigram index so substring matches don't scan ratings.
+    cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rated_subjects'"
+    )
+    rated_subjects_existed = cur.fetchone() is not None
+    if rated_subjects_existed:
+        # Older databases keyed rated_subjects by subject_key alone, so its FTS
+        # index pointed at the implicit rowid, which VACUUM may renumber. The
+        # table is derived from ratings; rebuild both.
+        cur.execute("PRAGMA table_info(rated_subjects)")
+        if "subject_id" not in {row[1] for row in cur.fetchall()}:
+            cur.execute("DROP TABLE IF EXISTS rated_subjects_fts")
+            cur.execute("DROP TABLE rated_subjects")
+            rated_subjects_existed = False
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS rated_subjects (
+        subject_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        subject_key TEXT NOT NULL UNIQUE,
+        kind TEXT NOT NULL,
+        rating_name TEXT NOT NULL,
+        content_artist TEXT NOT NULL DEFAULT '',
+        rating_count INTEGER NOT NULL DEFAULT 0,
+        mbid TEXT,
+        image_url TEXT
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_rated_subjects_kind_count
+        ON rated_subjects (kind, rating_count DESC, rating_name COLLATE NOCASE)
+        """
+    )
+
+    def _rated_subject_upsert(row: str) -> str:
+        return f"""
+            INSERT INTO rated_subjects (
+                subject_key, kind, rating_name, content_artist, rating_count, mbid, image_url
+            )
+            SELECT
+                {_subject_key_sql(row + ".")},
+                LOWER(TRIM({row}.rating_type)),
+                TRIM({row}.rating_name),
+                CASE
+                    WHEN LOWER(TRIM({row}.rating_type)) = 'artist' THEN ''
+                    ELSE TRIM(COALESCE({row}.content_info_artist, ''))
+                END,
+                1,
+                NULLIF(TRIM({row}.mbid), ''),
+                NULLIF(TRIM({row}.image_url), '')
+            WHERE TRIM(COALESCE({row}.rating_name, '')) != ''
+            ON CONFLICT(subject_key) DO UPDATE SET
+                rating_count = rating_count + 1,
+                mbid = COALESCE(excluded.mbid, mbid),
+                image_url = COALESCE(excluded.image_url, image_url);
+        """
+
+    def _rated_subject_release(row: str) -> str:
+        return f"""
+            UPDATE rated_subjects
+            SET rating_count = rating_count - 1
+            WHERE subject_key = {_subject_key_sql(row + ".")};
+            DELETE FROM rated_subjects
+            WHERE subject_key = {_subject_key_sql(row + ".")}
+              AND rating_count <= 0;
+        """
+
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS rated_subjects_ai AFTER INSERT ON ratings BEGIN
+            {_rated_subject_upsert("new")}
+        END
+        """
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS rated_subjects_ad AFTER DELETE ON ratings BEGIN
+            {_rated_subject_release("old")}
+        END
+        """
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS rated_subjects_au
+        AFTER UPDATE OF rating_type, rating_name, content_info_artist, mbid, image_url ON ratings
+        BEGIN
+            {_rated_subject_release("old")}
+            {_rated_subject_upsert("new")}
+        END
+        """
+    )
+    if not rated_subjects_existed:
+        cur.execute(
+            f"""
+            INSERT INTO rated_subjects (
+                subject_key, kind, rating_name, content_artist, rating_count, mbid, image_url
+            )
+            SELECT
+                {_subject_key_sql()} AS k,
+                LOWER(TRIM(MAX(rating_type))),
+                TRIM(MAX(rating_name)),
+                CASE
+                    WHEN LOWER(TRIM(MAX(rating_type))) = 'artist' THEN ''
+                    ELSE TRIM(COALESCE(MAX(content_info_artist), ''))
+                END,
+                COUNT(1),
+                MAX(NULLIF(TRIM(mbid), '')),
+                MAX(NULLIF(TRIM(image_url), ''))
+            FROM ratings
+            WHERE TRIM(COALESCE(rating_name, '')) != ''
+            GROUP BY k
+            """
+        )
+    _ensure_fts_index(
+        cur,
+        "rated_subjects_fts",
+        "rated_subjects",
+        "subject_id",
+        ["rating_name", "content_artist"],
+        tokenize="trigram",
+        prefix=None,
+    )
     cur.execute(
         """
         CREATE TABLE IF NOT EXISTS "album" (
@@ -343,6 +568,26 @@ def init_db():
     # Newer app versions expect an "about" field on user profiles.
     _ensure_column("user_info", "about", "about TEXT")
 
+    # Denormalized counters, kept up to date by the write helpers in database.py.
+    for counter in (
+        "rating_count",
+        "follower_count",
+        "following_count",
+        "likes_received_count",
+        "likes_given_count",
+        "playlist_count",
+    ):
+        _ensure_column("user_info", counter, f"{counter} INTEGER NOT NULL DEFAULT 0")
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS site_counters (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+
     cur.execute(
         """
         CREATE TABLE IF NOT EXISTS profile_comments (
@@ -385,6 +630,13 @@ def init_db():
         )
         """
     )
+    # A rating's activity, for taking its events back out of trending scores.
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_activity_entity_action
+        ON activity (entity_type, entity_id, action)
+        """
+    )
 
     cur.execute(
         """
@@ -397,6 +649,70 @@ def init_db():
         """
     )
 
+    # Exponentially decayed "hotness" per rated subject. score_log holds
+    # log(sum(weight * exp(decay_rate * event_time))), so ordering by it is the
+    # same as ordering by the current decayed score and never changes over time.
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS subject_trending (
+        subject_key TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        rating_name TEXT,
+        content_artist TEXT,
+        mbid TEXT,
+        image_url TEXT,
+        score_log REAL NOT NULL,
+        event_count INTEGER DEFAULT 0,
+        updated_at TEXT
+        )
+        """
+    )
+
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_subject_trending_kind_score
+        ON subject_trending (kind, score_log DESC)
+        """
+    )
+
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_subject_trending_score
+        ON subject_trending (score_log DESC)
+        """
+    )
+
+    # Leaderboard snapshots. Each refresh writes a new generation and then points
+    # leaderboard_meta at it, so readers always see a complete snapshot.
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS leaderboard_entries (
+        generation INTEGER NOT NULL,
+        board TEXT NOT NULL,
+        rank INTEGER NOT NULL,
+        entity_type TEXT,
+        entity_id INTEGER,
+        label TEXT,
+        sublabel TEXT,
+        image_url TEXT,
+        url TEXT,
+        value REAL,
+        value_count INTEGER,
+        PRIMARY KEY (generation, board, rank)
+        )
+        """
+    )
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS leaderboard_meta (
+        board TEXT PRIMARY KEY,
+        generation INTEGER NOT NULL,
+        refreshed_at TEXT
+        )
+        """
+    )
+
     cur.execute(
         """
         CREATE TABLE IF NOT EXISTS activity_clear (
@@ -408,5 +724,402 @@ def init_db():
         """
     )
 
+    # Structured browse filters (see backend/search.py). Per-rating like and
+    # vote counters are kept by the triggers below so "likes>10" and
+    # "percent>=80" don't aggregate rating_likes/rating_category_votes per row.
+    cur.execute("PRAGMA table_info(ratings)")
+    rating_columns = {row[1] for row in cur.fetchall()}
+    _ensure_column("ratings", "created_at", "created_at TEXT")
+    for counter in ("like_count", "vote_up_count", "vote_down_count"):
+        _ensure_column("ratings", counter, f"{counter} INTEGER NOT NULL DEFAULT 0")
+    if "created_at" not in rating_columns:
+        cur.execute(
+            """
+            UPDATE ratings
+            SET created_at = (
+                SELECT MIN(a.created_at)
+                FROM activity a
+                WHERE a.action = 'rating_create'
+                  AND a.entity_type = 'rating'
+                  AND a.entity_id = ratings.rating_key
+            )
+            """
+        )
+    if "like_count" not in rating_columns:
+        cur.execute(
+            """
+            UPDATE ratings
+            SET
+                like_count = (
+                    SELECT COUNT(1) FROM rating_likes rl WHERE rl.rating_key = ratings.rating_key
+                ),
+                vote_up_count = (
+                    SELECT COUNT(1) FROM rating_category_votes v
+                    WHERE v.rating_key = ratings.rating_key AND v.vote > 0
+                ),
+                vote_down_count = (
+                    SELECT COUNT(1) FROM rating_category_votes v
+                    WHERE v.rating_key = ratings.rating_key AND v.vote < 0
+                )
+            """
+        )
+    for suffix, event, delta in (("ai", "INSERT", "+ 1"), ("ad", "DELETE", "- 1")):
+        row = "new" if event == "INSERT" else "old"
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS rating_like_count_{suffix}
+            AFTER {event} ON rating_likes BEGIN
+                UPDATE ratings SET like_count = like_count {delta}
+                WHERE rating_key = {row}.rating_key;
+            END
+            """
+        )
+
+    def _vote_count_delta(row: str, sign: str) -> str:
+        return f"""
+            UPDATE ratings
+            SET vote_up_count = vote_up_count {sign} ({row}.vote > 0),
+                vote_down_count = vote_down_count {sign} ({row}.vote < 0)
+            WHERE rating_key = {row}.rating_key;
+        """
+
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS rating_vote_count_ai
+        AFTER INSERT ON rating_category_votes BEGIN
+            {_vote_count_delta("new", "+")}
+        END
+        """
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS rating_vote_count_ad
+        AFTER DELETE ON rating_category_votes BEGIN
+            {_vote_count_delta("old", "-")}
+        END
+        """
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS rating_vote_count_au
+        AFTER UPDATE OF vote, rating_key ON rating_category_votes BEGIN
+            {_vote_count_delta("old", "-")}
+            {_vote_count_delta("new", "+")}
+        END
+        """
+    )
+    for name, columns in (
+        ("idx_ratings_type_key", "rating_type, rating_key"),
+        ("idx_ratings_user_key", "user COLLATE NOCASE, rating_key"),
+        ("idx_ratings_artist_key", "content_info_artist COLLATE NOCASE, rating_key"),
+        ("idx_ratings_created_at", "created_at, rating_key"),
+        ("idx_ratings_like_count", "like_count, rating_key"),
+    ):
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ratings ({columns})")
+    # Ratings still pointing at remote artwork, for the mirror's polling
+    # (claim_unmirrored_artwork); rows leave it once their image is mirrored.
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_ratings_remote_image
+        ON ratings (image_url) WHERE image_url LIKE 'http%'
+        """
+    )
+
+    # Durable queue for resolving rating artwork off the request path. Worker
+    # threads (backend/__init__.py) claim due jobs and retry with backoff.
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS artwork_jobs (
+        job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        rating_key INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        mbid TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        run_after REAL NOT NULL,
+        locked_until REAL,
+        image_url TEXT,
+        last_error TEXT,
+        created_at TEXT,
+        updated_at TEXT,
+        UNIQUE(rating_key)
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_artwork_jobs_status_run_after
+        ON artwork_jobs (status, run_after)
+        """
+    )
+
+    # Local copies of remote artwork (backend/artwork_mirror.py), one row per
+    # source URL so a cover shared by many ratings is downloaded once.
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS artwork_mirror (
+        source_url TEXT PRIMARY KEY,
+        local_url TEXT,
+        status TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        bytes INTEGER,
+        updated_at TEXT
+        )
+        """
+    )
+
+    # Resume points for long-running maintenance jobs (backend/backfill.py).
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS backfill_checkpoints (
+        name TEXT PRIMARY KEY,
+        last_rating_key INTEGER NOT NULL DEFAULT 0,
+        stats TEXT,
+        updated_at TEXT
+        )
+        """
+    )
+
+    # mbid -> artwork already resolved for it, so a subject's artwork is looked
+    # up remotely once no matter how many ratings it gets. Fed from ratings whose
+    # image came from resolution or the mirror (not user uploads) and from
+    # finished artwork jobs; mirrored local copies replace remote URLs.
+    cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'artwork_index'"
+    )
+    artwork_index_existed = cur.fetchone() is not None
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS artwork_index (
+        mbid TEXT PRIMARY KEY,
+        kind TEXT,
+        image_url TEXT NOT NULL,
+        updated_at TEXT
+        )
+        """
+    )
+
+    def _artwork_index_upsert(select: str) -> str:
+        return f"""
+            INSERT INTO artwork_index (mbid, kind, image_url, updated_at)
+            {select}
+            ON CONFLICT(mbid) DO UPDATE SET
+                kind = excluded.kind,
+                image_url = excluded.image_url,
+                updated_at = excluded.updated_at
+            WHERE artwork_index.image_url NOT LIKE '%/artwork/%'
+               OR excluded.image_url LIKE '%/artwork/%';
+        """
+
+    def _artwork_index_from_ratings(where: str) -> str:
+        return _artwork_index_upsert(
+            f"""
+            SELECT TRIM(r.mbid), LOWER(TRIM(r.rating_type)), r.image_url, datetime('now')
+            FROM ratings r
+            WHERE {where}
+              AND TRIM(COALESCE(r.mbid, '')) != ''
+              AND (r.image_url LIKE 'http%' OR r.image_url LIKE '%/artwork/%')
+            """
+        )
+
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS artwork_index_ratings_ai AFTER INSERT ON ratings BEGIN
+            {_artwork_index_from_ratings("r.rating_key = new.rating_key")}
+        END
+        """
+    )
+    # Only a new image is indexed: an edit that changes the mbid alone would
+    # otherwise file the old subject's cover under the new one.
+    cur.execute("DROP TRIGGER IF EXISTS artwork_index_ratings_au")
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS artwork_index_ratings_au
+        AFTER UPDATE OF image_url ON ratings
+        WHEN new.image_url IS NOT old.image_url BEGIN
+            {_artwork_index_from_ratings("r.rating_key = new.rating_key")}
+        END
+        """
+    )
+    if not artwork_index_existed:
+        cur.execute(
+            _artwork_index_upsert(
+                """
+                SELECT mbid, kind, image_url, datetime('now')
+                FROM artwork_jobs
+                WHERE status = 'done' AND COALESCE(image_url, '') != ''
+                """
+            )
+        )
+        cur.execute(_artwork_index_from_ratings("1"))
+
+    # Full-text indexes for site search; bm25 weights live in backend/search.py.
+    _ensure_fts_index(cur, "users_fts", "user_info", "user_info_key", ["username", "about"])
+    # Trigram index over usernames only: candidate generation for fuzzy search.
+    _ensure_fts_index(
+        cur,
+        "users_trgm",
+        "user_info",
+        "user_info_key",
+        ["username"],
+        tokenize="trigram",
+        prefix=None,
+    )
+    _ensure_fts_index(
+        cur,
+        "playlists_fts",
+        "playlist_info",
+        "playlist_key",
+        ["playlist_title", "playlist_description", "created_by"],
+    )
+    _ensure_fts_index(cur, "songs_fts", "song", "song_key", ["song_title", "artist_name"])
+    # Discussions tab. Rating reasons are searched through ratings_fts.
+    _ensure_fts_index(
+        cur, "rating_comments_fts", "rating_comments", "comment_id", ["message"]
+    )
+    _ensure_fts_index(
+        cur, "profile_comments_fts", "profile_comments", "comment_id", ["message"]
+    )
+    _ensure_fts_index(cur, "bulletin_fts", "bulletin", "bulletin_key", ["title", "message"])
+
+    # Local catalog of MusicBrainz entities seen in remote searches or attached
+    # to ratings, so /api/musicbrainz/search can answer without a remote call.
+    # Ratings only seed an entry; search results (which carry year etc.) win.
+    cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'mb_catalog'"
+    )
+    mb_catalog_existed = cur.fetchone() is not None
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS mb_catalog (
+        catalog_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL,
+        mbid TEXT NOT NULL,
+        title TEXT NOT NULL,
+        artist TEXT NOT NULL DEFAULT '',
+        year TEXT NOT NULL DEFAULT '',
+        disambiguation TEXT NOT NULL DEFAULT '',
+        features TEXT NOT NULL DEFAULT '',
+        seen_count INTEGER NOT NULL DEFAULT 0,
+        last_seen_at TEXT,
+        UNIQUE(kind, mbid)
+        )
+        """
+    )
+
+    def _mb_catalog_seed(where: str) -> str:
+        return f"""
+            INSERT OR IGNORE INTO mb_catalog (kind, mbid, title, artist, last_seen_at)
+            SELECT
+                LOWER(TRIM(r.rating_type)),
+                TRIM(r.mbid),
+                TRIM(r.rating_name),
+                CASE
+                    WHEN LOWER(TRIM(r.rating_type)) = 'artist' THEN ''
+                    ELSE TRIM(COALESCE(r.content_info_artist, ''))
+                END,
+                datetime('now')
+            FROM ratings r
+            WHERE {where}
+              AND LOWER(TRIM(r.rating_type)) IN ('artist', 'album', 'song')
+              AND TRIM(COALESCE(r.mbid, '')) != ''
+              AND TRIM(COALESCE(r.rating_name, '')) != '';
+        """
+
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS mb_catalog_ratings_ai AFTER INSERT ON ratings BEGIN
+            {_mb_catalog_seed("r.rating_key = new.rating_key")}
+        END
+        """
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS mb_catalog_ratings_au AFTER UPDATE OF mbid ON ratings BEGIN
+            {_mb_catalog_seed("r.rating_key = new.rating_key")}
+        END
+        """
+    )
+    if not mb_catalog_existed:
+        cur.execute(_mb_catalog_seed("1"))
+    _ensure_fts_index(cur, "mb_catalog_fts", "mb_catalog", "catalog_id", ["title", "artist"])
+
+    # When each normalized search was last answered by MusicBrainz, so local
+    # answers for it (and for longer queries it prefixes) can go stale.
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS mb_catalog_queries (
+        kind TEXT NOT NULL,
+        q_norm TEXT NOT NULL,
+        artist_norm TEXT NOT NULL DEFAULT '',
+        fetched_at TEXT NOT NULL,
+        PRIMARY KEY (kind, q_norm, artist_norm)
+        )
+        """
+    )
+
+    # Per-entity change counters. backend/search.py stores these alongside cached
+    # results, so a write in any worker process invalidates every worker's cache.
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS search_versions (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    for name, table, update_columns in (
+        ("users", "user_info", "username, about, profile_pic"),
+        ("playlists", "playlist_info", None),
+        # Not the like/vote counters (see rating_counters below) or image_url,
+        # which the artwork mirror rewrites; a cached result's old image url
+        # still resolves until the entry expires.
+        (
+            "ratings",
+            "ratings",
+            "rating_type, rating_name, content_info_artist, content_info_album, user, mbid, "
+            "created_at, lyrics_rating, beat_rating, flow_rating, melody_rating, cohesive_rating, "
+            "lyrics_reason, beat_reason, flow_reason, melody_reason, cohesive_reason",
+        ),
+        ("songs", "song", None),
+        ("discussions", "rating_comments", None),
+        ("discussions", "profile_comments", None),
+        ("discussions", "bulletin", None),
+        # Bulletin results depend on who the viewer follows.
+        ("follows", "follow_info", None),
+    ):
+        cur.execute(
+            "INSERT OR IGNORE INTO search_versions (name, version) VALUES (?, 0)",
+            (name,),
+        )
+        bump = f"UPDATE search_versions SET version = version + 1 WHERE name = '{name}';"
+        update_of = f"UPDATE OF {update_columns}" if update_columns else "UPDATE"
+        for suffix, event in (("ai", "INSERT"), ("ad", "DELETE"), ("au", update_of)):
+            if suffix == "au":
+                # Redefined on every start so column list changes reach
+                # existing databases.
+                cur.execute(f"DROP TRIGGER IF EXISTS search_version_{table}_au")
+            cur.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS search_version_{table}_{suffix}
+                AFTER {event} ON {table} BEGIN
+                    {bump}
+                END
+                """
+            )
+    # Likes and votes change ratings.like_count etc. on every click; only
+    # filter_ratings() queries that filter on them depend on this.
+    cur.execute(
+        "INSERT OR IGNORE INTO search_versions (name, version) VALUES ('rating_counters', 0)"
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS search_version_rating_counters_au
+        AFTER UPDATE OF like_count, vote_up_count, vote_down_count ON ratings BEGIN
+            UPDATE search_versions SET version = version + 1 WHERE name = 'rating_counters';
+        END
+        """
+    )
+
     conn.commit()
     conn.close()
@@ -0,0 +1,119 @@
+import hashlib
+import os
+import re
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+from backend.external import COMMONS_BASE_URL, COVERART_BASE_URL, WIKIDATA_BASE_URL, get_bytes
+
+
+###############################################
+# Artwork Mirror
+###############################################
+
+# Remote artwork (Cover Art Archive thumbnails, Wikimedia Special:FilePath
+# redirects) is downloaded once into UPLOAD_FOLDER/artwork as a small "card"
+# variant for lists and a "detail" variant for the rating page, and the
+# rating's image_url is rewritten to the detail copy. Both sources resize on
+# their side, so variants are fetched at the target width rather than scaled
+# here.
+
+# Widths are ones the Cover Art Archive has thumbnails for (250, 500, 1200).
+ARTWORK_VARIANTS = {"card": 250, "detail": 500}
+ARTWORK_MAX_BYTES = 5_000_000
+
+_CAA_IMAGE = re.compile(
+    r"^(?P<base>https?://[^?#]+/\d+)(?:-(?:250|500|1200))?\.(?:jpe?g|png|gif)$", re.I
+)
+_EXTENSIONS = {"image/jpeg": "jpg", "image/png": "png", "image/gif": "gif", "image/webp": "webp"}
+
+
+def _from(url: str, base_url: str, domain: str) -> bool:
+    host = urlsplit(url).netloc.lower()
+    return host.endswith(domain) or url.startswith(base_url + "/")
+
+
+def _variant_sources(source_url: str) -> dict[str, str]:
+    parts = urlsplit(source_url)
+    if _from(source_url, COVERART_BASE_URL, "coverartarchive.org"):
+        match = _CAA_IMAGE.match(source_url)
+        if match:
+            return {
+                name: f"{match.group('base')}-{size}.jpg"
+                for name, size in ARTWORK_VARIANTS.items()
+            }
+    if _from(source_url, COMMONS_BASE_URL, "wikimedia.org") and "/Special:FilePath/" in parts.path:
+        query = dict(parse_qsl(parts.query))
+        return {
+            name: urlunsplit(parts._replace(query=urlencode({**query, "width": size})))
+            for name, size in ARTWORK_VARIANTS.items()
+        }
+    return {name: source_url for name in ARTWORK_VARIANTS}
+
+
+def _limiter_for(url: str) -> str | None:
+    if _from(url, COVERART_BASE_URL, "archive.org"):
+        return "coverart"
+    if _from(url, COMMONS_BASE_URL, "wikimedia.org") or _from(url, WIKIDATA_BASE_URL, "wikidata.org"):
+        return "wikidata"
+    return None
+
+
+def mirror_artwork(source_url: str, upload_folder: str, url_prefix: str) -> tuple[str, int] | None:
+    """
+    Downloads every variant of `source_url` into upload_folder/artwork and
+    returns (local URL of the detail variant, bytes written), or None if any
+    variant couldn't be fetched.
+    """
+    source_url = (source_url or "").strip()
+    if not source_url.startswith(("http://", "https://")):
+        return None
+
+    bodies: dict[str, tuple[bytes, str]] = {}
+    fetched: dict[str, tuple[bytes, str]] = {}
+    for name, url in _variant_sources(source_url).items():
+        if url not in fetched:
+            try:
+                status, body, content_type = get_bytes(
+                    url, limiter=_limiter_for(url), max_bytes=ARTWORK_MAX_BYTES
+                )
+            except requests.RequestException:
+                return None
+            if status != 200 or not body or content_type not in _EXTENSIONS:
+                return None
+            fetched[url] = (body, content_type)
+        bodies[name] = fetched[url]
+
+    # Every variant shares the detail variant's extension so artwork_variant()
+    # can derive one path from another.
+    ext = _EXTENSIONS[bodies["detail"][1]]
+    digest = hashlib.sha1(source_url.encode("utf-8")).hexdigest()[:20]
+    folder = Path(upload_folder) / "artwork"
+    folder.mkdir(parents=True, exist_ok=True)
+    written = 0
+    for name, (body, _content_type) in bodies.items():
+        path = folder / f"{digest}-{name}.{ext}"
+        tmp = path.with_suffix(f".{ext}.tmp")
+        tmp.write_bytes(body)
+        os.replace(tmp, path)
+        written += len(body)
+    return f"{url_prefix.rstrip('/')}/artwork/{digest}-detail.{ext}", written
+
+
+def is_resolved_artwork(image_url: str | None) -> bool:
+    """True for remote or mirrored artwork, as opposed to a user's upload."""
+    if not image_url:
+        return False
+    return image_url.startswith(("http://", "https://")) or "/artwork/" in image_url
+
+
+def artwork_variant(image_url: str | None, variant: str) -> str | None:
+    """The `variant` copy of a mirrored image; other URLs are returned as-is."""
+    if not image_url or variant not in ARTWORK_VARIANTS:
+        return image_url
+    head, sep, ext = image_url.rpartition("-detail.")
+    if not sep or "/artwork/" not in head:
+        return image_url
+    return f"{head}-{variant}.{ext}"
@@ -0,0 +1,216 @@
+"""
+Fills in missing MusicBrainz ids and artwork on existing ratings.
+
+Scans ratings in key order, in batches. For each one:
+- without an mbid: matches it against the local MusicBrainz catalog, then a
+  MusicBrainz search, and only accepts an exact title (and artist) match;
+- without an image: reuses artwork already resolved for the same mbid, and
+  only otherwise resolves it remotely.
+
+Remote calls go through backend.external, so they share the app's rate limits,
+response cache and circuit breaker with the running site. Progress is
+checkpointed after every batch; rerunning resumes where the last run stopped
+(--reset starts over). If MusicBrainz or the artwork services stay unavailable,
+the run stops before the rating that failed, so the next run retries it.
+
+Usage:
+    python -m backend.backfill --batch-size 50
+    python -m backend.backfill --kind album --limit 500 --reset
+"""
+
+import argparse
+import re
+import time
+
+import requests
+
+from backend.external import CircuitOpen, RateLimited, rate_limit_stats
+
+_PUNCT = re.compile(r"[^\w\s]+", re.UNICODE)
+
+
+def _norm(text: str) -> str:
+    return " ".join(_PUNCT.sub(" ", (text or "").casefold()).split())
+
+
+def _upstream_calls() -> int:
+    return sum(s["acquired"] for s in rate_limit_stats().values())
+
+
+def _retrying(fn, *args, attempts: int = 5, **kwargs):
+    """Calls fn, waiting out rate limit rejections and an open circuit breaker."""
+    for attempt in range(attempts):
+        try:
+            return fn(*args, **kwargs)
+        except CircuitOpen as exc:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(max(1.0, exc.retry_after))
+        except RateLimited:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(1.0 + attempt)
+
+
+def _match_mbid(rating: dict) -> dict | None:
+    """A catalog or search item whose title (and artist) exactly match the rating."""
+    from backend.database import record_mb_catalog_items, search_mb_catalog
+    from backend.routes import _mb_search
+
+    kind, name, artist = rating["kind"], rating["name"], rating["artist"]
+    if not _norm(name):
+        return None
+    artist = artist if kind != "artist" else ""
+
+    def _pick(items):
+        for item in items:
+            if _norm(item.get("title")) != _norm(name):
+                continue
+            if artist and _norm(item.get("artist")) != _norm(artist):
+                continue
+            if item.get("mbid"):
+                return item
+        return None
+
+    match = _pick(search_mb_catalog(kind, name, artist=artist or None, limit=8))
+    if match:
+        return match
+    items, _count = _retrying(_mb_search, kind, name, limit=8, offset=0, artist=artist or None)
+    record_mb_catalog_items(kind, items, query=name, artist=artist or None)
+    return _pick(items)
+
+
+def backfill(
+    *,
+    name: str = "artwork",
+    batch_size: int = 50,
+    limit: int | None = None,
+    kinds: list[str] | None = None,
+    match_mbids: bool = True,
+    reset: bool = False,
+    log=print,
+) -> dict:
+    from backend.database import (
+        count_ratings_missing_metadata,
+        delete_backfill_checkpoint,
+        get_backfill_checkpoint,
+        get_indexed_artwork,
+        get_ratings_missing_metadata,
+        save_backfill_checkpoint,
+        set_rating_artwork,
+        set_rating_mbid,
+    )
+    from backend.routes import resolve_artwork_url
+
+    if reset:
+        delete_backfill_checkpoint(name)
+    checkpoint = get_backfill_checkpoint(name) or {"last_rating_key": 0, "stats": {}}
+    last_key = checkpoint["last_rating_key"]
+    totals = {
+        "scanned": 0,
+        "mbids_matched": 0,
+        "artwork_reused": 0,
+        "artwork_fetched": 0,
+        "artwork_missing": 0,
+        "errors": 0,
+        **checkpoint["stats"],
+    }
+    remaining = count_ratings_missing_metadata(last_key)
+    if last_key:
+        log(f"resuming {name} after rating {last_key}; about {remaining} ratings left")
+    else:
+        log(f"starting {name}; about {remaining} ratings to check")
+
+    started = time.perf_counter()
+    calls_before = _upstream_calls()
+    scanned = 0
+    unavailable = None
+    while unavailable is None and (limit is None or scanned < limit):
+        size = batch_size if limit is None else min(batch_size, limit - scanned)
+        batch = get_ratings_missing_metadata(last_key, size, kinds)
+        if not batch:
+            break
+        batch_started = time.perf_counter()
+        done = 0
+        for rating in batch:
+            try:
+                if not rating["mbid"] and match_mbids:
+                    item = _match_mbid(rating)
+                    if item and set_rating_mbid(rating["rating_key"], item["mbid"], item.get("url")):
+                        rating["mbid"] = item["mbid"]
+                        totals["mbids_matched"] += 1
+                if rating["mbid"] and not rating["image_url"]:
+                    image_url = get_indexed_artwork(rating["mbid"])
+                    stat = "artwork_reused"
+                    if not image_url:
+                        image_url = _retrying(
+                            resolve_artwork_url, rating["kind"], rating["mbid"], strict=True
+                        )
+                        stat = "artwork_fetched"
+                    if not image_url:
+                        totals["artwork_missing"] += 1
+                    elif set_rating_artwork(rating["rating_key"], rating["mbid"], image_url):
+                        totals[stat] += 1
+            except requests.RequestException as exc:
+                # Upstream still unavailable after retries: stop here rather
+                # than checkpoint past a rating that was never really checked.
+                unavailable = exc
+                log(f"  rating {rating['rating_key']}: {type(exc).__name__}: {exc}; stopping")
+                break
+            except Exception as exc:
+                totals["errors"] += 1
+                log(f"  rating {rating['rating_key']}: {type(exc).__name__}: {exc}")
+            last_key = rating["rating_key"]
+            done += 1
+        scanned += done
+        totals["scanned"] += done
+        save_backfill_checkpoint(name, last_key, totals)
+
+        elapsed = time.perf_counter() - started
+        batch_rate = done / max(time.perf_counter() - batch_started, 1e-9)
+        log(
+            f"  through rating {last_key}: {scanned} scanned ({batch_rate:.1f}/s batch, "
+            f"{scanned / max(elapsed, 1e-9):.1f}/s overall), "
+            f"{_upstream_calls() - calls_before} upstream calls, "
+            f"mbids +{totals['mbids_matched']} reused {totals['artwork_reused']} "
+            f"fetched {totals['artwork_fetched']} missing {totals['artwork_missing']}"
+        )
+
+    elapsed = time.perf_counter() - started
+    if unavailable is not None:
+        log(f"upstream unavailable; rerun to resume at the rating after {last_key}")
+    log(
+        f"done: {scanned} ratings in {elapsed:.1f}s "
+        f"({scanned / max(elapsed, 1e-9):.1f}/s), "
+        f"{_upstream_calls() - calls_before} upstream calls; checkpoint at rating {last_key}"
+    )
+    return totals
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many ratings")
+    parser.add_argument(
+        "--kind", action="append", choices=["album", "song", "artist"], help="repeatable"
+    )
+    parser.add_argument("--skip-mbids", action="store_true", help="only fill in artwork")
+    parser.add_argument("--name", default="artwork", help="checkpoint name")
+    parser.add_argument("--reset", action="store_true", help="ignore the saved checkpoint")
+    args = parser.parse_args(argv)
+
+    from backend._db_setup import init_db
+
+    init_db()
+    backfill(
+        name=args.name,
+        batch_size=max(1, args.batch_size),
+        limit=args.limit,
+        kinds=args.kind,
+        match_mbids=not args.skip_mbids,
+        reset=args.reset,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,15 @@
 import sqlite3
 import re
 import json
-from backend._db_setup import DB_PATH
+import math
+import os
+import time
+import warnings
+import numpy as np
+from backend._db_setup import DB_PATH, _subject_key_sql
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Optional, Any
 
 
@@ -286,15 +291,227 @@ def get_users(
 
 
 def count_users() -> int:
+    return get_site_counter("users")
+
+
+###############################################
+# User Counters
+###############################################
+
+USER_COUNTER_COLUMNS = (
+    "rating_count",
+    "follower_count",
+    "following_count",
+    "likes_received_count",
+    "likes_given_count",
+    "playlist_count",
+)
+SITE_COUNTERS = ("users", "ratings", "playlists")
+
+
+def _bump_user_counter(
+    cur,
+    column: str,
+    delta: int,
+    *,
+    user_id: int | None = None,
+    username: str | None = None,
+) -> None:
+    # Runs inside the caller's transaction so the counter commits (or rolls
+    # back) together with the write it describes.
+    if not delta or column not in USER_COUNTER_COLUMNS:
+        return
+    if user_id is not None:
+        cur.execute(
+            f"UPDATE user_info SET {column} = MAX(0, {column} + ?) WHERE user_info_key = ?",
+            (int(delta), int(user_id)),
+        )
+    elif username:
+        cur.execute(
+            f"UPDATE user_info SET {column} = MAX(0, {column} + ?) WHERE username = ? COLLATE NOCASE",
+            (int(delta), username),
+        )
+
+
+def _bump_site_counter(cur, name: str, delta: int) -> None:
+    if not delta:
+        return
+    cur.execute(
+        """
+        INSERT INTO site_counters (name, value)
+        VALUES (?, MAX(0, ?))
+        ON CONFLICT(name) DO UPDATE SET value = MAX(0, value + ?)
+        """,
+        (name, int(delta), int(delta)),
+    )
+
+
+def _rebuild_user_counters(cur, user_id: int | None = None) -> None:
+    """
+    Recomputes user counters from the source tables, for one user or everyone.
+    Ratings and playlists reference users by name, so those are grouped by
+    name and mapped back to user ids here.
+    """
+    if user_id is None:
+        cur.execute("SELECT user_info_key, LOWER(username), username FROM user_info")
+    else:
+        cur.execute(
+            "SELECT user_info_key, LOWER(username), username FROM user_info WHERE user_info_key = ?",
+            (int(user_id),),
+        )
+    users = cur.fetchall()
+    if not users:
+        return
+
+    by_user = user_id is not None
+    name_params = (users[0][2],) if by_user else ()
+
+    cur.execute(
+        f"""
+        SELECT LOWER(user), COUNT(1)
+        FROM ratings
+        {"WHERE user = ? COLLATE NOCASE" if by_user else ""}
+        GROUP BY LOWER(user)
+        """,
+        name_params,
+    )
+    ratings = dict(cur.fetchall())
+
+    cur.execute(
+        f"""
+        SELECT LOWER(r.user), COUNT(1)
+        FROM rating_likes rl
+        JOIN ratings r
+            ON r.rating_key = rl.rating_key
+        {"WHERE r.user = ? COLLATE NOCASE" if by_user else ""}
+        GROUP BY LOWER(r.user)
+        """,
+        name_params,
+    )
+    likes_received = dict(cur.fetchall())
+
+    id_params = (int(user_id),) if by_user else ()
+    cur.execute(
+        f"""
+        SELECT user_followed_key, COUNT(1)
+        FROM follow_info
+        WHERE (unfollowed IS NULL OR unfollowed = 0)
+        {"AND user_followed_key = ?" if by_user else ""}
+        GROUP BY user_followed_key
+        """,
+        id_params,
+    )
+    followers = dict(cur.fetchall())
+
+    cur.execute(
+        f"""
+        SELECT followed_by_user_key, COUNT(1)
+        FROM follow_info
+        WHERE (unfollowed IS NULL OR unfollowed = 0)
+        {"AND followed_by_user_key = ?" if by_user else ""}
+        GROUP BY followed_by_user_key
+        """,
+        id_params,
+    )
+    following = dict(cur.fetchall())
+
+    cur.execute(
+        f"""
+        SELECT user_id, COUNT(1)
+        FROM rating_likes
+        {"WHERE user_id = ?" if by_user else ""}
+        GROUP BY user_id
+        """,
+        id_params,
+    )
+    likes_given = dict(cur.fetchall())
+
+    cur.execute(
+        f"""
+        SELECT LOWER(created_by), COUNT(1)
+        FROM playlist_info
+        {"WHERE created_by = ? COLLATE NOCASE" if by_user else ""}
+        GROUP BY LOWER(created_by)
+        """,
+        name_params,
+    )
+    playlists = dict(cur.fetchall())
+
+    cur.executemany(
+        """
+        UPDATE user_info
+        SET rating_count = ?,
+            follower_count = ?,
+            following_count = ?,
+            likes_received_count = ?,
+            likes_given_count = ?,
+            playlist_count = ?
+        WHERE user_info_key = ?
+        """,
+        [
+            (
+                ratings.get(lower_name, 0),
+                followers.get(uid, 0),
+                following.get(uid, 0),
+                likes_received.get(lower_name, 0),
+                likes_given.get(uid, 0),
+                playlists.get(lower_name, 0),
+                uid,
+            )
+            for uid, lower_name, _name in users
+        ],
+    )
+
+
+def rebuild_counters() -> None:
+    """Recomputes every user counter and the site-wide counters."""
+    conn = get_db_connection()
+    cur = conn.cursor()
+    _rebuild_user_counters(cur)
+    for name, table in (("users", "user_info"), ("ratings", "ratings"), ("playlists", "playlist_info")):
+        cur.execute(
+            f"""
+            INSERT OR REPLACE INTO site_counters (name, value)
+            VALUES (?, (SELECT COUNT(1) FROM {table}))
+            """,
+            (name,),
+        )
+    conn.commit()
+    conn.close()
+
+
+def backfill_counters() -> None:
+    """Populates counters on first start after upgrading; no-op afterwards."""
     conn = get_db_connection()
     cur = conn.cursor()
-    cur.execute("SELECT COUNT(1) FROM user_info")
+    cur.execute("SELECT 1 FROM site_counters LIMIT 1")
     row = cur.fetchone()
     conn.close()
-    try:
-        return int(row[0]) if row and row[0] is not None else 0
-    except (TypeError, ValueError):
-        return 0
+    if not row:
+        rebuild_counters()
+
+
+def get_site_counter(name: str) -> int:
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT value FROM site_counters WHERE name = ?", (name,))
+    row = cur.fetchone()
+    conn.close()
+    return int(row[0] or 0) if row else 0
+
+
+def get_user_counters(user_id: int) -> dict[str, int]:
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        f"SELECT {', '.join(USER_COUNTER_COLUMNS)} FROM user_info WHERE user_info_key = ?",
+        (int(user_id),),
+    )
+    row = cur.fetchone()
+    conn.close()
+    if not row:
+        return {c: 0 for c in USER_COUNTER_COLUMNS}
+    return {c: int(v or 0) for c, v in zip(USER_COUNTER_COLUMNS, row)}
 
 
 def search_rated_subjects(
@@ -318,52 +535,53 @@ def search_rated_subjects(
         limit = 10
     limit = max(1, min(50, limit))
 
-    rating_type = {"song": "Song", "album": "Album", "artist": "Artist"}.get(kind)
-    if not rating_type:
+    if kind not in {"song", "album", "artist"}:
         return []
 
-    name_like = f"%{q}%"
-    artist_like = f"%{artist}%" if artist else "%"
+    # Served from rated_subjects (one row per subject, maintained by triggers on
+    # ratings) rather than grouping the ratings table on every keystroke.
+    kind_filter = """
+        s.kind = ?
+        AND (? = '' OR s.content_artist LIKE ? COLLATE NOCASE)
+    """
+    kind_params: list[Any] = [kind, artist, f"%{artist}%"]
+    order = "ORDER BY s.rating_count DESC, s.rating_name COLLATE NOCASE ASC LIMIT ?"
+    select = "SELECT s.rating_name, s.content_artist, s.rating_count, s.mbid, s.image_url"
 
     conn = get_db_connection()
     cur = conn.cursor()
 
-    if kind == "artist":
+    if not q:
         cur.execute(
-            """
-            SELECT
-                rating_name,
-                '' AS artist,
-                COUNT(1) AS rating_count,
-                MAX(mbid) AS mbid,
-                MAX(image_url) AS image_url
-            FROM ratings
-            WHERE LOWER(TRIM(rating_type)) = LOWER(TRIM(?))
-              AND (? = '' OR rating_name LIKE ? COLLATE NOCASE)
-            GROUP BY LOWER(TRIM(rating_name))
-            ORDER BY rating_count DESC, rating_name COLLATE NOCASE ASC
-            LIMIT ?
+            f"{select} FROM rated_subjects s WHERE {kind_filter} {order}",
+            (*kind_params, int(limit)),
+        )
+    elif len(q) >= 3 and _fts_available(cur, "rated_subjects_fts"):
+        # Trigram index: a quoted phrase matches any substring of the name.
+        # CROSS JOIN keeps the FTS lookup first instead of walking the count index.
+        cur.execute(
+            f"""
+            {select}
+            FROM rated_subjects_fts
+            CROSS JOIN rated_subjects s
+                ON s.subject_id = rated_subjects_fts.rowid
+            WHERE rated_subjects_fts MATCH ?
+              AND {kind_filter}
+            {order}
             """,
-            (rating_type, q, name_like, int(limit)),
+            ('rating_name : "' + q.replace('"', '""') + '"', *kind_params, int(limit)),
         )
     else:
+        # Too short for trigrams; rated_subjects is small enough to scan.
         cur.execute(
-            """
-            SELECT
-                rating_name,
-                COALESCE(content_info_artist, '') AS artist,
-                COUNT(1) AS rating_count,
-                MAX(mbid) AS mbid,
-                MAX(image_url) AS image_url
-            FROM ratings
-            WHERE LOWER(TRIM(rating_type)) = LOWER(TRIM(?))
-              AND (? = '' OR rating_name LIKE ? COLLATE NOCASE)
-              AND (? = '' OR COALESCE(content_info_artist, '') LIKE ? COLLATE NOCASE)
-            GROUP BY LOWER(TRIM(rating_name)), LOWER(TRIM(COALESCE(content_info_artist, '')))
-            ORDER BY rating_count DESC, rating_name COLLATE NOCASE ASC
-            LIMIT ?
+            f"""
+            {select}
+            FROM rated_subjects s
+            WHERE s.rating_name LIKE ? COLLATE NOCASE
+              AND {kind_filter}
+            {order}
             """,
-            (rating_type, q, name_like, artist, artist_like, int(limit)),
+            (f"%{q}%", *kind_params, int(limit)),
         )
 
     rows = cur.fetchall()
@@ -722,6 +940,26 @@ def get_subject_activity_timeseries(
     return out
 
 
+def _subject_where_sql(
+    mbid: str, rating_type: str, rating_name: str, content_artist: str
+) -> tuple[str, list[Any]]:
+    # WHERE clause over ratings for one subject: MBID when available, otherwise
+    # type+name(+artist) with a lenient artist comparison.
+    name_where = """
+        LOWER(TRIM(rating_type)) = LOWER(TRIM(?))
+        AND LOWER(TRIM(rating_name)) = LOWER(TRIM(?))
+        AND (
+          LOWER(TRIM(COALESCE(content_info_artist, ''))) = LOWER(TRIM(?))
+          OR TRIM(?) = ''
+          OR TRIM(COALESCE(content_info_artist, '')) = ''
+        )
+        """
+    name_params: list[Any] = [rating_type, rating_name, content_artist, content_artist]
+    if mbid:
+        return f"(mbid = ? OR ({name_where}))", [mbid, *name_params]
+    return name_where, name_params
+
+
 def get_subject_overall_summary(
     *,
     mbid: str | None,
@@ -741,35 +979,7 @@ def get_subject_overall_summary(
     if not rating_type or not rating_name:
         return None
 
-    params: list[Any] = []
-    where = ""
-    if mbid:
-        where = """
-        (
-          mbid = ?
-          OR (
-            LOWER(TRIM(rating_type)) = LOWER(TRIM(?))
-            AND LOWER(TRIM(rating_name)) = LOWER(TRIM(?))
-            AND (
-              LOWER(TRIM(COALESCE(content_info_artist, ''))) = LOWER(TRIM(?))
-              OR TRIM(?) = ''
-              OR TRIM(COALESCE(content_info_artist, '')) = ''
-            )
-          )
-        )
-        """
-        params.extend([mbid, rating_type, rating_name, content_artist, content_artist])
-    else:
-        where = """
-        LOWER(TRIM(rating_type)) = LOWER(TRIM(?))
-        AND LOWER(TRIM(rating_name)) = LOWER(TRIM(?))
-        AND (
-          LOWER(TRIM(COALESCE(content_info_artist, ''))) = LOWER(TRIM(?))
-          OR TRIM(?) = ''
-          OR TRIM(COALESCE(content_info_artist, '')) = ''
-        )
-        """
-        params.extend([rating_type, rating_name, content_artist, content_artist])
+    where, params = _subject_where_sql(mbid, rating_type, rating_name, content_artist)
 
     conn = get_db_connection()
     cur = conn.cursor()
@@ -836,74 +1046,388 @@ def get_subject_overall_summary(
     }
 
 
-# Get rating owner
-def get_rating_owner(rating_key):
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT user FROM ratings WHERE rating_key = ?", (rating_key,))
-    row = cur.fetchone()
-    conn.close()
-    return row[0] if row else None
+RATING_CATEGORIES = ("lyrics", "beat", "flow", "melody", "cohesive")
+RATING_SCALE = (1, 10)
+_DISTRIBUTION_PERCENTILES = (10, 25, 50, 75, 90)
 
 
-def get_rating_comments(rating_key: int) -> list[dict[str, Any]]:
+def _score_distribution_stats(scores: np.ndarray) -> dict[str, Any]:
+    """
+    Column-wise stats for an (n, k) float array of scores (NaN = missing).
+    Every statistic is computed over all k columns at once.
+    """
+    lo, hi = RATING_SCALE
+    n_bins = hi - lo + 1
+    k = scores.shape[1]
+
+    valid = ~np.isnan(scores)
+    counts = valid.sum(axis=0)
+
+    # Histogram of every column in one bincount: offset each column's bins so
+    # they land in their own slice of the flat counts array.
+    bins = np.clip(np.rint(np.where(valid, scores, lo)), lo, hi).astype(np.int64) - lo
+    bins = bins + np.arange(k, dtype=np.int64) * n_bins
+    histogram = np.bincount(bins[valid], minlength=k * n_bins).reshape(k, n_bins)
+
+    with warnings.catch_warnings():
+        # Columns with no scores produce NaN; they're reported as None below.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(scores, axis=0)
+        std = np.nanstd(scores, axis=0)
+        mins = np.nanmin(scores, axis=0)
+        maxs = np.nanmax(scores, axis=0)
+        percentiles = np.nanpercentile(scores, _DISTRIBUTION_PERCENTILES, axis=0)
+
+    # Controversy: spread relative to the largest spread the scale allows (an
+    # even split between the two extremes). 0 = consensus, 1 = fully split.
+    controversy = np.clip(std / ((hi - lo) / 2), 0.0, 1.0)
+
+    def _num(v) -> float | None:
+        return None if np.isnan(v) else round(float(v), 2)
+
+    out = []
+    for i in range(k):
+        if not counts[i]:
+            out.append({"count": 0, "histogram": [0] * n_bins})
+            continue
+        out.append(
+            {
+                "count": int(counts[i]),
+                "mean": _num(mean[i]),
+                "std": _num(std[i]),
+                "min": _num(mins[i]),
+                "max": _num(maxs[i]),
+                "percentiles": {
+                    f"p{p}": _num(percentiles[j, i]) for j, p in enumerate(_DISTRIBUTION_PERCENTILES)
+                },
+                "histogram": histogram[i].tolist(),
+                "controversy": _num(controversy[i]),
+            }
+        )
+    return {"bins": list(range(lo, hi + 1)), "columns": out}
+
+
+def get_subject_score_distribution(
+    *,
+    mbid: str | None,
+    rating_type: str,
+    rating_name: str,
+    content_artist: str | None,
+) -> dict[str, Any] | None:
+    """
+    Histograms, percentiles, standard deviation and a controversy score for each
+    rating category of a subject, plus "overall" (each rating's category average).
+    Scores are fetched as one column block and reduced with NumPy.
+    """
+    mbid = (mbid or "").strip()
+    rating_type = (rating_type or "").strip()
+    rating_name = (rating_name or "").strip()
+    content_artist = (content_artist or "").strip()
+
+    if not rating_type or not rating_name:
+        return None
+
+    where, params = _subject_where_sql(mbid, rating_type, rating_name, content_artist)
+    # "+ 0.0" coerces to REAL cheaply; blank/non-numeric text becomes 0.0 and is
+    # dropped with the other out-of-scale values below.
+    columns = ", ".join(f"{c}_rating + 0.0" for c in RATING_CATEGORIES)
+
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
-        """
-        SELECT
-            rc.comment_id,
-            rc.message,
-            rc.created_at,
-            ui.user_info_key,
-            ui.username,
-            ui.profile_pic
-        FROM rating_comments rc
-        JOIN user_info ui ON ui.user_info_key = rc.author_user_id
-        WHERE rc.rating_key = ?
-        ORDER BY rc.comment_id ASC
+        f"""
+        SELECT {columns}
+        FROM ratings
+        WHERE {where}
         """,
-        (int(rating_key),),
+        tuple(params),
     )
     rows = cur.fetchall()
     conn.close()
+    if not rows:
+        return None
 
-    comments: list[dict[str, Any]] = []
-    for row in rows:
-        (
-            comment_id,
-            message,
-            created_at,
-            author_user_id,
-            username,
-            profile_pic,
-        ) = row
-        comments.append(
+    # None -> NaN when building a float array.
+    scores = np.array(rows, dtype=np.float64).reshape(len(rows), len(RATING_CATEGORIES))
+    lo, hi = RATING_SCALE
+    scores[(scores < lo) | (scores > hi)] = np.nan
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        overall = np.nanmean(scores, axis=1)
+
+    stats = _score_distribution_stats(np.column_stack([scores, overall]))
+    keys = [*RATING_CATEGORIES, "overall"]
+    return {
+        "rating_count": len(rows),
+        "bins": stats["bins"],
+        "categories": dict(zip(keys, stats["columns"])),
+    }
+
+
+def _subject_matches(subject: dict[str, Any], row_mbid, row_type, row_name, row_artist) -> bool:
+    # Mirrors the SQL subject matching used above: MBID when available, otherwise
+    # type+name(+artist) with a lenient artist comparison.
+    mbid = (subject.get("mbid") or "").strip()
+    if mbid and (row_mbid or "") == mbid:
+        return True
+    if (row_type or "").strip().lower() != (subject.get("rating_type") or "").strip().lower():
+        return False
+    if (row_name or "").strip().lower() != (subject.get("rating_name") or "").strip().lower():
+        return False
+    want_artist = (subject.get("content_artist") or "").strip().lower()
+    have_artist = (row_artist or "").strip().lower()
+    return have_artist == want_artist or not want_artist or not have_artist
+
+
+def get_subjects_comparison(
+    *,
+    subjects: list[dict[str, Any]],
+    action: str,
+    cutoff_iso: str | None = None,
+) -> dict[str, Any]:
+    """
+    Batched version of get_subject_activity_timeseries + get_subject_overall_summary.
+
+    Each subject is a dict with rating_type, rating_name, content_artist and mbid.
+    The ratings table is scanned once for all subjects and the matching activity is
+    fetched in a single query; series are aligned on a shared list of days.
+
+    Returns {"labels": [...], "items": [{"events", "users", "summary"}, ...]} with
+    items in the same order as `subjects`.
+    """
+    action = (action or "").strip().lower()
+    cutoff_iso = (cutoff_iso or "").strip() or None
+
+    cleaned: list[dict[str, Any]] = []
+    for s in subjects or []:
+        cleaned.append(
             {
-                "comment_id": int(comment_id),
-                "message": message or "",
-                "created_at": created_at,
-                "author_user_id": int(author_user_id),
-                "username": username,
-                "profile_pic": profile_pic,
+                "mbid": (s.get("mbid") or "").strip(),
+                "rating_type": (s.get("rating_type") or "").strip(),
+                "rating_name": (s.get("rating_name") or "").strip(),
+                "content_artist": (s.get("content_artist") or "").strip(),
             }
         )
-    return comments
 
+    mbids = sorted({s["mbid"] for s in cleaned if s["mbid"]})
+    # Lowercased by SQLite on both sides: Python's .lower() folds non-ASCII
+    # letters that LOWER() leaves alone, so the two would never meet.
+    names = sorted({s["rating_name"] for s in cleaned if s["rating_type"] and s["rating_name"]})
+    if not action or (not mbids and not names):
+        return {"labels": [], "items": [{"events": [], "users": [], "summary": None} for _ in cleaned]}
+
+    where_parts: list[str] = []
+    params: list[Any] = []
+    if mbids:
+        where_parts.append(f"mbid IN ({','.join(['?'] * len(mbids))})")
+        params.extend(mbids)
+    if names:
+        where_parts.append(
+            f"LOWER(TRIM(rating_name)) IN ({','.join(['LOWER(TRIM(?))'] * len(names))})"
+        )
+        params.extend(names)
 
-def add_rating_comment(
-    rating_key: int,
-    author_user_id: int,
-    message: str,
-    created_at: str,
-) -> None:
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
-        """
-        INSERT INTO rating_comments (rating_key, author_user_id, message, created_at)
-        VALUES (?,?,?,?)
-        """,
+        f"""
+        SELECT
+            rating_key,
+            rating_type,
+            rating_name,
+            content_info_artist,
+            mbid,
+            user,
+            lyrics_rating,
+            beat_rating,
+            flow_rating,
+            melody_rating,
+            cohesive_rating,
+            image_url
+        FROM ratings
+        WHERE {" OR ".join(where_parts)}
+        """,
+        tuple(params),
+    )
+    rating_rows = cur.fetchall()
+
+    # rating_key -> indices of the subjects it belongs to
+    owners: dict[int, list[int]] = {}
+    for row in rating_rows:
+        rk, r_type, r_name, r_artist, r_mbid = row[0], row[1], row[2], row[3], row[4]
+        idxs = [
+            i
+            for i, s in enumerate(cleaned)
+            if (s["mbid"] or (s["rating_type"] and s["rating_name"]))
+            and _subject_matches(s, r_mbid, r_type, r_name, r_artist)
+        ]
+        if idxs:
+            owners[int(rk)] = idxs
+
+    activity_rows: list[tuple] = []
+    if owners:
+        keys = sorted(owners.keys())
+        cutoff_sql = " AND created_at >= ? " if cutoff_iso else ""
+        cur.execute(
+            f"""
+            SELECT entity_id, SUBSTR(created_at, 1, 10) AS day, LOWER(TRIM(actor_username))
+            FROM activity
+            WHERE action = ?
+              AND entity_type = 'rating'
+              AND created_at IS NOT NULL
+              AND entity_id IN ({",".join(["?"] * len(keys))})
+              {cutoff_sql}
+            """,
+            tuple([action] + keys + ([cutoff_iso] if cutoff_iso else [])),
+        )
+        activity_rows = cur.fetchall()
+    conn.close()
+
+    def _score(v):
+        if v is None:
+            return None
+        try:
+            return float(v)
+        except (TypeError, ValueError):
+            return 0.0
+
+    # Summaries
+    category_cols = ("lyrics", "beat", "flow", "melody", "cohesive")
+    acc = [
+        {"count": 0, "users": set(), "sums": [0.0] * 5, "ns": [0] * 5, "image_url": None}
+        for _ in cleaned
+    ]
+    for row in rating_rows:
+        idxs = owners.get(int(row[0]))
+        if not idxs:
+            continue
+        user = (row[5] or "").strip().lower()
+        scores = [_score(v) for v in row[6:11]]
+        image_url = (row[11] or "").strip() or None
+        for i in idxs:
+            a = acc[i]
+            a["count"] += 1
+            a["users"].add(user)
+            for c, v in enumerate(scores):
+                if v is not None:
+                    a["sums"][c] += v
+                    a["ns"][c] += 1
+            if image_url and (a["image_url"] is None or image_url > a["image_url"]):
+                a["image_url"] = image_url
+
+    # Daily buckets
+    days: set[str] = set()
+    buckets: list[dict[str, list]] = [{} for _ in cleaned]
+    for entity_id, day, actor in activity_rows:
+        idxs = owners.get(int(entity_id))
+        if not idxs:
+            continue
+        day = str(day)
+        days.add(day)
+        for i in idxs:
+            b = buckets[i].setdefault(day, [0, set()])
+            b[0] += 1
+            b[1].add(actor)
+
+    labels = sorted(days)
+    items: list[dict[str, Any]] = []
+    for i, s in enumerate(cleaned):
+        a = acc[i]
+        summary = None
+        if a["count"]:
+            avgs = [
+                round(a["sums"][c] / a["ns"][c], 2) if a["ns"][c] else None for c in range(5)
+            ]
+            components = [v for v in avgs if v is not None]
+            summary = {
+                "rating_count": a["count"],
+                "user_count": len(a["users"]),
+                "overall_avg": (
+                    round(sum(components) / len(components), 2) if components else None
+                ),
+                **{f"avg_{name}": avgs[c] for c, name in enumerate(category_cols)},
+                "image_url": a["image_url"],
+            }
+        b = buckets[i]
+        items.append(
+            {
+                "events": [b[d][0] if d in b else 0 for d in labels],
+                "users": [len(b[d][1]) if d in b else 0 for d in labels],
+                "summary": summary,
+            }
+        )
+    return {"labels": labels, "items": items}
+
+
+# Get rating owner
+def get_rating_owner(rating_key):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT user FROM ratings WHERE rating_key = ?", (rating_key,))
+    row = cur.fetchone()
+    conn.close()
+    return row[0] if row else None
+
+
+def get_rating_comments(rating_key: int) -> list[dict[str, Any]]:
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT
+            rc.comment_id,
+            rc.message,
+            rc.created_at,
+            ui.user_info_key,
+            ui.username,
+            ui.profile_pic
+        FROM rating_comments rc
+        JOIN user_info ui ON ui.user_info_key = rc.author_user_id
+        WHERE rc.rating_key = ?
+        ORDER BY rc.comment_id ASC
+        """,
+        (int(rating_key),),
+    )
+    rows = cur.fetchall()
+    conn.close()
+
+    comments: list[dict[str, Any]] = []
+    for row in rows:
+        (
+            comment_id,
+            message,
+            created_at,
+            author_user_id,
+            username,
+            profile_pic,
+        ) = row
+        comments.append(
+            {
+                "comment_id": int(comment_id),
+                "message": message or "",
+                "created_at": created_at,
+                "author_user_id": int(author_user_id),
+                "username": username,
+                "profile_pic": profile_pic,
+            }
+        )
+    return comments
+
+
+def add_rating_comment(
+    rating_key: int,
+    author_user_id: int,
+    message: str,
+    created_at: str,
+) -> None:
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO rating_comments (rating_key, author_user_id, message, created_at)
+        VALUES (?,?,?,?)
+        """,
         (int(rating_key), int(author_user_id), message, created_at),
     )
     conn.commit()
@@ -991,7 +1515,7 @@ def add_rating(
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
-        "INSERT INTO ratings (rating_type, rating_name, lyrics_rating,lyrics_reason, beat_rating, beat_reason, flow_rating, flow_reason, melody_rating, melody_reason, cohesive_rating, cohesive_reason, user, image_url, mbid, mb_url, content_info_artist) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+        "INSERT INTO ratings (rating_type, rating_name, lyrics_rating,lyrics_reason, beat_rating, beat_reason, flow_rating, flow_reason, melody_rating, melody_reason, cohesive_rating, cohesive_reason, user, image_url, mbid, mb_url, content_info_artist, created_at) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
         (
             rating_type,
             rating_name,
@@ -1010,9 +1534,12 @@ def add_rating(
             (mbid or "").strip() or None,
             (mb_url or "").strip() or None,
             ((content_artist or "").strip()[:50]) or None,
+            datetime.now(timezone.utc).isoformat(),
         ),
     )
     rating_key = cur.lastrowid
+    _bump_user_counter(cur, "rating_count", 1, username=user)
+    _bump_site_counter(cur, "ratings", 1)
     conn.commit()
     conn.close()
     return int(rating_key) if rating_key is not None else None
@@ -1098,6 +1625,30 @@ def add_activity(
             metadata_json,
         ),
     )
+    weight = TRENDING_WEIGHTS.get(action)
+    if weight and entity_type == "rating" and entity_id is not None:
+        _bump_subject_trending(cur, int(entity_id), weight, created_at)
+    elif action in TRENDING_REVERSALS and entity_type == "rating" and entity_id is not None:
+        # Take back the actor's latest event of the reversed kind.
+        reversed_action = TRENDING_REVERSALS[action]
+        cur.execute(
+            """
+            SELECT created_at
+            FROM activity
+            WHERE entity_type = 'rating'
+              AND entity_id = ?
+              AND action = ?
+              AND actor_user_id = ?
+            ORDER BY activity_id DESC
+            LIMIT 1
+            """,
+            (int(entity_id), reversed_action, int(actor_user_id)),
+        )
+        row = cur.fetchone()
+        if row:
+            _unbump_subject_trending(
+                cur, int(entity_id), TRENDING_WEIGHTS[reversed_action], row[0]
+            )
     conn.commit()
     conn.close()
 
@@ -1408,521 +1959,811 @@ def _get_activity_cleared_at(
     return cleared
 
 
-# Update an existing rating
-def update_rating(
-    rating_key,
-    rating_type,
-    rating_name,
-    lyrics_rating,
-    lyrics_reason,
-    beat_rating,
-    beat_reason,
-    flow_rating,
-    flow_reason,
-    melody_rating,
-    melody_reason,
-    cohesive_rating,
-    cohesive_reason,
-    image_url=None,
-    mbid: str | None = None,
-    mb_url: str | None = None,
-    content_artist: str | None = None,
-):
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "UPDATE ratings SET rating_type = ?, rating_name = ?, lyrics_rating = ?, lyrics_reason = ?, beat_rating = ?, beat_reason = ?, flow_rating = ?, flow_reason = ?, melody_rating = ?, melody_reason = ?, cohesive_rating = ?, cohesive_reason = ?, image_url = ?, mbid = ?, mb_url = ?, content_info_artist = ? WHERE rating_key = ?",
-        (
-            rating_type,
-            rating_name,
-            lyrics_rating,
-            lyrics_reason,
-            beat_rating,
-            beat_reason,
-            flow_rating,
-            flow_reason,
-            melody_rating,
-            melody_reason,
-            cohesive_rating,
-            cohesive_reason,
-            image_url,
-            (mbid or "").strip() or None,
-            (mb_url or "").strip() or None,
-            ((content_artist or "").strip()[:50]) or None,
-            rating_key,
-        ),
-    )
-    conn.commit()
-    conn.close()
-
+###############################################
+# Trending
+###############################################
 
-# Delete a rating
-def delete_rating(rating_key):
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM rating_comments WHERE rating_key = ?", (rating_key,))
-    cur.execute("DELETE FROM rating_likes WHERE rating_key = ?", (rating_key,))
-    cur.execute("DELETE FROM rating_category_votes WHERE rating_key = ?", (rating_key,))
-    cur.execute("DELETE FROM ratings WHERE rating_key = ?", (rating_key,))
-    conn.commit()
-    conn.close()
+# Activity that counts towards a subject's trending score.
+TRENDING_WEIGHTS: dict[str, float] = {
+    "rating_create": 5.0,
+    "rating_like": 3.0,
+    "rating_reaction": 2.0,
+    "rating_view": 1.0,
+}
+
+# Actions that take back the same user's earlier counted action on a rating.
+TRENDING_REVERSALS: dict[str, str] = {
+    "rating_unlike": "rating_like",
+}
+
+def _trending_decay_rate() -> float:
+    # Changing the half-life only affects new events; run
+    # rebuild_subject_trending() to rescore history with the new value.
+    try:
+        half_life_hours = float(os.environ.get("TRENDING_HALF_LIFE_HOURS") or "48")
+    except ValueError:
+        half_life_hours = 48.0
+    half_life_hours = max(1.0, min(24.0 * 365, half_life_hours))
+    return math.log(2) / (half_life_hours * 3600.0)
 
 
-###############################################
-# Rating Likes
-###############################################
+def _epoch_seconds(iso_timestamp: Optional[str]) -> float:
+    try:
+        parsed = datetime.fromisoformat((iso_timestamp or "").strip())
+    except ValueError:
+        return datetime.now(timezone.utc).timestamp()
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
 
 
-def is_rating_liked_by_user(rating_key: int, user_id: int) -> bool:
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT 1
-        FROM rating_likes
-        WHERE rating_key = ? AND user_id = ?
-        LIMIT 1
-        """,
-        (int(rating_key), int(user_id)),
-    )
-    row = cur.fetchone()
-    conn.close()
-    return bool(row)
+def _log_add(a: Optional[float], b: float) -> float:
+    # log(exp(a) + exp(b)) without overflowing.
+    if a is None:
+        return b
+    hi, lo = (a, b) if a >= b else (b, a)
+    return hi + math.log1p(math.exp(lo - hi))
 
 
-def get_rating_like_count(rating_key: int) -> int:
-    conn = get_db_connection()
-    cur = conn.cursor()
+def _bump_subject_trending(cur, rating_key: int, weight: float, created_at: str) -> None:
+    """
+    Adds one weighted event to the subject of `rating_key`.
+    Runs inside the caller's write transaction (after its INSERT), so the
+    read-modify-write below is serialized with other writers.
+    """
     cur.execute(
-        """
-        SELECT COUNT(*)
-        FROM rating_likes
+        f"""
+        SELECT
+            {_subject_key_sql()},
+            LOWER(TRIM(rating_type)),
+            rating_name,
+            content_info_artist,
+            mbid,
+            image_url
+        FROM ratings
         WHERE rating_key = ?
         """,
         (int(rating_key),),
     )
     row = cur.fetchone()
-    conn.close()
-    return int(row[0]) if row and row[0] is not None else 0
-
-
-def toggle_rating_like(rating_key: int, user_id: int) -> bool:
-    """Returns True if liked after toggle, False if unliked."""
-    conn = get_db_connection()
-    cur = conn.cursor()
+    if not row or not row[0]:
+        return
+    subject_key, kind, rating_name, content_artist, mbid, image_url = row
+    term = math.log(weight) + _trending_decay_rate() * _epoch_seconds(created_at)
 
     cur.execute(
-        """
-        SELECT rating_like_id
-        FROM rating_likes
-        WHERE rating_key = ? AND user_id = ?
-        LIMIT 1
-        """,
-        (int(rating_key), int(user_id)),
+        "SELECT score_log FROM subject_trending WHERE subject_key = ?",
+        (subject_key,),
     )
-    row = cur.fetchone()
-    if row:
+    existing = cur.fetchone()
+    if existing:
         cur.execute(
-            "DELETE FROM rating_likes WHERE rating_like_id = ?",
-            (int(row[0]),),
+            """
+            UPDATE subject_trending
+            SET score_log = ?,
+                event_count = COALESCE(event_count, 0) + 1,
+                rating_name = ?,
+                content_artist = ?,
+                mbid = COALESCE(?, mbid),
+                image_url = COALESCE(?, image_url),
+                updated_at = ?
+            WHERE subject_key = ?
+            """,
+            (
+                _log_add(float(existing[0]), term),
+                rating_name,
+                content_artist if kind != "artist" else None,
+                (mbid or "").strip() or None,
+                (image_url or "").strip() or None,
+                created_at,
+                subject_key,
+            ),
+        )
+    else:
+        cur.execute(
+            """
+            INSERT INTO subject_trending (
+                subject_key, kind, rating_name, content_artist, mbid, image_url,
+                score_log, event_count, updated_at
+            )
+            VALUES (?,?,?,?,?,?,?,1,?)
+            """,
+            (
+                subject_key,
+                kind or "",
+                rating_name,
+                content_artist if kind != "artist" else None,
+                (mbid or "").strip() or None,
+                (image_url or "").strip() or None,
+                term,
+                created_at,
+            ),
         )
-        conn.commit()
-        conn.close()
-        return False
 
-    created_at = datetime.now(timezone.utc).isoformat()
+
+def _unbump_subject_trending(
+    cur, rating_key: int, weight: float, created_at: str, *, subject_key: str | None = None
+) -> None:
+    """
+    Removes one weighted event, added at `created_at`, from the subject of
+    `rating_key` (or from `subject_key`, when the rating has since moved);
+    the row goes with its last event. Like the bump, runs inside the caller's
+    write transaction and before the rating itself is deleted.
+    """
+    if subject_key is None:
+        cur.execute(
+            f"SELECT {_subject_key_sql()} FROM ratings WHERE rating_key = ?",
+            (int(rating_key),),
+        )
+        row = cur.fetchone()
+        if not row or not row[0]:
+            return
+        subject_key = row[0]
+    cur.execute(
+        "SELECT score_log, event_count FROM subject_trending WHERE subject_key = ?",
+        (subject_key,),
+    )
+    existing = cur.fetchone()
+    if not existing:
+        return
+    score_log, event_count = float(existing[0]), int(existing[1] or 0)
+    term = math.log(weight) + _trending_decay_rate() * _epoch_seconds(created_at)
+    if event_count <= 1 or term >= score_log:
+        cur.execute("DELETE FROM subject_trending WHERE subject_key = ?", (subject_key,))
+        return
     cur.execute(
         """
-        INSERT OR IGNORE INTO rating_likes (rating_key, user_id, created_at)
-        VALUES (?,?,?)
+        UPDATE subject_trending
+        SET score_log = ?, event_count = event_count - 1
+        WHERE subject_key = ?
         """,
-        (int(rating_key), int(user_id), created_at),
+        # log(exp(score_log) - exp(term))
+        (score_log + math.log(-math.expm1(term - score_log)), subject_key),
     )
-    conn.commit()
-    conn.close()
-    return True
 
 
-def get_liked_ratings_for_user(user_id: int, limit: int = 200, offset: int = 0):
-    conn = get_db_connection()
-    cur = conn.cursor()
+def _net_trending_events(rows) -> list:
+    """
+    Activity rows (action, actor_user_id, entity_id, ...) in order, minus
+    reversal actions and the earlier events they took back.
+    """
+    kept: list = []
+    latest: dict[tuple, int] = {}
+    for row in rows:
+        action, actor_user_id, entity_id = row[0], row[1], row[2]
+        reversed_action = TRENDING_REVERSALS.get(action)
+        if reversed_action:
+            index = latest.pop((reversed_action, actor_user_id, entity_id), None)
+            if index is not None:
+                kept[index] = None
+            continue
+        latest[(action, actor_user_id, entity_id)] = len(kept)
+        kept.append(row)
+    return [row for row in kept if row is not None]
+
+
+def _rating_trending_events(cur, rating_key: int) -> list:
+    """Net trending events recorded against `rating_key`, oldest first."""
+    actions = sorted(set(TRENDING_WEIGHTS) | set(TRENDING_REVERSALS))
     cur.execute(
-        """
-        SELECT
-            r.rating_key,
-            r.rating_type,
-            r.rating_name,
-            r.lyrics_rating,
-            r.beat_rating,
-            r.flow_rating,
-            r.melody_rating,
-            r.cohesive_rating,
-            r.user,
-            r.image_url
-        FROM rating_likes rl
-        JOIN ratings r
-            ON r.rating_key = rl.rating_key
-        WHERE rl.user_id = ?
-        ORDER BY rl.rating_like_id DESC
-        LIMIT ?
-        OFFSET ?
+        f"""
+        SELECT action, actor_user_id, entity_id, created_at
+        FROM activity
+        WHERE entity_type = 'rating'
+          AND entity_id = ?
+          AND action IN ({",".join(["?"] * len(actions))})
+        ORDER BY activity_id ASC
         """,
-        (int(user_id), int(limit), int(offset)),
+        (int(rating_key), *actions),
     )
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    return _net_trending_events(cur.fetchall())
 
 
-def get_upvoted_ratings_for_user(user_id: int, limit: int = 200, offset: int = 0):
+def rebuild_subject_trending() -> int:
+    """
+    Recomputes subject_trending from activity history and swaps it in.
+    Only needed for the initial backfill or after changing the half-life;
+    regular updates happen incrementally in add_activity.
+    Returns the number of subjects written.
+    """
+    actions = sorted(set(TRENDING_WEIGHTS) | set(TRENDING_REVERSALS))
+    placeholders = ",".join(["?"] * len(actions))
+    decay_rate = _trending_decay_rate()
+
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
-        """
+        f"""
         SELECT
-            r.rating_key,
-            r.rating_type,
+            a.action,
+            a.actor_user_id,
+            a.entity_id,
+            a.created_at,
+            {_subject_key_sql("r.")},
+            LOWER(TRIM(r.rating_type)),
             r.rating_name,
-            r.lyrics_rating,
-            r.beat_rating,
-            r.flow_rating,
-            r.melody_rating,
-            r.cohesive_rating,
-            r.user,
-            r.lyrics_reason,
-            r.beat_reason,
-            r.flow_reason,
-            r.melody_reason,
-            r.cohesive_reason
-        FROM rating_category_votes rcv
+            r.content_info_artist,
+            r.mbid,
+            r.image_url
+        FROM activity a
         JOIN ratings r
-            ON r.rating_key = rcv.rating_key
-        WHERE rcv.user_id = ?
-          AND rcv.vote = 1
-        GROUP BY r.rating_key
-        ORDER BY
-            (MAX(rcv.updated_at) IS NULL) ASC,
-            MAX(rcv.updated_at) DESC,
-            r.rating_key DESC
-        LIMIT ?
-        OFFSET ?
+            ON r.rating_key = a.entity_id
+        WHERE a.action IN ({placeholders})
+          AND a.entity_type = 'rating'
+        ORDER BY a.activity_id ASC
         """,
-        (int(user_id), int(limit), int(offset)),
+        tuple(actions),
     )
-    rows = cur.fetchall()
+
+    subjects: dict[str, dict[str, Any]] = {}
+    for (
+        action,
+        _actor_user_id,
+        _entity_id,
+        created_at,
+        subject_key,
+        kind,
+        name,
+        artist,
+        mbid,
+        image_url,
+    ) in _net_trending_events(cur.fetchall()):
+        if not subject_key:
+            continue
+        term = math.log(TRENDING_WEIGHTS[action]) + decay_rate * _epoch_seconds(created_at)
+        entry = subjects.setdefault(
+            subject_key,
+            {"kind": kind or "", "score_log": None, "event_count": 0, "mbid": None, "image_url": None},
+        )
+        entry["score_log"] = _log_add(entry["score_log"], term)
+        entry["event_count"] += 1
+        entry["rating_name"] = name
+        entry["content_artist"] = artist if kind != "artist" else None
+        entry["mbid"] = (mbid or "").strip() or entry["mbid"]
+        entry["image_url"] = (image_url or "").strip() or entry["image_url"]
+        entry["updated_at"] = created_at
+
+    cur.execute("DELETE FROM subject_trending")
+    cur.executemany(
+        """
+        INSERT INTO subject_trending (
+            subject_key, kind, rating_name, content_artist, mbid, image_url,
+            score_log, event_count, updated_at
+        )
+        VALUES (?,?,?,?,?,?,?,?,?)
+        """,
+        [
+            (
+                key,
+                e["kind"],
+                e["rating_name"],
+                e["content_artist"],
+                e["mbid"],
+                e["image_url"],
+                e["score_log"],
+                e["event_count"],
+                e["updated_at"],
+            )
+            for key, e in subjects.items()
+        ],
+    )
+    conn.commit()
     conn.close()
-    return rows
+    return len(subjects)
 
 
-def get_upvoted_categories_for_user_ratings(
-    user_id: int,
-    rating_keys: list[int],
-) -> dict[int, list[str]]:
-    if not rating_keys:
-        return {}
+def backfill_subject_trending() -> None:
+    """Seeds subject_trending from history the first time it is empty."""
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT 1 FROM subject_trending LIMIT 1")
+    has_rows = cur.fetchone() is not None
+    conn.close()
+    if not has_rows:
+        rebuild_subject_trending()
 
-    keys = [int(k) for k in rating_keys]
-    placeholders = ",".join(["?"] * len(keys))
+
+def get_trending_subjects(kind: Optional[str] = None, limit: int = 20) -> list[dict[str, Any]]:
+    """
+    Top subjects by decayed activity score. This is an index range scan over
+    subject_trending; activity history is never read here.
+    """
+    kind = (kind or "").strip().lower()
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        limit = 20
+    limit = max(1, min(100, limit))
 
     conn = get_db_connection()
     cur = conn.cursor()
-    cur.execute(
-        f"""
-        SELECT rating_key, category
-        FROM rating_category_votes
-        WHERE user_id = ?
-          AND vote = 1
-          AND rating_key IN ({placeholders})
-        ORDER BY
-            (updated_at IS NULL) ASC,
-            updated_at DESC,
-            category ASC
-        """,
-        tuple([int(user_id)] + keys),
-    )
+    if kind in {"song", "album", "artist"}:
+        cur.execute(
+            """
+            SELECT kind, rating_name, content_artist, mbid, image_url, score_log, event_count
+            FROM subject_trending
+            WHERE kind = ?
+            ORDER BY score_log DESC
+            LIMIT ?
+            """,
+            (kind, limit),
+        )
+    else:
+        cur.execute(
+            """
+            SELECT kind, rating_name, content_artist, mbid, image_url, score_log, event_count
+            FROM subject_trending
+            ORDER BY score_log DESC
+            LIMIT ?
+            """,
+            (limit,),
+        )
     rows = cur.fetchall()
     conn.close()
 
-    result: dict[int, list[str]] = {}
-    for rating_key, category in rows:
-        rk = int(rating_key)
-        cat = (category or "").strip()
-        if not cat:
-            continue
-        result.setdefault(rk, [])
-        if cat not in result[rk]:
-            result[rk].append(cat)
-
-    return result
+    now_term = _trending_decay_rate() * datetime.now(timezone.utc).timestamp()
+    out: list[dict[str, Any]] = []
+    for row_kind, name, artist, mbid, image_url, score_log, event_count in rows or []:
+        try:
+            score = math.exp(float(score_log) - now_term)
+        except (TypeError, ValueError, OverflowError):
+            score = 0.0
+        out.append(
+            {
+                "kind": row_kind or "",
+                "name": name or "",
+                "artist": artist or "",
+                "mbid": (mbid or "").strip() or None,
+                "image_url": (image_url or "").strip() or None,
+                "score": round(score, 3),
+                "event_count": int(event_count or 0),
+            }
+        )
+    return out
 
 
 ###############################################
-# Rating Category Votes
+# Leaderboards
 ###############################################
 
+# Snapshot boards refreshed by the background job started in create_app().
+LEADERBOARDS: list[dict[str, str]] = [
+    {"key": "top_raters", "label": "Top raters", "value_label": "ratings"},
+    {"key": "most_followed", "label": "Most followed", "value_label": "followers"},
+    {"key": "most_liked", "label": "Most liked ratings", "value_label": "likes"},
+    {"key": "most_upvoted", "label": "Most upvoted ratings", "value_label": "upvotes"},
+    {"key": "best_lyrics", "label": "Best lyrics", "value_label": "avg"},
+    {"key": "best_beat", "label": "Best beat", "value_label": "avg"},
+    {"key": "best_flow", "label": "Best flow", "value_label": "avg"},
+    {"key": "best_melody", "label": "Best melody", "value_label": "avg"},
+    {"key": "best_cohesive", "label": "Best cohesive", "value_label": "avg"},
+]
 
-def set_rating_category_vote(
-    rating_key: int,
-    user_id: int,
-    category: str,
-    vote: int,
-) -> None:
-
-    category = (category or "").strip()
-    if not category:
-        return
-
-    try:
-        vote_int = int(vote)
-    except (TypeError, ValueError):
-        return
+_LEADERBOARD_JOB_KEY = "__refresh__"
 
-    if vote_int not in (-1, 0, 1):
-        return
 
-    conn = get_db_connection()
-    cur = conn.cursor()
+def _leaderboard_rows(cur, board: str, size: int, min_ratings: int) -> list[tuple]:
+    """
+    Computes one board. Rows are
+    (entity_type, entity_id, label, sublabel, image_url, url, value, value_count).
+    """
+    if board == "top_raters":
+        cur.execute(
+            """
+            SELECT ui.user_info_key, ui.username, ui.profile_pic, t.c
+            FROM (
+                SELECT LOWER(TRIM(user)) AS u, COUNT(1) AS c
+                FROM ratings
+                WHERE user IS NOT NULL
+                GROUP BY u
+            ) t
+            JOIN user_info ui
+                ON LOWER(TRIM(ui.username)) = t.u
+            ORDER BY t.c DESC, ui.username COLLATE NOCASE ASC
+            LIMIT ?
+            """,
+            (size,),
+        )
+        return [
+            ("user", uid, f"@{username}", None, pic, f"/user/{username}", c, c)
+            for uid, username, pic, c in cur.fetchall()
+        ]
 
-    if vote_int == 0:
+    if board == "most_followed":
         cur.execute(
             """
-            DELETE FROM rating_category_votes
-            WHERE rating_key = ? AND user_id = ? AND category = ?
+            SELECT ui.user_info_key, ui.username, ui.profile_pic, t.c
+            FROM (
+                SELECT user_followed_key AS uid, COUNT(DISTINCT followed_by_user_key) AS c
+                FROM follow_info
+                WHERE unfollowed IS NULL OR unfollowed = 0
+                GROUP BY user_followed_key
+            ) t
+            JOIN user_info ui
+                ON ui.user_info_key = t.uid
+            ORDER BY t.c DESC, ui.username COLLATE NOCASE ASC
+            LIMIT ?
             """,
-            (int(rating_key), int(user_id), category),
+            (size,),
         )
-        conn.commit()
-        conn.close()
-        return
+        return [
+            ("user", uid, f"@{username}", None, pic, f"/user/{username}", c, c)
+            for uid, username, pic, c in cur.fetchall()
+        ]
+
+    if board in {"most_liked", "most_upvoted"}:
+        if board == "most_liked":
+            counts_sql = """
+                SELECT rating_key, COUNT(1) AS c
+                FROM rating_likes
+                GROUP BY rating_key
+            """
+        else:
+            counts_sql = """
+                SELECT rating_key, SUM(CASE WHEN vote = 1 THEN 1 ELSE 0 END) AS c
+                FROM rating_category_votes
+                GROUP BY rating_key
+            """
+        cur.execute(
+            f"""
+            SELECT r.rating_key, r.rating_type, r.rating_name, r.user, r.image_url, t.c
+            FROM ({counts_sql}) t
+            JOIN ratings r
+                ON r.rating_key = t.rating_key
+            WHERE t.c > 0
+            ORDER BY t.c DESC, r.rating_key DESC
+            LIMIT ?
+            """,
+            (size,),
+        )
+        return [
+            (
+                "rating",
+                rk,
+                f"{rating_type}: {rating_name}".strip(": "),
+                f"by @{user}" if user else None,
+                image_url,
+                f"/rating/{rk}",
+                c,
+                c,
+            )
+            for rk, rating_type, rating_name, user, image_url, c in cur.fetchall()
+        ]
+
+    if board.startswith("best_"):
+        category = board[len("best_"):]
+        if category not in {"lyrics", "beat", "flow", "melody", "cohesive"}:
+            return []
+        col = f"{category}_rating"
+        cur.execute(
+            f"""
+            SELECT
+                MAX(rating_type),
+                MAX(rating_name),
+                MAX(COALESCE(content_info_artist, '')),
+                MAX(image_url),
+                MIN(rating_key),
+                AVG(CAST({col} AS REAL)) AS avg_score,
+                COUNT(1) AS c
+            FROM ratings
+            WHERE {col} IS NOT NULL AND TRIM({col}) != ''
+            GROUP BY {_subject_key_sql()}
+            HAVING COUNT(1) >= ?
+            ORDER BY avg_score DESC, c DESC
+            LIMIT ?
+            """,
+            (int(min_ratings), size),
+        )
+        out = []
+        for rating_type, rating_name, artist, image_url, rk, avg_score, c in cur.fetchall():
+            out.append(
+                (
+                    "subject",
+                    rk,
+                    f"{rating_type}: {rating_name}".strip(": "),
+                    artist or None,
+                    image_url,
+                    f"/rating/{rk}",
+                    round(float(avg_score or 0), 2),
+                    c,
+                )
+            )
+        return out
+
+    return []
 
-    updated_at = datetime.now(timezone.utc).isoformat()
 
+def refresh_leaderboards(size: int = 100) -> int:
+    """
+    Recomputes every board into a new generation and swaps it in atomically.
+    Returns the new generation number.
+    """
     try:
-        cur.execute(
+        min_ratings = int(os.environ.get("LEADERBOARD_MIN_RATINGS") or "2")
+    except ValueError:
+        min_ratings = 2
+    min_ratings = max(1, min_ratings)
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+
+    # Aggregations run before the write transaction so readers are never blocked
+    # on them.
+    snapshot = {
+        b["key"]: _leaderboard_rows(cur, b["key"], int(size), min_ratings)
+        for b in LEADERBOARDS
+    }
+
+    cur.execute("SELECT COALESCE(MAX(generation), 0) FROM leaderboard_entries")
+    row = cur.fetchone()
+    generation = int(row[0] or 0) + 1
+    refreshed_at = datetime.now(timezone.utc).isoformat()
+
+    for board, rows in snapshot.items():
+        cur.executemany(
             """
-            INSERT INTO rating_category_votes (rating_key, user_id, category, vote, updated_at)
-            VALUES (?,?,?,?,?)
-            ON CONFLICT(rating_key, user_id, category)
-            DO UPDATE SET vote = excluded.vote, updated_at = excluded.updated_at
+            INSERT INTO leaderboard_entries (
+                generation, board, rank, entity_type, entity_id, label,
+                sublabel, image_url, url, value, value_count
+            )
+            VALUES (?,?,?,?,?,?,?,?,?,?,?)
             """,
-            (int(rating_key), int(user_id), category, int(vote_int), updated_at),
+            [(generation, board, i + 1, *r) for i, r in enumerate(rows)],
         )
-    except sqlite3.OperationalError:
         cur.execute(
             """
-            UPDATE rating_category_votes
-            SET vote = ?, updated_at = ?
-            WHERE rating_key = ? AND user_id = ? AND category = ?
+            INSERT OR REPLACE INTO leaderboard_meta (board, generation, refreshed_at)
+            VALUES (?,?,?)
             """,
-            (int(vote_int), updated_at, int(rating_key), int(user_id), category),
+            (board, generation, refreshed_at),
         )
-        if (cur.rowcount or 0) == 0:
-            cur.execute(
-                """
-                INSERT INTO rating_category_votes (rating_key, user_id, category, vote, updated_at)
-                VALUES (?,?,?,?,?)
-                """,
-                (int(rating_key), int(user_id), category, int(vote_int), updated_at),
-            )
-
+    cur.execute(
+        "DELETE FROM leaderboard_entries WHERE generation < ?",
+        (generation,),
+    )
     conn.commit()
     conn.close()
+    return generation
 
 
-def get_rating_category_votes_summary(rating_key: int) -> dict[str, dict[str, int]]:
-
+def claim_leaderboard_refresh(max_age_seconds: int) -> bool:
+    """
+    Returns True if this caller should run the refresh now. Several workers may
+    run the refresh loop; only the one that wins this update does the work.
+    """
+    now = datetime.now(timezone.utc)
+    cutoff = datetime.fromtimestamp(now.timestamp() - max(1, int(max_age_seconds)), timezone.utc)
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
         """
-        SELECT
-            category,
-            COALESCE(SUM(vote), 0) AS score,
-            COALESCE(SUM(CASE WHEN vote = 1 THEN 1 ELSE 0 END), 0) AS up,
-            COALESCE(SUM(CASE WHEN vote = -1 THEN 1 ELSE 0 END), 0) AS down
-        FROM rating_category_votes
-        WHERE rating_key = ?
-        GROUP BY category
+        INSERT OR IGNORE INTO leaderboard_meta (board, generation, refreshed_at)
+        VALUES (?, 0, NULL)
         """,
-        (int(rating_key),),
+        (_LEADERBOARD_JOB_KEY,),
     )
-    rows = cur.fetchall()
-    conn.close()
-
-    out: dict[str, dict[str, int]] = {}
-    for category, score, up, down in rows:
-        out[str(category)] = {
-            "score": int(score) if score is not None else 0,
-            "up": int(up) if up is not None else 0,
-            "down": int(down) if down is not None else 0,
-        }
-    return out
+    cur.execute(
+        """
+        UPDATE leaderboard_meta
+        SET refreshed_at = ?
+        WHERE board = ?
+          AND (refreshed_at IS NULL OR refreshed_at <= ?)
+        """,
+        (now.isoformat(), _LEADERBOARD_JOB_KEY, cutoff.isoformat()),
+    )
+    claimed = (cur.rowcount or 0) > 0
+    conn.commit()
+    conn.close()
+    return claimed
 
 
-def get_user_rating_category_votes(rating_key: int, user_id: int) -> dict[str, int]:
+def get_leaderboard(board: str, limit: int = 20, offset: int = 0) -> dict[str, Any]:
+    """Reads a board from the current snapshot."""
+    board = (board or "").strip().lower()
     conn = get_db_connection()
     cur = conn.cursor()
+    cur.execute(
+        "SELECT generation, refreshed_at FROM leaderboard_meta WHERE board = ?",
+        (board,),
+    )
+    meta = cur.fetchone()
+    if not meta:
+        conn.close()
+        return {"board": board, "refreshed_at": None, "items": []}
+
+    generation, refreshed_at = meta
     cur.execute(
         """
-        SELECT category, vote
-        FROM rating_category_votes
-        WHERE rating_key = ? AND user_id = ?
+        SELECT rank, entity_type, entity_id, label, sublabel, image_url, url, value, value_count
+        FROM leaderboard_entries
+        WHERE generation = ? AND board = ?
+        ORDER BY rank ASC
+        LIMIT ?
+        OFFSET ?
         """,
-        (int(rating_key), int(user_id)),
+        (int(generation), board, int(limit), int(offset)),
     )
     rows = cur.fetchall()
     conn.close()
 
-    out: dict[str, int] = {}
-    for category, vote in rows:
-        try:
-            out[str(category)] = int(vote)
-        except (TypeError, ValueError):
-            continue
-    return out
+    items = []
+    for rank, entity_type, entity_id, label, sublabel, image_url, url, value, value_count in rows:
+        items.append(
+            {
+                "rank": int(rank),
+                "entity_type": entity_type,
+                "entity_id": entity_id,
+                "label": label or "",
+                "sublabel": sublabel or "",
+                "image_url": (image_url or "").strip() or None,
+                "url": url,
+                "value": value,
+                "value_count": int(value_count or 0),
+            }
+        )
+    return {"board": board, "refreshed_at": refreshed_at, "items": items}
 
 
-def get_category_vote_totals_for_ratings(
-    rating_keys: list[int],
-) -> dict[int, dict[str, int]]:
-    """
-    Bulk up/down totals per rating across all categories.
-    Returns: { rating_key: {"up": int, "down": int}, ... }
-    """
-    keys = [int(k) for k in (rating_keys or []) if k is not None]
-    if not keys:
-        return {}
-    keys = sorted(set(keys))
-    placeholders = ",".join(["?"] * len(keys))
+# Update an existing rating
+def update_rating(
+    rating_key,
+    rating_type,
+    rating_name,
+    lyrics_rating,
+    lyrics_reason,
+    beat_rating,
+    beat_reason,
+    flow_rating,
+    flow_reason,
+    melody_rating,
+    melody_reason,
+    cohesive_rating,
+    cohesive_reason,
+    image_url=None,
+    mbid: str | None = None,
+    mb_url: str | None = None,
+    content_artist: str | None = None,
+):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        f"SELECT {_subject_key_sql()} FROM ratings WHERE rating_key = ?",
+        (rating_key,),
+    )
+    row = cur.fetchone()
+    old_subject_key = row[0] if row else None
+    cur.execute(
+        "UPDATE ratings SET rating_type = ?, rating_name = ?, lyrics_rating = ?, lyrics_reason = ?, beat_rating = ?, beat_reason = ?, flow_rating = ?, flow_reason = ?, melody_rating = ?, melody_reason = ?, cohesive_rating = ?, cohesive_reason = ?, image_url = ?, mbid = ?, mb_url = ?, content_info_artist = ? WHERE rating_key = ?",
+        (
+            rating_type,
+            rating_name,
+            lyrics_rating,
+            lyrics_reason,
+            beat_rating,
+            beat_reason,
+            flow_rating,
+            flow_reason,
+            melody_rating,
+            melody_reason,
+            cohesive_rating,
+            cohesive_reason,
+            image_url,
+            (mbid or "").strip() or None,
+            (mb_url or "").strip() or None,
+            ((content_artist or "").strip()[:50]) or None,
+            rating_key,
+        ),
+    )
+    cur.execute(
+        f"SELECT {_subject_key_sql()} FROM ratings WHERE rating_key = ?",
+        (rating_key,),
+    )
+    row = cur.fetchone()
+    if row and row[0] != old_subject_key:
+        # The edit moved the rating to another subject; its trending events go with it.
+        for action, _actor_user_id, _entity_id, created_at in _rating_trending_events(cur, rating_key):
+            weight = TRENDING_WEIGHTS[action]
+            if old_subject_key:
+                _unbump_subject_trending(cur, rating_key, weight, created_at, subject_key=old_subject_key)
+            _bump_subject_trending(cur, rating_key, weight, created_at)
+    conn.commit()
+    conn.close()
+
 
+# Delete a rating
+def delete_rating(rating_key):
     conn = get_db_connection()
     cur = conn.cursor()
+    cur.execute("SELECT user FROM ratings WHERE rating_key = ?", (rating_key,))
+    row = cur.fetchone()
+    author = row[0] if row else None
     cur.execute(
-        f"""
-        SELECT
-          rating_key,
-          COALESCE(SUM(CASE WHEN vote = 1 THEN 1 ELSE 0 END), 0) AS up,
-          COALESCE(SUM(CASE WHEN vote = -1 THEN 1 ELSE 0 END), 0) AS down
-        FROM rating_category_votes
-        WHERE rating_key IN ({placeholders})
-        GROUP BY rating_key
+        """
+        UPDATE user_info
+        SET likes_given_count = MAX(0, likes_given_count - 1)
+        WHERE user_info_key IN (SELECT user_id FROM rating_likes WHERE rating_key = ?)
         """,
-        tuple(keys),
+        (rating_key,),
     )
-    rows = cur.fetchall()
+    cur.execute("DELETE FROM rating_comments WHERE rating_key = ?", (rating_key,))
+    cur.execute("DELETE FROM rating_likes WHERE rating_key = ?", (rating_key,))
+    likes_removed = cur.rowcount or 0
+    cur.execute("DELETE FROM rating_category_votes WHERE rating_key = ?", (rating_key,))
+    # Take the rating's events back out of its subject's trending score.
+    for action, _actor_user_id, _entity_id, created_at in _rating_trending_events(cur, rating_key):
+        _unbump_subject_trending(cur, rating_key, TRENDING_WEIGHTS[action], created_at)
+    cur.execute("DELETE FROM ratings WHERE rating_key = ?", (rating_key,))
+    if cur.rowcount:
+        _bump_user_counter(cur, "rating_count", -1, username=author)
+        _bump_user_counter(cur, "likes_received_count", -likes_removed, username=author)
+        _bump_site_counter(cur, "ratings", -1)
+    conn.commit()
     conn.close()
 
-    out: dict[int, dict[str, int]] = {}
-    for rating_key, up, down in rows or []:
-        try:
-            rk = int(rating_key)
-        except (TypeError, ValueError):
-            continue
-        try:
-            up_i = int(up or 0)
-        except (TypeError, ValueError):
-            up_i = 0
-        try:
-            down_i = int(down or 0)
-        except (TypeError, ValueError):
-            down_i = 0
-        out[rk] = {"up": max(0, up_i), "down": max(0, down_i)}
-    return out
-
 
 ###############################################
-# Rating Reactions (Discord-like emoji reactions)
+# Rating Likes
 ###############################################
 
 
-def get_rating_reactions_summary(rating_key: int) -> dict[str, list[dict[str, Any]]]:
-    """
-    Returns aggregated emoji counts per category.
-    Shape: { "Lyrics": [{"emoji":"🔥","count":3}, ...], ... }
-    """
+def is_rating_liked_by_user(rating_key: int, user_id: int) -> bool:
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
         """
-        SELECT category, emoji, COUNT(1) AS c
-        FROM rating_reactions
-        WHERE rating_key = ?
-        GROUP BY category, emoji
-        ORDER BY category ASC, c DESC, emoji ASC
+        SELECT 1
+        FROM rating_likes
+        WHERE rating_key = ? AND user_id = ?
+        LIMIT 1
         """,
-        (int(rating_key),),
+        (int(rating_key), int(user_id)),
     )
-    rows = cur.fetchall()
+    row = cur.fetchone()
     conn.close()
-
-    out: dict[str, list[dict[str, Any]]] = {}
-    for category, emoji, c in rows or []:
-        cat = str(category or "")
-        em = str(emoji or "")
-        if not cat or not em:
-            continue
-        out.setdefault(cat, []).append({"emoji": em, "count": int(c or 0)})
-    return out
+    return bool(row)
 
 
-def get_user_rating_reactions(rating_key: int, user_id: int) -> dict[str, set[str]]:
-    """
-    Returns the reactions a user has applied for a rating.
-    Shape: { "Lyrics": {"🔥","👏"}, ... }
-    """
+def get_rating_like_count(rating_key: int) -> int:
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
         """
-        SELECT category, emoji
-        FROM rating_reactions
-        WHERE rating_key = ? AND user_id = ?
+        SELECT COUNT(*)
+        FROM rating_likes
+        WHERE rating_key = ?
         """,
-        (int(rating_key), int(user_id)),
+        (int(rating_key),),
     )
-    rows = cur.fetchall()
+    row = cur.fetchone()
     conn.close()
+    return int(row[0]) if row and row[0] is not None else 0
 
-    out: dict[str, set[str]] = {}
-    for category, emoji in rows or []:
-        cat = str(category or "")
-        em = str(emoji or "")
-        if not cat or not em:
-            continue
-        out.setdefault(cat, set()).add(em)
-    return out
-
-
-def toggle_rating_reaction(
-    rating_key: int, user_id: int, *, category: str, emoji: str
-) -> bool:
-    """
-    Toggles a reaction. Returns True if reaction is present after toggle.
-    """
-    category = (category or "").strip()
-    emoji = (emoji or "").strip()
-    if not category or not emoji:
-        return False
 
+def toggle_rating_like(rating_key: int, user_id: int) -> bool:
+    """Returns True if liked after toggle, False if unliked."""
     conn = get_db_connection()
     cur = conn.cursor()
 
     cur.execute(
         """
-        SELECT reaction_id
-        FROM rating_reactions
-        WHERE rating_key = ? AND user_id = ? AND category = ? AND emoji = ?
+        SELECT rating_like_id
+        FROM rating_likes
+        WHERE rating_key = ? AND user_id = ?
         LIMIT 1
         """,
-        (int(rating_key), int(user_id), category, emoji),
+        (int(rating_key), int(user_id)),
     )
     row = cur.fetchone()
-
+    cur.execute("SELECT user FROM ratings WHERE rating_key = ?", (int(rating_key),))
+    author_row = cur.fetchone()
+    author = author_row[0] if author_row else None
     if row:
         cur.execute(
-            "DELETE FROM rating_reactions WHERE reaction_id = ?",
+            "DELETE FROM rating_likes WHERE rating_like_id = ?",
             (int(row[0]),),
         )
+        _bump_user_counter(cur, "likes_given_count", -1, user_id=user_id)
+        _bump_user_counter(cur, "likes_received_count", -1, username=author)
         conn.commit()
         conn.close()
         return False
@@ -1930,1178 +2771,2159 @@ def toggle_rating_reaction(
     created_at = datetime.now(timezone.utc).isoformat()
     cur.execute(
         """
-        INSERT OR IGNORE INTO rating_reactions (rating_key, user_id, category, emoji, created_at)
-        VALUES (?,?,?,?,?)
+        INSERT OR IGNORE INTO rating_likes (rating_key, user_id, created_at)
+        VALUES (?,?,?)
         """,
-        (int(rating_key), int(user_id), category, emoji, created_at),
+        (int(rating_key), int(user_id), created_at),
     )
+    if cur.rowcount:
+        _bump_user_counter(cur, "likes_given_count", 1, user_id=user_id)
+        _bump_user_counter(cur, "likes_received_count", 1, username=author)
     conn.commit()
     conn.close()
     return True
 
 
-def get_reaction_counts_for_ratings(
-    rating_keys: list[int],
-) -> dict[int, list[tuple[str, int]]]:
-    """
-    Bulk reaction counts per rating, grouped by emoji (across all categories).
-    Returns: { rating_key: [(emoji, count), ...], ... }
-    """
-    keys = [int(k) for k in (rating_keys or []) if k is not None]
-    if not keys:
-        return {}
-
-    # De-dupe while keeping it simple.
-    keys = sorted(set(keys))
-    placeholders = ",".join(["?"] * len(keys))
-
+def get_liked_ratings_for_user(user_id: int, limit: int = 200, offset: int = 0):
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
-        f"""
-        SELECT rating_key, emoji, COUNT(1) AS c
-        FROM rating_reactions
-        WHERE rating_key IN ({placeholders})
-        GROUP BY rating_key, emoji
-        """,
-        tuple(keys),
+        """
+        SELECT
+            r.rating_key,
+            r.rating_type,
+            r.rating_name,
+            r.lyrics_rating,
+            r.beat_rating,
+            r.flow_rating,
+            r.melody_rating,
+            r.cohesive_rating,
+            r.user,
+            r.image_url
+        FROM rating_likes rl
+        JOIN ratings r
+            ON r.rating_key = rl.rating_key
+        WHERE rl.user_id = ?
+        ORDER BY rl.rating_like_id DESC
+        LIMIT ?
+        OFFSET ?
+        """,
+        (int(user_id), int(limit), int(offset)),
     )
     rows = cur.fetchall()
     conn.close()
+    return rows
 
-    out: dict[int, list[tuple[str, int]]] = {}
-    for rating_key, emoji, c in rows or []:
-        try:
-            rk = int(rating_key)
-        except (TypeError, ValueError):
-            continue
-        em = str(emoji or "").strip()
-        if not em:
+
+def get_upvoted_ratings_for_user(user_id: int, limit: int = 200, offset: int = 0):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT
+            r.rating_key,
+            r.rating_type,
+            r.rating_name,
+            r.lyrics_rating,
+            r.beat_rating,
+            r.flow_rating,
+            r.melody_rating,
+            r.cohesive_rating,
+            r.user,
+            r.lyrics_reason,
+            r.beat_reason,
+            r.flow_reason,
+            r.melody_reason,
+            r.cohesive_reason
+        FROM rating_category_votes rcv
+        JOIN ratings r
+            ON r.rating_key = rcv.rating_key
+        WHERE rcv.user_id = ?
+          AND rcv.vote = 1
+        GROUP BY r.rating_key
+        ORDER BY
+            (MAX(rcv.updated_at) IS NULL) ASC,
+            MAX(rcv.updated_at) DESC,
+            r.rating_key DESC
+        LIMIT ?
+        OFFSET ?
+        """,
+        (int(user_id), int(limit), int(offset)),
+    )
+    rows = cur.fetchall()
+    conn.close()
+    return rows
+
+
+def get_upvoted_categories_for_user_ratings(
+    user_id: int,
+    rating_keys: list[int],
+) -> dict[int, list[str]]:
+    if not rating_keys:
+        return {}
+
+    keys = [int(k) for k in rating_keys]
+    placeholders = ",".join(["?"] * len(keys))
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        SELECT rating_key, category
+        FROM rating_category_votes
+        WHERE user_id = ?
+          AND vote = 1
+          AND rating_key IN ({placeholders})
+        ORDER BY
+            (updated_at IS NULL) ASC,
+            updated_at DESC,
+            category ASC
+        """,
+        tuple([int(user_id)] + keys),
+    )
+    rows = cur.fetchall()
+    conn.close()
+
+    result: dict[int, list[str]] = {}
+    for rating_key, category in rows:
+        rk = int(rating_key)
+        cat = (category or "").strip()
+        if not cat:
             continue
-        try:
-            cnt = int(c or 0)
-        except (TypeError, ValueError):
-            cnt = 0
-        out.setdefault(rk, []).append((em, cnt))
-    return out
+        result.setdefault(rk, [])
+        if cat not in result[rk]:
+            result[rk].append(cat)
+
+    return result
 
 
 ###############################################
-# Playlist Favorites
+# Rating Category Votes
 ###############################################
 
 
-def is_playlist_favorited_by_user(playlist_key: int, user_id: int) -> bool:
+def set_rating_category_vote(
+    rating_key: int,
+    user_id: int,
+    category: str,
+    vote: int,
+) -> None:
+
+    category = (category or "").strip()
+    if not category:
+        return
+
+    try:
+        vote_int = int(vote)
+    except (TypeError, ValueError):
+        return
+
+    if vote_int not in (-1, 0, 1):
+        return
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+
+    if vote_int == 0:
+        cur.execute(
+            """
+            DELETE FROM rating_category_votes
+            WHERE rating_key = ? AND user_id = ? AND category = ?
+            """,
+            (int(rating_key), int(user_id), category),
+        )
+        conn.commit()
+        conn.close()
+        return
+
+    updated_at = datetime.now(timezone.utc).isoformat()
+
+    try:
+        cur.execute(
+            """
+            INSERT INTO rating_category_votes (rating_key, user_id, category, vote, updated_at)
+            VALUES (?,?,?,?,?)
+            ON CONFLICT(rating_key, user_id, category)
+            DO UPDATE SET vote = excluded.vote, updated_at = excluded.updated_at
+            """,
+            (int(rating_key), int(user_id), category, int(vote_int), updated_at),
+        )
+    except sqlite3.OperationalError:
+        cur.execute(
+            """
+            UPDATE rating_category_votes
+            SET vote = ?, updated_at = ?
+            WHERE rating_key = ? AND user_id = ? AND category = ?
+            """,
+            (int(vote_int), updated_at, int(rating_key), int(user_id), category),
+        )
+        if (cur.rowcount or 0) == 0:
+            cur.execute(
+                """
+                INSERT INTO rating_category_votes (rating_key, user_id, category, vote, updated_at)
+                VALUES (?,?,?,?,?)
+                """,
+                (int(rating_key), int(user_id), category, int(vote_int), updated_at),
+            )
+
+    conn.commit()
+    conn.close()
+
+
+def get_rating_category_votes_summary(rating_key: int) -> dict[str, dict[str, int]]:
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT
+            category,
+            COALESCE(SUM(vote), 0) AS score,
+            COALESCE(SUM(CASE WHEN vote = 1 THEN 1 ELSE 0 END), 0) AS up,
+            COALESCE(SUM(CASE WHEN vote = -1 THEN 1 ELSE 0 END), 0) AS down
+        FROM rating_category_votes
+        WHERE rating_key = ?
+        GROUP BY category
+        """,
+        (int(rating_key),),
+    )
+    rows = cur.fetchall()
+    conn.close()
+
+    out: dict[str, dict[str, int]] = {}
+    for category, score, up, down in rows:
+        out[str(category)] = {
+            "score": int(score) if score is not None else 0,
+            "up": int(up) if up is not None else 0,
+            "down": int(down) if down is not None else 0,
+        }
+    return out
+
+
+def get_user_rating_category_votes(rating_key: int, user_id: int) -> dict[str, int]:
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT category, vote
+        FROM rating_category_votes
+        WHERE rating_key = ? AND user_id = ?
+        """,
+        (int(rating_key), int(user_id)),
+    )
+    rows = cur.fetchall()
+    conn.close()
+
+    out: dict[str, int] = {}
+    for category, vote in rows:
+        try:
+            out[str(category)] = int(vote)
+        except (TypeError, ValueError):
+            continue
+    return out
+
+
+def get_category_vote_totals_for_ratings(
+    rating_keys: list[int],
+) -> dict[int, dict[str, int]]:
+    """
+    Bulk up/down totals per rating across all categories.
+    Returns: { rating_key: {"up": int, "down": int}, ... }
+    """
+    keys = [int(k) for k in (rating_keys or []) if k is not None]
+    if not keys:
+        return {}
+    keys = sorted(set(keys))
+    placeholders = ",".join(["?"] * len(keys))
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        SELECT
+          rating_key,
+          COALESCE(SUM(CASE WHEN vote = 1 THEN 1 ELSE 0 END), 0) AS up,
+          COALESCE(SUM(CASE WHEN vote = -1 THEN 1 ELSE 0 END), 0) AS down
+        FROM rating_category_votes
+        WHERE rating_key IN ({placeholders})
+        GROUP BY rating_key
+        """,
+        tuple(keys),
+    )
+    rows = cur.fetchall()
+    conn.close()
+
+    out: dict[int, dict[str, int]] = {}
+    for rating_key, up, down in rows or []:
+        try:
+            rk = int(rating_key)
+        except (TypeError, ValueError):
+            continue
+        try:
+            up_i = int(up or 0)
+        except (TypeError, ValueError):
+            up_i = 0
+        try:
+            down_i = int(down or 0)
+        except (TypeError, ValueError):
+            down_i = 0
+        out[rk] = {"up": max(0, up_i), "down": max(0, down_i)}
+    return out
+
+
+###############################################
+# Rating Reactions (Discord-like emoji reactions)
+###############################################
+
+
+def get_rating_reactions_summary(rating_key: int) -> dict[str, list[dict[str, Any]]]:
+    """
+    Returns aggregated emoji counts per category.
+    Shape: { "Lyrics": [{"emoji":"🔥","count":3}, ...], ... }
+    """
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT category, emoji, COUNT(1) AS c
+        FROM rating_reactions
+        WHERE rating_key = ?
+        GROUP BY category, emoji
+        ORDER BY category ASC, c DESC, emoji ASC
+        """,
+        (int(rating_key),),
+    )
+    rows = cur.fetchall()
+    conn.close()
+
+    out: dict[str, list[dict[str, Any]]] = {}
+    for category, emoji, c in rows or []:
+        cat = str(category or "")
+        em = str(emoji or "")
+        if not cat or not em:
+            continue
+        out.setdefault(cat, []).append({"emoji": em, "count": int(c or 0)})
+    return out
+
+
+def get_user_rating_reactions(rating_key: int, user_id: int) -> dict[str, set[str]]:
+    """
+    Returns the reactions a user has applied for a rating.
+    Shape: { "Lyrics": {"🔥","👏"}, ... }
+    """
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT category, emoji
+        FROM rating_reactions
+        WHERE rating_key = ? AND user_id = ?
+        """,
+        (int(rating_key), int(user_id)),
+    )
+    rows = cur.fetchall()
+    conn.close()
+
+    out: dict[str, set[str]] = {}
+    for category, emoji in rows or []:
+        cat = str(category or "")
+        em = str(emoji or "")
+        if not cat or not em:
+            continue
+        out.setdefault(cat, set()).add(em)
+    return out
+
+
+def toggle_rating_reaction(
+    rating_key: int, user_id: int, *, category: str, emoji: str
+) -> bool:
+    """
+    Toggles a reaction. Returns True if reaction is present after toggle.
+    """
+    category = (category or "").strip()
+    emoji = (emoji or "").strip()
+    if not category or not emoji:
+        return False
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        SELECT reaction_id
+        FROM rating_reactions
+        WHERE rating_key = ? AND user_id = ? AND category = ? AND emoji = ?
+        LIMIT 1
+        """,
+        (int(rating_key), int(user_id), category, emoji),
+    )
+    row = cur.fetchone()
+
+    if row:
+        cur.execute(
+            "DELETE FROM rating_reactions WHERE reaction_id = ?",
+            (int(row[0]),),
+        )
+        conn.commit()
+        conn.close()
+        return False
+
+    created_at = datetime.now(timezone.utc).isoformat()
+    cur.execute(
+        """
+        INSERT OR IGNORE INTO rating_reactions (rating_key, user_id, category, emoji, created_at)
+        VALUES (?,?,?,?,?)
+        """,
+        (int(rating_key), int(user_id), category, emoji, created_at),
+    )
+    conn.commit()
+    conn.close()
+    return True
+
+
+def get_reaction_counts_for_ratings(
+    rating_keys: list[int],
+) -> dict[int, list[tuple[str, int]]]:
+    """
+    Bulk reaction counts per rating, grouped by emoji (across all categories).
+    Returns: { rating_key: [(emoji, count), ...], ... }
+    """
+    keys = [int(k) for k in (rating_keys or []) if k is not None]
+    if not keys:
+        return {}
+
+    # De-dupe while keeping it simple.
+    keys = sorted(set(keys))
+    placeholders = ",".join(["?"] * len(keys))
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        SELECT rating_key, emoji, COUNT(1) AS c
+        FROM rating_reactions
+        WHERE rating_key IN ({placeholders})
+        GROUP BY rating_key, emoji
+        """,
+        tuple(keys),
+    )
+    rows = cur.fetchall()
+    conn.close()
+
+    out: dict[int, list[tuple[str, int]]] = {}
+    for rating_key, emoji, c in rows or []:
+        try:
+            rk = int(rating_key)
+        except (TypeError, ValueError):
+            continue
+        em = str(emoji or "").strip()
+        if not em:
+            continue
+        try:
+            cnt = int(c or 0)
+        except (TypeError, ValueError):
+            cnt = 0
+        out.setdefault(rk, []).append((em, cnt))
+    return out
+
+
+###############################################
+# Playlist Favorites
+###############################################
+
+
+def is_playlist_favorited_by_user(playlist_key: int, user_id: int) -> bool:
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT 1
+        FROM playlist_likes
+        WHERE playlist_key = ? AND user_id = ?
+        LIMIT 1
+        """,
+        (int(playlist_key), int(user_id)),
+    )
+    row = cur.fetchone()
+    conn.close()
+    return bool(row)
+
+
+def toggle_playlist_favorite(playlist_key: int, user_id: int) -> bool:
+    conn = get_db_connection()
+    cur = conn.cursor()
+
+    cur.execute(
+        """
+        SELECT playlist_like_id
+        FROM playlist_likes
+        WHERE playlist_key = ? AND user_id = ?
+        LIMIT 1
+        """,
+        (int(playlist_key), int(user_id)),
+    )
+    row = cur.fetchone()
+    if row:
+        cur.execute(
+            "DELETE FROM playlist_likes WHERE playlist_like_id = ?",
+            (int(row[0]),),
+        )
+        conn.commit()
+        conn.close()
+        return False
+
+    created_at = datetime.now(timezone.utc).isoformat()
+    cur.execute(
+        """
+        INSERT OR IGNORE INTO playlist_likes (playlist_key, user_id, created_at)
+        VALUES (?,?,?)
+        """,
+        (int(playlist_key), int(user_id), created_at),
+    )
+    conn.commit()
+    conn.close()
+    return True
+
+
+def get_favorited_playlists_for_user(user_id: int, limit: int = 200, offset: int = 0):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT
+            p.playlist_key,
+            p.created_by,
+            p.playlist_title,
+            p.playlist_description
+        FROM playlist_likes pl
+        JOIN playlist_info p
+            ON p.playlist_key = pl.playlist_key
+        WHERE pl.user_id = ?
+        ORDER BY pl.playlist_like_id DESC
+        LIMIT ?
+        OFFSET ?
+        """,
+        (int(user_id), int(limit), int(offset)),
+    )
+    rows = cur.fetchall()
+    conn.close()
+    return rows
+
+
+###############################################
+# Playlists
+###############################################
+
+
+def add_playlist(created_by: str, title: str, description: str | None = None):
+    created_by = (created_by or "").strip()
+    title = (title or "").strip()
+    description = (description or "").strip()
+
+    if not created_by or not title:
+        return None
+
+    # Match schema VARCHAR(50)
+    title = title[:50]
+    description = description[:50]
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO playlist_info (
+            created_by,
+            playlist_title,
+            playlist_description,
+            songs_key,
+            upvotes,
+            downvotes
+        )
+        VALUES (?,?,?,?,?,?)
+        """,
+        (
+            created_by,
+            title,
+            description or None,
+            None,
+            0,
+            0,
+        ),
+    )
+    playlist_key = cur.lastrowid
+    _bump_user_counter(cur, "playlist_count", 1, username=created_by)
+    _bump_site_counter(cur, "playlists", 1)
+    conn.commit()
+    conn.close()
+    return int(playlist_key) if playlist_key is not None else None
+
+
+def get_playlists_by_creator(created_by: str, limit: int = 60, offset: int = 0):
+    created_by = (created_by or "").strip()
+    if not created_by:
+        return []
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT playlist_key, created_by, playlist_title, playlist_description
+        FROM playlist_info
+        WHERE created_by = ?
+        ORDER BY playlist_key DESC
+        LIMIT ?
+        OFFSET ?
+        """,
+        (created_by, int(limit), int(offset)),
+    )
+    rows = cur.fetchall()
+    conn.close()
+    return rows
+
+
+def get_playlists_by_following(user_id: int, limit: int = 200, offset: int = 0):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+                SELECT p.playlist_key, p.created_by, p.playlist_title, p.playlist_description
+                FROM playlist_info p
+                JOIN user_info u
+                    ON u.username = p.created_by
+                WHERE u.user_info_key IN (
+                        SELECT user_followed_key
+                        FROM follow_info
+                        WHERE followed_by_user_key = ?
+                            AND (unfollowed IS NULL OR unfollowed = 0)
+                )
+                ORDER BY p.playlist_key DESC
+                LIMIT ?
+                OFFSET ?
+                """,
+        (int(user_id), int(limit), int(offset)),
+    )
+    rows = cur.fetchall()
+    conn.close()
+    return rows
+
+
+def get_playlist_by_key(playlist_key: int):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT playlist_key, created_by, playlist_title, playlist_description
+        FROM playlist_info
+        WHERE playlist_key = ?
+        """,
+        (int(playlist_key),),
+    )
+    row = cur.fetchone()
+    conn.close()
+    return row
+
+
+def remove_song_from_playlist(playlist_key: int, song_key: int) -> bool:
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        DELETE FROM playlist_songs
+        WHERE playlist_key = ? AND song_key = ?
+        """,
+        (int(playlist_key), int(song_key)),
+    )
+    conn.commit()
+    removed = cur.rowcount
+    conn.close()
+    return bool(removed)
+
+
+def delete_playlist(playlist_key: int) -> bool:
+    conn = get_db_connection()
+    cur = conn.cursor()
+
+    cur.execute(
+        "SELECT created_by FROM playlist_info WHERE playlist_key = ?",
+        (int(playlist_key),),
+    )
+    row = cur.fetchone()
+    created_by = row[0] if row else None
+    cur.execute(
+        "DELETE FROM playlist_songs WHERE playlist_key = ?",
+        (int(playlist_key),),
+    )
+    cur.execute(
+        "DELETE FROM playlist_likes WHERE playlist_key = ?",
+        (int(playlist_key),),
+    )
+    cur.execute(
+        "DELETE FROM playlist_info WHERE playlist_key = ?",
+        (int(playlist_key),),
+    )
+    deleted = cur.rowcount
+    if deleted:
+        _bump_user_counter(cur, "playlist_count", -1, username=created_by)
+        _bump_site_counter(cur, "playlists", -1)
+    conn.commit()
+    conn.close()
+    return bool(deleted)
+
+
+def get_playlist_songs(playlist_key: int, limit: int = 500):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT s.song_key, s.song_title, s.artist_name, s.artist_link, s.song_link
+        FROM playlist_songs ps
+        JOIN song s ON s.song_key = ps.song_key
+        WHERE ps.playlist_key = ?
+        ORDER BY ps.playlist_songs_key DESC
+        LIMIT ?
+        """,
+        (int(playlist_key), int(limit)),
+    )
+    rows = cur.fetchall()
+    conn.close()
+    return rows
+
+
+def add_song_to_playlist(playlist_key: int, created_by: str, song_key: int):
+    created_by = (created_by or "").strip()
+    if not created_by:
+        return False
+
+    # Validate referenced song exists
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT song_key FROM song WHERE song_key = ?",
+        (int(song_key),),
+    )
+    row = cur.fetchone()
+    if not row:
+        conn.close()
+        return False
+
+    try:
+        cur.execute(
+            """
+            INSERT INTO playlist_songs (playlist_key, created_by, song_key)
+            VALUES (?,?,?)
+            """,
+            (int(playlist_key), created_by, int(song_key)),
+        )
+        conn.commit()
+    except sqlite3.IntegrityError:
+        conn.close()
+        return False
+
+    conn.close()
+    return True
+
+
+def add_song(
+    title: str,
+    artist_name: str | None = None,
+    artist_link: str | None = None,
+    song_link: str | None = None,
+    uploaded_by: str | None = None,
+):
+    title = (title or "").strip()
+    artist_name = (artist_name or "").strip()
+    artist_link = (artist_link or "").strip()
+    song_link = (song_link or "").strip()
+    uploaded_by = (uploaded_by or "").strip()
+    if not title:
+        return None
+
+    title = title[:50]
+    artist_name = artist_name[:50]
+    artist_link = artist_link[:500]
+    song_link = song_link[:500]
+    uploaded_by = uploaded_by[:50]
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO song (song_title, artist_name, artist_link, song_link, uploaded_by, upvotes, downvotes)
+        VALUES (?,?,?,?,?,?,?)
+        """,
+        (
+            title,
+            artist_name or None,
+            artist_link or None,
+            song_link or None,
+            uploaded_by or None,
+            0,
+            0,
+        ),
+    )
+    song_key = cur.lastrowid
+    conn.commit()
+    conn.close()
+    return int(song_key) if song_key is not None else None
+
+
+
+###############################################
+# User
+###############################################
+
+
+# User class for Flask-Login
+class User(UserMixin):
+    def __init__(
+        self,
+        user_id,
+        username,
+        email,
+        password_hash,
+        first_name=None,
+        last_name=None,
+        reviews=None,
+        likes_key=None,
+        bulletin_key=None,
+        upvotes=None,
+        downvotes=None,
+        cred=None,
+        followers_key=None,
+        following_key=None,
+        profile_pic=None,
+        about=None,
+    ):
+        self.id = user_id
+        self.username = username
+        self.email = email
+        self.password_hash = password_hash
+        self.first_name = first_name
+        self.last_name = last_name
+        self.reviews = reviews
+        self.likes_key = likes_key
+        self.bulletin_key = bulletin_key
+        self.upvotes = upvotes
+        self.downvotes = downvotes
+        self.profile_pic = profile_pic
+        self.cred = cred
+        self.followers_key = followers_key
+        self.following_key = following_key
+        self.about = about
+
+    def get_id(self):
+        return str(self.id)
+
+
+# Get user by ID
+def get_user_by_id(user_id):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT user_info_key, username, email, password, first_name, last_name, reviews, likes_key, bulletin_key, upvotes, downvotes, cred, followers_key, following_key, profile_pic, about FROM user_info WHERE user_info_key = ?",
+        (user_id,),
+    )
+    row = cur.fetchone()
+    conn.close()
+    return _row_to_user(row)
+
+
+# Get user by username or email
+def get_user_by_username_or_email(identifier):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT user_info_key, username, email, password, first_name, last_name, reviews, likes_key, bulletin_key, upvotes, downvotes, cred, followers_key, following_key, profile_pic, about FROM user_info WHERE username = ? OR email = ?",
+        (identifier, identifier),
+    )
+    row = cur.fetchone()
+    conn.close()
+    return _row_to_user(row)
+
+
+def get_user_by_username(username):
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
-        """
-        SELECT 1
-        FROM playlist_likes
-        WHERE playlist_key = ? AND user_id = ?
-        LIMIT 1
-        """,
-        (int(playlist_key), int(user_id)),
+        "SELECT user_info_key, username, email, password, first_name, last_name, reviews, likes_key, bulletin_key, upvotes, downvotes, cred, followers_key, following_key, profile_pic, about FROM user_info WHERE username = ?",
+        (username,),
     )
     row = cur.fetchone()
     conn.close()
-    return bool(row)
+    return _row_to_user(row)
 
 
-def toggle_playlist_favorite(playlist_key: int, user_id: int) -> bool:
+def _search_pattern(query):
+    tokens = [token for token in re.split(r"[\s\W_]+", query.strip()) if token]
+    return "%" + "%".join(tokens) + "%" if tokens else ""
+
+
+_FTS_TABLES_SEEN: set[str] = set()
+
+
+def _fts_available(cur, fts_table: str) -> bool:
+    # init_db() skips FTS tables when SQLite is built without FTS5.
+    if fts_table in _FTS_TABLES_SEEN:
+        return True
+    cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (fts_table,),
+    )
+    if cur.fetchone() is None:
+        return False
+    _FTS_TABLES_SEEN.add(fts_table)
+    return True
+
+
+def search_song_ratings(query, limit=20):
+    query = (query or "").strip()
+    if not query:
+        return []
     conn = get_db_connection()
     cur = conn.cursor()
-
+    pattern = _search_pattern(query)
     cur.execute(
         """
-        SELECT playlist_like_id
-        FROM playlist_likes
-        WHERE playlist_key = ? AND user_id = ?
-        LIMIT 1
+                SELECT rating_key, rating_type, rating_name, lyrics_rating, beat_rating, flow_rating, melody_rating, cohesive_rating, user, image_url
+        FROM ratings
+        WHERE rating_type = 'Song'
+          AND rating_name LIKE ? COLLATE NOCASE
+        ORDER BY rating_key DESC
+        LIMIT ?
         """,
-        (int(playlist_key), int(user_id)),
+        (pattern, int(limit)),
     )
-    row = cur.fetchone()
-    if row:
-        cur.execute(
-            "DELETE FROM playlist_likes WHERE playlist_like_id = ?",
-            (int(row[0]),),
-        )
-        conn.commit()
-        conn.close()
-        return False
+    rows = cur.fetchall()
+    conn.close()
+    return rows
 
-    created_at = datetime.now(timezone.utc).isoformat()
+
+def get_ratings_by_user(username):
+    if not username:
+        return []
+    conn = get_db_connection()
+    cur = conn.cursor()
     cur.execute(
         """
-        INSERT OR IGNORE INTO playlist_likes (playlist_key, user_id, created_at)
-        VALUES (?,?,?)
+        SELECT rating_key, rating_type, rating_name, lyrics_rating, beat_rating, flow_rating, melody_rating, cohesive_rating, user, image_url
+        FROM ratings
+        WHERE user = ? COLLATE NOCASE
+        ORDER BY rating_key DESC
         """,
-        (int(playlist_key), int(user_id), created_at),
+        (username,),
     )
-    conn.commit()
+    rows = cur.fetchall()
     conn.close()
-    return True
+    return rows
 
 
-def get_favorited_playlists_for_user(user_id: int, limit: int = 200, offset: int = 0):
+def get_ratings_by_user_paginated(username: str, limit: int = 60, offset: int = 0):
+    username = (username or "").strip()
+    if not username:
+        return []
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
         """
-        SELECT
-            p.playlist_key,
-            p.created_by,
-            p.playlist_title,
-            p.playlist_description
-        FROM playlist_likes pl
-        JOIN playlist_info p
-            ON p.playlist_key = pl.playlist_key
-        WHERE pl.user_id = ?
-        ORDER BY pl.playlist_like_id DESC
+        SELECT rating_key, rating_type, rating_name, lyrics_rating, beat_rating, flow_rating, melody_rating, cohesive_rating, user, image_url
+        FROM ratings
+        WHERE user = ? COLLATE NOCASE
+        ORDER BY rating_key DESC
         LIMIT ?
         OFFSET ?
         """,
-        (int(user_id), int(limit), int(offset)),
+        (username, int(limit), int(offset)),
     )
     rows = cur.fetchall()
     conn.close()
     return rows
 
 
-###############################################
-# Playlists
-###############################################
-
+# Converts DB row to User object
+def _row_to_user(row):
+    if not row:
+        return None
+    (
+        user_id,
+        username,
+        email,
+        password_hash,
+        first_name,
+        last_name,
+        reviews,
+        likes_key,
+        bulletin_key,
+        upvotes,
+        downvotes,
+        cred,
+        followers_key,
+        following_key,
+        profile_pic,
+        about,
+    ) = row
+    return User(
+        user_id,
+        username,
+        email,
+        password_hash,
+        first_name,
+        last_name,
+        reviews,
+        likes_key,
+        bulletin_key,
+        upvotes,
+        downvotes,
+        cred,
+        followers_key,
+        following_key,
+        profile_pic,
+        about,
+    )
 
-def add_playlist(created_by: str, title: str, description: str | None = None):
-    created_by = (created_by or "").strip()
-    title = (title or "").strip()
-    description = (description or "").strip()
 
-    if not created_by or not title:
-        return None
+# Check if username or email exists
+def username_or_email_exists(username, email):
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT 1 FROM user_info WHERE username = ? OR email = ? LIMIT 1",
+        (username, email),
+    )
+    exists = cur.fetchone() is not None
+    conn.close()
+    return exists
 
-    # Match schema VARCHAR(50)
-    title = title[:50]
-    description = description[:50]
 
+# Create a new user
+def create_user(username, email, password_plain):
+    if username_or_email_exists(username, email):
+        return None  # username or email is already taken
+    password_hash = generate_password_hash(password_plain)
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
-        """
-        INSERT INTO playlist_info (
-            created_by,
-            playlist_title,
-            playlist_description,
-            songs_key,
-            upvotes,
-            downvotes
-        )
-        VALUES (?,?,?,?,?,?)
-        """,
-        (
-            created_by,
-            title,
-            description or None,
-            None,
-            0,
-            0,
-        ),
+        "INSERT INTO user_info (username, email, password, profile_pic) VALUES (?,?,?,?)",
+        (username, email, password_hash, None),
     )
-    playlist_key = cur.lastrowid
+    user_id = cur.lastrowid
+    _bump_site_counter(cur, "users", 1)
     conn.commit()
     conn.close()
-    return int(playlist_key) if playlist_key is not None else None
+    return get_user_by_id(user_id)
 
 
-def get_playlists_by_creator(created_by: str, limit: int = 60, offset: int = 0):
-    created_by = (created_by or "").strip()
-    if not created_by:
-        return []
+def verify_password(stored_hash, password_plain):
+    return check_password_hash(stored_hash, password_plain)
+
+
+# Update the user's profile info
+def update_profile_info(user_id, username, about):
     conn = get_db_connection()
     cur = conn.cursor()
+    cur.execute("SELECT username FROM user_info WHERE user_info_key = ?", (user_id,))
+    row = cur.fetchone()
+    previous_username = row[0] if row else None
     cur.execute(
-        """
-        SELECT playlist_key, created_by, playlist_title, playlist_description
-        FROM playlist_info
-        WHERE created_by = ?
-        ORDER BY playlist_key DESC
-        LIMIT ?
-        OFFSET ?
-        """,
-        (created_by, int(limit), int(offset)),
+        "UPDATE user_info SET username = ?, about = ?  WHERE user_info_key = ?",
+        (username, about, user_id),
     )
-    rows = cur.fetchall()
+    if previous_username and previous_username != username:
+        cur.execute(
+            "UPDATE ratings SET user = ? WHERE user = ? COLLATE NOCASE",
+            (username, previous_username),
+        )
+        # Name-keyed counters (ratings, playlists, likes received) may shift.
+        _rebuild_user_counters(cur, user_id)
+    conn.commit()
     conn.close()
-    return rows
 
 
-def get_playlists_by_following(user_id: int, limit: int = 200, offset: int = 0):
+# Update the user's profile picture
+def update_profile_pic(user_id, profile_pic_path):
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
-        """
-                SELECT p.playlist_key, p.created_by, p.playlist_title, p.playlist_description
-                FROM playlist_info p
-                JOIN user_info u
-                    ON u.username = p.created_by
-                WHERE u.user_info_key IN (
-                        SELECT user_followed_key
-                        FROM follow_info
-                        WHERE followed_by_user_key = ?
-                            AND (unfollowed IS NULL OR unfollowed = 0)
-                )
-                ORDER BY p.playlist_key DESC
-                LIMIT ?
-                OFFSET ?
-                """,
-        (int(user_id), int(limit), int(offset)),
+        "UPDATE user_info SET profile_pic = ? WHERE user_info_key = ?",
+        (profile_pic_path, user_id),
     )
-    rows = cur.fetchall()
+    conn.commit()
     conn.close()
-    return rows
 
 
-def get_playlist_by_key(playlist_key: int):
+# Get profile picture from database using the username
+def get_profile_pic_by_username(username):
     conn = get_db_connection()
     cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT playlist_key, created_by, playlist_title, playlist_description
-        FROM playlist_info
-        WHERE playlist_key = ?
-        """,
-        (int(playlist_key),),
+    cur.execute(
+        "SELECT profile_pic FROM user_info WHERE username = ?",
+        (username,),
     )
     row = cur.fetchone()
     conn.close()
-    return row
+    return row[0] if row and row[0] else None
 
 
-def remove_song_from_playlist(playlist_key: int, song_key: int) -> bool:
+###############################################
+# Alerts
+###############################################
+
+
+def create_alert(
+    user_id: int,
+    message: str,
+    url: Optional[str] = None,
+    created_at: Optional[str] = None,
+):
+    if not user_id or not message:
+        return
+    created_at = created_at or datetime.now(timezone.utc).isoformat()
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
         """
-        DELETE FROM playlist_songs
-        WHERE playlist_key = ? AND song_key = ?
+        INSERT INTO alerts (user_id, message, url, created_at, is_read)
+        VALUES (?,?,?,?,0)
         """,
-        (int(playlist_key), int(song_key)),
+        (user_id, message, url, created_at),
     )
     conn.commit()
-    removed = cur.rowcount
     conn.close()
-    return bool(removed)
 
 
-def delete_playlist(playlist_key: int) -> bool:
+def get_alerts_for_user(
+    user_id: int,
+    limit: int = 10,
+    include_read: bool = False,
+    offset: int = 0,
+):
     conn = get_db_connection()
     cur = conn.cursor()
-
-    cur.execute(
-        "DELETE FROM playlist_songs WHERE playlist_key = ?",
-        (int(playlist_key),),
-    )
-    cur.execute(
-        "DELETE FROM playlist_likes WHERE playlist_key = ?",
-        (int(playlist_key),),
-    )
-    cur.execute(
-        "DELETE FROM playlist_info WHERE playlist_key = ?",
-        (int(playlist_key),),
-    )
-    conn.commit()
-    deleted = cur.rowcount
+    if include_read:
+        cur.execute(
+            """
+            SELECT alert_id, message, url, created_at, is_read
+            FROM alerts
+            WHERE user_id = ?
+            ORDER BY alert_id DESC
+            LIMIT ?
+            OFFSET ?
+            """,
+            (int(user_id), int(limit), int(offset)),
+        )
+    else:
+        cur.execute(
+            """
+            SELECT alert_id, message, url, created_at, is_read
+            FROM alerts
+            WHERE user_id = ? AND (is_read IS NULL OR is_read = 0)
+            ORDER BY alert_id DESC
+            LIMIT ?
+            OFFSET ?
+            """,
+            (int(user_id), int(limit), int(offset)),
+        )
+    rows = cur.fetchall()
     conn.close()
-    return bool(deleted)
+    return [
+        {
+            "alert_id": row[0],
+            "message": row[1],
+            "url": row[2],
+            "created_at": row[3],
+            "is_read": bool(row[4]) if row[4] is not None else False,
+        }
+        for row in rows
+    ]
 
 
-def get_playlist_songs(playlist_key: int, limit: int = 500):
+def get_unread_alert_count(user_id: int) -> int:
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
         """
-        SELECT s.song_key, s.song_title, s.artist_name, s.artist_link, s.song_link
-        FROM playlist_songs ps
-        JOIN song s ON s.song_key = ps.song_key
-        WHERE ps.playlist_key = ?
-        ORDER BY ps.playlist_songs_key DESC
-        LIMIT ?
+        SELECT COUNT(*)
+        FROM alerts
+        WHERE user_id = ? AND (is_read IS NULL OR is_read = 0)
         """,
-        (int(playlist_key), int(limit)),
+        (int(user_id),),
     )
-    rows = cur.fetchall()
+    row = cur.fetchone()
     conn.close()
-    return rows
-
+    return int(row[0] or 0) if row else 0
 
-def add_song_to_playlist(playlist_key: int, created_by: str, song_key: int):
-    created_by = (created_by or "").strip()
-    if not created_by:
-        return False
 
-    # Validate referenced song exists
+def mark_alert_read(alert_id: int, user_id: int):
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
-        "SELECT song_key FROM song WHERE song_key = ?",
-        (int(song_key),),
+        """
+        UPDATE alerts
+        SET is_read = 1
+        WHERE alert_id = ? AND user_id = ?
+        """,
+        (alert_id, user_id),
     )
-    row = cur.fetchone()
-    if not row:
-        conn.close()
-        return False
-
-    try:
-        cur.execute(
-            """
-            INSERT INTO playlist_songs (playlist_key, created_by, song_key)
-            VALUES (?,?,?)
-            """,
-            (int(playlist_key), created_by, int(song_key)),
-        )
-        conn.commit()
-    except sqlite3.IntegrityError:
-        conn.close()
-        return False
-
+    conn.commit()
     conn.close()
-    return True
-
-
-def add_song(
-    title: str,
-    artist_name: str | None = None,
-    artist_link: str | None = None,
-    song_link: str | None = None,
-    uploaded_by: str | None = None,
-):
-    title = (title or "").strip()
-    artist_name = (artist_name or "").strip()
-    artist_link = (artist_link or "").strip()
-    song_link = (song_link or "").strip()
-    uploaded_by = (uploaded_by or "").strip()
-    if not title:
-        return None
 
-    title = title[:50]
-    artist_name = artist_name[:50]
-    artist_link = artist_link[:500]
-    song_link = song_link[:500]
-    uploaded_by = uploaded_by[:50]
 
+def delete_alert_for_user(alert_id: int, user_id: int):
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
         """
-        INSERT INTO song (song_title, artist_name, artist_link, song_link, uploaded_by, upvotes, downvotes)
-        VALUES (?,?,?,?,?,?,?)
+        DELETE FROM alerts
+        WHERE alert_id = ? AND user_id = ?
         """,
-        (
-            title,
-            artist_name or None,
-            artist_link or None,
-            song_link or None,
-            uploaded_by or None,
-            0,
-            0,
-        ),
+        (int(alert_id), int(user_id)),
     )
-    song_key = cur.lastrowid
     conn.commit()
     conn.close()
-    return int(song_key) if song_key is not None else None
 
 
-def search_songs(query: str, limit: int = 30):
-    query = (query or "").strip()
-    if not query:
-        return []
+def get_alert_for_user(alert_id: int, user_id: int):
     conn = get_db_connection()
     cur = conn.cursor()
-    pattern = _search_pattern(query)
     cur.execute(
         """
-        SELECT song_key, song_title, artist_name, artist_link, song_link
-        FROM song
-        WHERE song_title LIKE ? COLLATE NOCASE
-           OR artist_name LIKE ? COLLATE NOCASE
-        ORDER BY song_key DESC
-        LIMIT ?
+        SELECT alert_id, message, url, created_at, is_read
+        FROM alerts
+        WHERE alert_id = ? AND user_id = ?
+        LIMIT 1
         """,
-        (pattern, pattern, int(limit)),
+        (int(alert_id), int(user_id)),
     )
-    rows = cur.fetchall()
+    row = cur.fetchone()
     conn.close()
-    return rows
-
-
-###############################################
-# User
-###############################################
-
-
-# User class for Flask-Login
-class User(UserMixin):
-    def __init__(
-        self,
-        user_id,
-        username,
-        email,
-        password_hash,
-        first_name=None,
-        last_name=None,
-        reviews=None,
-        likes_key=None,
-        bulletin_key=None,
-        upvotes=None,
-        downvotes=None,
-        cred=None,
-        followers_key=None,
-        following_key=None,
-        profile_pic=None,
-        about=None,
-    ):
-        self.id = user_id
-        self.username = username
-        self.email = email
-        self.password_hash = password_hash
-        self.first_name = first_name
-        self.last_name = last_name
-        self.reviews = reviews
-        self.likes_key = likes_key
-        self.bulletin_key = bulletin_key
-        self.upvotes = upvotes
-        self.downvotes = downvotes
-        self.profile_pic = profile_pic
-        self.cred = cred
-        self.followers_key = followers_key
-        self.following_key = following_key
-        self.about = about
-
-    def get_id(self):
-        return str(self.id)
+    if not row:
+        return None
+    return {
+        "alert_id": row[0],
+        "message": row[1],
+        "url": row[2],
+        "created_at": row[3],
+        "is_read": bool(row[4]) if row[4] is not None else False,
+    }
 
 
-# Get user by ID
-def get_user_by_id(user_id):
+# Profile Comments
+def get_profile_comments(profile_user_id):
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
-        "SELECT user_info_key, username, email, password, first_name, last_name, reviews, likes_key, bulletin_key, upvotes, downvotes, cred, followers_key, following_key, profile_pic, about FROM user_info WHERE user_info_key = ?",
-        (user_id,),
+        """
+        SELECT
+            profile_comments.comment_id,
+            profile_comments.message,
+            profile_comments.created_at,
+            user_info.user_info_key,
+            user_info.username,
+            user_info.profile_pic
+        FROM profile_comments
+        JOIN user_info ON user_info.user_info_key = profile_comments.author_user_id
+        WHERE profile_comments.profile_user_id = ?
+        ORDER BY profile_comments.comment_id ASC
+        """,
+        (profile_user_id,),
     )
-    row = cur.fetchone()
+    rows = cur.fetchall()
     conn.close()
-    return _row_to_user(row)
+    comments = []
+    for row in rows:
+        (
+            comment_id,
+            message,
+            created_at,
+            author_user_id,
+            username,
+            profile_pic,
+        ) = row
+        comments.append(
+            {
+                "comment_id": comment_id,
+                "message": message,
+                "created_at": created_at,
+                "author_user_id": author_user_id,
+                "username": username,
+                "profile_pic": profile_pic,
+            }
+        )
+    return comments
 
 
-# Get user by username or email
-def get_user_by_username_or_email(identifier):
+def add_profile_comment(profile_user_id, author_user_id, message, created_at):
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
-        "SELECT user_info_key, username, email, password, first_name, last_name, reviews, likes_key, bulletin_key, upvotes, downvotes, cred, followers_key, following_key, profile_pic, about FROM user_info WHERE username = ? OR email = ?",
-        (identifier, identifier),
+        """
+        INSERT INTO profile_comments (profile_user_id, author_user_id, message, created_at)
+        VALUES (?,?,?,?)
+        """,
+        (profile_user_id, author_user_id, message, created_at),
     )
-    row = cur.fetchone()
+    conn.commit()
     conn.close()
-    return _row_to_user(row)
 
 
-def get_user_by_username(username):
+def update_profile_comment(comment_id, author_user_id, message):
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
-        "SELECT user_info_key, username, email, password, first_name, last_name, reviews, likes_key, bulletin_key, upvotes, downvotes, cred, followers_key, following_key, profile_pic, about FROM user_info WHERE username = ?",
-        (username,),
+        """
+        UPDATE profile_comments
+        SET message = ?
+        WHERE comment_id = ? AND author_user_id = ?
+        """,
+        (message, comment_id, author_user_id),
     )
-    row = cur.fetchone()
+    conn.commit()
     conn.close()
-    return _row_to_user(row)
-
-
-def _search_pattern(query):
-    tokens = [token for token in re.split(r"[\s\W_]+", query.strip()) if token]
-    return "%" + "%".join(tokens) + "%" if tokens else ""
 
 
-def search_users_by_username(query, limit: int = 20, offset: int = 0):
-    query = (query or "").strip()
-    if not query:
-        return []
+def delete_profile_comment(comment_id, author_user_id):
     conn = get_db_connection()
     cur = conn.cursor()
-    pattern = _search_pattern(query)
     cur.execute(
         """
-        SELECT user_info_key, username, profile_pic
-        FROM user_info
-        WHERE username LIKE ? COLLATE NOCASE
-        ORDER BY username COLLATE NOCASE ASC
-        LIMIT ?
-        OFFSET ?
+        DELETE FROM profile_comments
+        WHERE comment_id = ? AND author_user_id = ?
         """,
-        (pattern, int(limit), int(offset)),
+        (comment_id, author_user_id),
     )
-    rows = cur.fetchall()
+    conn.commit()
     conn.close()
-    return [
-        {"user_id": row[0], "username": row[1], "profile_pic": row[2]} for row in rows
-    ]
 
 
-def search_ratings(query, limit: int = 20, offset: int = 0):
-    query = (query or "").strip()
-    if not query:
-        return []
+def is_following(followed_user_id, follower_user_id) -> bool:
     conn = get_db_connection()
     cur = conn.cursor()
-    pattern = _search_pattern(query)
     cur.execute(
         """
-        SELECT rating_key, rating_type, rating_name, lyrics_rating, beat_rating, flow_rating, melody_rating, cohesive_rating, user, image_url
-        FROM ratings
-        WHERE rating_name LIKE ? COLLATE NOCASE OR rating_type LIKE ? COLLATE NOCASE OR user LIKE ? COLLATE NOCASE
-        ORDER BY rating_key DESC
-        LIMIT ?
-        OFFSET ?
+        SELECT unfollowed
+        FROM follow_info
+        WHERE user_followed_key = ? AND followed_by_user_key = ?
+        ORDER BY follow_info_key DESC
+        LIMIT 1
         """,
-        (pattern, pattern, pattern, int(limit), int(offset)),
+        (followed_user_id, follower_user_id),
     )
-    rows = cur.fetchall()
+    row = cur.fetchone()
     conn.close()
-    return rows
-
+    if not row:
+        return False
+    unfollowed = row[0]
+    return not bool(unfollowed)
 
-def search_playlists(query, limit: int = 20, offset: int = 0):
-    query = (query or "").strip()
-    if not query:
-        return []
 
+def follow_user(followed_user_id, follower_user_id):
     conn = get_db_connection()
     cur = conn.cursor()
-    pattern = _search_pattern(query)
     cur.execute(
         """
-        SELECT playlist_key, created_by, playlist_title, playlist_description
-        FROM playlist_info
-        WHERE playlist_title LIKE ? COLLATE NOCASE
-           OR playlist_description LIKE ? COLLATE NOCASE
-           OR created_by LIKE ? COLLATE NOCASE
-        ORDER BY playlist_key DESC
-        LIMIT ?
-          OFFSET ?
+        SELECT follow_info_key, unfollowed
+        FROM follow_info
+        WHERE user_followed_key = ? AND followed_by_user_key = ?
+        ORDER BY follow_info_key DESC
+        LIMIT 1
         """,
-        (pattern, pattern, pattern, int(limit), int(offset)),
+        (followed_user_id, follower_user_id),
     )
-    rows = cur.fetchall()
+    row = cur.fetchone()
+    if row:
+        cur.execute(
+            "UPDATE follow_info SET unfollowed = 0 WHERE follow_info_key = ?",
+            (row[0],),
+        )
+        newly_active = bool(row[1])
+    else:
+        cur.execute(
+            """
+            INSERT INTO follow_info (user_followed_key, followed_by_user_key, unfollowed)
+            VALUES (?,?,0)
+            """,
+            (followed_user_id, follower_user_id),
+        )
+        newly_active = True
+    if newly_active:
+        _bump_user_counter(cur, "follower_count", 1, user_id=followed_user_id)
+        _bump_user_counter(cur, "following_count", 1, user_id=follower_user_id)
+    conn.commit()
     conn.close()
-    return rows
 
 
-def search_song_ratings(query, limit=20):
-    query = (query or "").strip()
-    if not query:
-        return []
+def unfollow_user(followed_user_id, follower_user_id):
     conn = get_db_connection()
     cur = conn.cursor()
-    pattern = _search_pattern(query)
     cur.execute(
         """
-                SELECT rating_key, rating_type, rating_name, lyrics_rating, beat_rating, flow_rating, melody_rating, cohesive_rating, user, image_url
-        FROM ratings
-        WHERE rating_type = 'Song'
-          AND rating_name LIKE ? COLLATE NOCASE
-        ORDER BY rating_key DESC
-        LIMIT ?
+        UPDATE follow_info
+        SET unfollowed = 1
+        WHERE user_followed_key = ? AND followed_by_user_key = ?
+          AND (unfollowed IS NULL OR unfollowed = 0)
         """,
-        (pattern, int(limit)),
+        (followed_user_id, follower_user_id),
     )
-    rows = cur.fetchall()
+    removed = cur.rowcount or 0
+    _bump_user_counter(cur, "follower_count", -removed, user_id=followed_user_id)
+    _bump_user_counter(cur, "following_count", -removed, user_id=follower_user_id)
+    conn.commit()
     conn.close()
-    return rows
 
 
-def get_ratings_by_user(username):
-    if not username:
-        return []
+def get_followers(user_id: int, limit: int = 200, offset: int = 0):
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
         """
-        SELECT rating_key, rating_type, rating_name, lyrics_rating, beat_rating, flow_rating, melody_rating, cohesive_rating, user, image_url
-        FROM ratings
-        WHERE user = ? COLLATE NOCASE
-        ORDER BY rating_key DESC
+        SELECT DISTINCT
+            user_info.user_info_key,
+            user_info.username,
+            user_info.profile_pic
+        FROM follow_info
+        JOIN user_info ON user_info.user_info_key = follow_info.followed_by_user_key
+        WHERE follow_info.user_followed_key = ?
+          AND (follow_info.unfollowed IS NULL OR follow_info.unfollowed = 0)
+        ORDER BY user_info.username COLLATE NOCASE ASC
+                LIMIT ?
+                OFFSET ?
         """,
-        (username,),
+        (int(user_id), int(limit), int(offset)),
     )
     rows = cur.fetchall()
     conn.close()
-    return rows
+    return [
+        {"user_id": row[0], "username": row[1], "profile_pic": row[2]} for row in rows
+    ]
 
 
-def get_ratings_by_user_paginated(username: str, limit: int = 60, offset: int = 0):
-    username = (username or "").strip()
-    if not username:
-        return []
+def count_followers(user_id: int) -> int:
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
-        """
-        SELECT rating_key, rating_type, rating_name, lyrics_rating, beat_rating, flow_rating, melody_rating, cohesive_rating, user, image_url
-        FROM ratings
-        WHERE user = ? COLLATE NOCASE
-        ORDER BY rating_key DESC
-        LIMIT ?
-        OFFSET ?
-        """,
-        (username, int(limit), int(offset)),
+        "SELECT follower_count FROM user_info WHERE user_info_key = ?",
+        (int(user_id),),
     )
-    rows = cur.fetchall()
+    row = cur.fetchone()
     conn.close()
-    return rows
+    try:
+        return int(row[0]) if row and row[0] is not None else 0
+    except (TypeError, ValueError):
+        return 0
 
 
-# Converts DB row to User object
-def _row_to_user(row):
-    if not row:
-        return None
-    (
-        user_id,
-        username,
-        email,
-        password_hash,
-        first_name,
-        last_name,
-        reviews,
-        likes_key,
-        bulletin_key,
-        upvotes,
-        downvotes,
-        cred,
-        followers_key,
-        following_key,
-        profile_pic,
-        about,
-    ) = row
-    return User(
-        user_id,
-        username,
-        email,
-        password_hash,
-        first_name,
-        last_name,
-        reviews,
-        likes_key,
-        bulletin_key,
-        upvotes,
-        downvotes,
-        cred,
-        followers_key,
-        following_key,
-        profile_pic,
-        about,
+def get_unread_alert_sig(user_id: int) -> tuple[int, int]:
+    """
+    Lightweight signature for unread alerts.
+    Returns (unread_count, max_unread_alert_id).
+    """
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute(
+        """
+        SELECT
+            COUNT(1) AS c,
+            COALESCE(MAX(alert_id), 0) AS max_id
+        FROM alerts
+        WHERE user_id = ?
+          AND (is_read IS NULL OR is_read = 0)
+        """,
+        (int(user_id),),
     )
+    row = cur.fetchone()
+    conn.close()
+    try:
+        c = int(row[0]) if row and row[0] is not None else 0
+    except (TypeError, ValueError):
+        c = 0
+    try:
+        max_id = int(row[1]) if row and row[1] is not None else 0
+    except (TypeError, ValueError):
+        max_id = 0
+    return (max(0, c), max(0, max_id))
 
 
-# Check if username or email exists
-def username_or_email_exists(username, email):
+def get_following(user_id: int, limit: int = 200, offset: int = 0):
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
-        "SELECT 1 FROM user_info WHERE username = ? OR email = ? LIMIT 1",
-        (username, email),
+        """
+        SELECT DISTINCT
+            user_info.user_info_key,
+            user_info.username,
+            user_info.profile_pic
+        FROM follow_info
+        JOIN user_info ON user_info.user_info_key = follow_info.user_followed_key
+        WHERE follow_info.followed_by_user_key = ?
+          AND (follow_info.unfollowed IS NULL OR follow_info.unfollowed = 0)
+        ORDER BY user_info.username COLLATE NOCASE ASC
+                LIMIT ?
+                OFFSET ?
+        """,
+        (int(user_id), int(limit), int(offset)),
     )
-    exists = cur.fetchone() is not None
+    rows = cur.fetchall()
     conn.close()
-    return exists
+    return [
+        {"user_id": row[0], "username": row[1], "profile_pic": row[2]} for row in rows
+    ]
 
 
-# Create a new user
-def create_user(username, email, password_plain):
-    if username_or_email_exists(username, email):
-        return None  # username or email is already taken
-    password_hash = generate_password_hash(password_plain)
+def count_following(user_id: int) -> int:
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
-        "INSERT INTO user_info (username, email, password, profile_pic) VALUES (?,?,?,?)",
-        (username, email, password_hash, None),
+        "SELECT following_count FROM user_info WHERE user_info_key = ?",
+        (int(user_id),),
     )
-    conn.commit()
-    user_id = cur.lastrowid
+    row = cur.fetchone()
     conn.close()
-    return get_user_by_id(user_id)
+    try:
+        return int(row[0]) if row and row[0] is not None else 0
+    except (TypeError, ValueError):
+        return 0
 
 
-def verify_password(stored_hash, password_plain):
-    return check_password_hash(stored_hash, password_plain)
+###############################################
+# MusicBrainz Catalog
+###############################################
 
+# Entities we've already seen from MusicBrainz (search results and rated mbids),
+# so the add/edit autocomplete can answer locally. See mb_catalog in _db_setup.py.
+_MB_CATALOG_KINDS = {"artist": "Artist", "album": "Album", "song": "Song"}
+_MB_ENTITY_PATHS = {"artist": "artist", "album": "release-group", "song": "recording"}
 
-# Update the user's profile info
-def update_profile_info(user_id, username, about):
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT username FROM user_info WHERE user_info_key = ?", (user_id,))
-    row = cur.fetchone()
-    previous_username = row[0] if row else None
-    cur.execute(
-        "UPDATE user_info SET username = ?, about = ?  WHERE user_info_key = ?",
-        (username, about, user_id),
-    )
-    if previous_username and previous_username != username:
-        cur.execute(
-            "UPDATE ratings SET user = ? WHERE user = ? COLLATE NOCASE",
-            (username, previous_username),
-        )
-    conn.commit()
-    conn.close()
 
+def _mb_query_norm(text: str | None) -> str:
+    # The tokens search_mb_catalog matches on, lowercased.
+    return " ".join(t for t in re.split(r"[\s\W_]+", (text or "").strip().lower()) if t)
+
+
+def record_mb_catalog_items(
+    kind: str,
+    items: list[dict[str, Any]],
+    *,
+    query: str | None = None,
+    artist: str | None = None,
+) -> None:
+    """
+    Upserts items shaped like /api/musicbrainz/search results into mb_catalog.
+    With `query` (and `artist`), also records that MusicBrainz just answered
+    that search; see mb_catalog_query_fresh().
+    """
+    kind = (kind or "").strip().lower()
+    if kind not in _MB_CATALOG_KINDS:
+        return
+    now = datetime.now(timezone.utc).isoformat()
+    q_norm = _mb_query_norm(query)
+    if q_norm:
+        conn = get_db_connection()
+        conn.execute(
+            """
+            INSERT INTO mb_catalog_queries (kind, q_norm, artist_norm, fetched_at)
+            VALUES (?,?,?,?)
+            ON CONFLICT(kind, q_norm, artist_norm) DO UPDATE SET
+                fetched_at = excluded.fetched_at
+            """,
+            (kind, q_norm, _mb_query_norm(artist) if kind != "artist" else "", now),
+        )
+        conn.commit()
+        conn.close()
+    rows = []
+    for item in items or []:
+        mbid = str(item.get("mbid") or "").strip()
+        title = str(item.get("title") or "").strip()
+        if not mbid or not title:
+            continue
+        rows.append(
+            (
+                kind,
+                mbid,
+                title,
+                str(item.get("artist") or "").strip(),
+                str(item.get("year") or "").strip(),
+                str(item.get("disambiguation") or "").strip(),
+                str(item.get("features") or "").strip(),
+                now,
+            )
+        )
+    if not rows:
+        return
 
-# Update the user's profile picture
-def update_profile_pic(user_id, profile_pic_path):
     conn = get_db_connection()
     cur = conn.cursor()
-    cur.execute(
-        "UPDATE user_info SET profile_pic = ? WHERE user_info_key = ?",
-        (profile_pic_path, user_id),
+    cur.executemany(
+        """
+        INSERT INTO mb_catalog (
+            kind, mbid, title, artist, year, disambiguation, features, seen_count, last_seen_at
+        )
+        VALUES (?,?,?,?,?,?,?,1,?)
+        ON CONFLICT(kind, mbid) DO UPDATE SET
+            title = excluded.title,
+            artist = excluded.artist,
+            year = excluded.year,
+            disambiguation = excluded.disambiguation,
+            features = excluded.features,
+            seen_count = seen_count + 1,
+            last_seen_at = excluded.last_seen_at
+        """,
+        rows,
     )
     conn.commit()
     conn.close()
 
 
-# Get profile picture from database using the username
-def get_profile_pic_by_username(username):
+def mb_catalog_query_fresh(
+    kind: str, q: str, *, artist: str | None = None, max_age_seconds: float
+) -> bool:
+    """
+    Whether MusicBrainz answered this search, or a shorter one of at least
+    three characters it extends ("radi" for "radiohead"), within
+    `max_age_seconds`.
+    """
+    kind = (kind or "").strip().lower()
+    q_norm = _mb_query_norm(q)
+    if kind not in _MB_CATALOG_KINDS or not q_norm:
+        return False
+    prefixes = sorted({q_norm} | {q_norm[:i] for i in range(3, len(q_norm))})
+    cutoff = (datetime.now(timezone.utc) - timedelta(seconds=max_age_seconds)).isoformat()
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
-        "SELECT profile_pic FROM user_info WHERE username = ?",
-        (username,),
+        f"""
+        SELECT 1
+        FROM mb_catalog_queries
+        WHERE kind = ?
+          AND artist_norm = ?
+          AND q_norm IN ({",".join(["?"] * len(prefixes))})
+          AND fetched_at >= ?
+        LIMIT 1
+        """,
+        (kind, _mb_query_norm(artist) if kind != "artist" else "", *prefixes, cutoff),
     )
-    row = cur.fetchone()
+    fresh = cur.fetchone() is not None
     conn.close()
-    return row[0] if row and row[0] else None
+    return fresh
 
 
-###############################################
-# Alerts
-###############################################
+def search_mb_catalog(
+    kind: str, q: str, *, artist: str | None = None, limit: int = 8
+) -> list[dict[str, Any]]:
+    """
+    Prefix search over mb_catalog, best match first, in the item shape
+    /api/musicbrainz/search returns. Every query token must prefix a word of
+    the title (and of the artist, when given).
+    """
+    kind = (kind or "").strip().lower()
+    if kind not in _MB_CATALOG_KINDS:
+        return []
 
+    def _prefix_terms(text: str) -> str:
+        tokens = [t for t in re.split(r"[\s\W_]+", (text or "").strip()) if t]
+        return " ".join('"' + t.replace('"', '""') + '"*' for t in tokens)
+
+    title_terms = _prefix_terms(q)
+    if not title_terms:
+        return []
+    match = f"title : ({title_terms})"
+    artist_terms = _prefix_terms(artist) if kind != "artist" else ""
+    if artist_terms:
+        match += f" AND artist : ({artist_terms})"
 
-def create_alert(
-    user_id: int,
-    message: str,
-    url: Optional[str] = None,
-    created_at: Optional[str] = None,
-):
-    if not user_id or not message:
-        return
-    created_at = created_at or datetime.now(timezone.utc).isoformat()
     conn = get_db_connection()
     cur = conn.cursor()
+    if not _fts_available(cur, "mb_catalog_fts"):
+        conn.close()
+        return []
     cur.execute(
         """
-        INSERT INTO alerts (user_id, message, url, created_at, is_read)
-        VALUES (?,?,?,?,0)
+        SELECT c.mbid, c.title, c.artist, c.year, c.disambiguation, c.features
+        FROM mb_catalog_fts
+        JOIN mb_catalog c
+            ON c.catalog_id = mb_catalog_fts.rowid
+        WHERE mb_catalog_fts MATCH ?
+          AND c.kind = ?
+        ORDER BY bm25(mb_catalog_fts, 10.0, 3.0), c.seen_count DESC
+        LIMIT ?
         """,
-        (user_id, message, url, created_at),
+        (match, kind, int(limit)),
     )
-    conn.commit()
-    conn.close()
-
-
-def get_alerts_for_user(
-    user_id: int,
-    limit: int = 10,
-    include_read: bool = False,
-    offset: int = 0,
-):
-    conn = get_db_connection()
-    cur = conn.cursor()
-    if include_read:
-        cur.execute(
-            """
-            SELECT alert_id, message, url, created_at, is_read
-            FROM alerts
-            WHERE user_id = ?
-            ORDER BY alert_id DESC
-            LIMIT ?
-            OFFSET ?
-            """,
-            (int(user_id), int(limit), int(offset)),
-        )
-    else:
-        cur.execute(
-            """
-            SELECT alert_id, message, url, created_at, is_read
-            FROM alerts
-            WHERE user_id = ? AND (is_read IS NULL OR is_read = 0)
-            ORDER BY alert_id DESC
-            LIMIT ?
-            OFFSET ?
-            """,
-            (int(user_id), int(limit), int(offset)),
-        )
     rows = cur.fetchall()
     conn.close()
+
+    path = _MB_ENTITY_PATHS[kind]
     return [
         {
-            "alert_id": row[0],
-            "message": row[1],
-            "url": row[2],
-            "created_at": row[3],
-            "is_read": bool(row[4]) if row[4] is not None else False,
+            "title": title,
+            "artist": artist_name or "",
+            "year": year or "",
+            "disambiguation": disambiguation or "",
+            "score": None,
+            "features": features or "",
+            "url": f"https://musicbrainz.org/{path}/{mbid}",
+            "mbid": mbid,
+            "kind_label": _MB_CATALOG_KINDS[kind],
         }
-        for row in rows
+        for mbid, title, artist_name, year, disambiguation, features in rows
     ]
 
 
-def get_unread_alert_count(user_id: int) -> int:
+###############################################
+# Artwork Jobs
+###############################################
+
+# One job per rating: resolve cover art / artist image for its mbid and store
+# it on the rating. Statuses: pending, running, done (image found), missing
+# (nothing found after every attempt) and failed (errors after every attempt).
+ARTWORK_JOB_MAX_ATTEMPTS = 4
+ARTWORK_JOB_LEASE_SECONDS = 120
+
+
+def enqueue_artwork_job(rating_key: int, kind: str, mbid: str) -> None:
+    """Queues (or re-queues) artwork resolution for a rating."""
+    kind = (kind or "").strip().lower()
+    mbid = (mbid or "").strip()
+    if kind not in {"album", "song", "artist"} or not mbid:
+        return
+    now = datetime.now(timezone.utc).isoformat()
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
         """
-        SELECT COUNT(*)
-        FROM alerts
-        WHERE user_id = ? AND (is_read IS NULL OR is_read = 0)
+        INSERT INTO artwork_jobs (rating_key, kind, mbid, status, attempts, run_after, created_at, updated_at)
+        VALUES (?,?,?,'pending',0,?,?,?)
+        ON CONFLICT(rating_key) DO UPDATE SET
+            kind = excluded.kind,
+            mbid = excluded.mbid,
+            status = 'pending',
+            attempts = 0,
+            run_after = excluded.run_after,
+            locked_until = NULL,
+            image_url = NULL,
+            last_error = NULL,
+            updated_at = excluded.updated_at
         """,
-        (int(user_id),),
+        (int(rating_key), kind, mbid, time.time(), now, now),
     )
-    row = cur.fetchone()
+    conn.commit()
     conn.close()
-    return int(row[0] or 0) if row else 0
 
 
-def mark_alert_read(alert_id: int, user_id: int):
+def claim_artwork_job() -> Optional[dict[str, Any]]:
+    """
+    Leases the next due job to the caller, or returns None. Jobs whose lease
+    ran out (a worker died mid-job) are picked up again.
+    """
+    now = time.time()
     conn = get_db_connection()
     cur = conn.cursor()
-    cur.execute(
-        """
-        UPDATE alerts
-        SET is_read = 1
-        WHERE alert_id = ? AND user_id = ?
-        """,
-        (alert_id, user_id),
-    )
-    conn.commit()
+    try:
+        cur.execute("BEGIN IMMEDIATE")
+        cur.execute(
+            """
+            SELECT job_id, rating_key, kind, mbid, attempts
+            FROM artwork_jobs
+            WHERE (status = 'pending' AND run_after <= ?)
+               OR (status = 'running' AND locked_until <= ?)
+            ORDER BY run_after ASC
+            LIMIT 1
+            """,
+            (now, now),
+        )
+        row = cur.fetchone()
+        if row:
+            cur.execute(
+                """
+                UPDATE artwork_jobs
+                SET status = 'running', attempts = attempts + 1, locked_until = ?, updated_at = ?
+                WHERE job_id = ?
+                """,
+                (
+                    now + ARTWORK_JOB_LEASE_SECONDS,
+                    datetime.now(timezone.utc).isoformat(),
+                    int(row[0]),
+                ),
+            )
+        conn.commit()
+    except sqlite3.OperationalError:
+        # Another worker holds the write lock; try again on the next poll.
+        conn.rollback()
+        row = None
     conn.close()
+    if not row:
+        return None
+    job_id, rating_key, kind, mbid, attempts = row
+    return {
+        "job_id": int(job_id),
+        "rating_key": int(rating_key),
+        "kind": kind,
+        "mbid": mbid,
+        "attempt": int(attempts) + 1,
+    }
 
 
-def delete_alert_for_user(alert_id: int, user_id: int):
+def finish_artwork_job(job: dict[str, Any], image_url: str | None, error: str | None = None) -> str:
+    """
+    Records a job attempt. A found image is written to the rating unless the
+    rating changed mbid or got an image meanwhile. Otherwise the job is retried
+    with exponential backoff until ARTWORK_JOB_MAX_ATTEMPTS. Returns the status.
+    """
+    now = datetime.now(timezone.utc).isoformat()
     conn = get_db_connection()
     cur = conn.cursor()
-    cur.execute(
-        """
-        DELETE FROM alerts
-        WHERE alert_id = ? AND user_id = ?
-        """,
-        (int(alert_id), int(user_id)),
-    )
+    if image_url:
+        status = "done"
+        cur.execute(
+            """
+            UPDATE ratings
+            SET image_url = ?
+            WHERE rating_key = ?
+              AND mbid = ?
+              AND COALESCE(image_url, '') = ''
+            """,
+            (image_url, int(job["rating_key"]), job["mbid"]),
+        )
+        cur.execute(
+            """
+            UPDATE artwork_jobs
+            SET status = 'done', image_url = ?, locked_until = NULL, last_error = NULL, updated_at = ?
+            WHERE job_id = ? AND mbid = ?
+            """,
+            (image_url, now, int(job["job_id"]), job["mbid"]),
+        )
+        cur.execute(
+            """
+            INSERT INTO artwork_index (mbid, kind, image_url, updated_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(mbid) DO NOTHING
+            """,
+            (job["mbid"], job["kind"], image_url, now),
+        )
+    elif int(job["attempt"]) >= ARTWORK_JOB_MAX_ATTEMPTS:
+        status = "failed" if error else "missing"
+        cur.execute(
+            """
+            UPDATE artwork_jobs
+            SET status = ?, locked_until = NULL, last_error = ?, updated_at = ?
+            WHERE job_id = ? AND mbid = ?
+            """,
+            (status, error, now, int(job["job_id"]), job["mbid"]),
+        )
+    else:
+        status = "pending"
+        # 30 s, 2 min, 8 min, ...; negative lookups are cached, so retries that
+        # would just find nothing again stay local.
+        delay = 30 * (4 ** (int(job["attempt"]) - 1))
+        cur.execute(
+            """
+            UPDATE artwork_jobs
+            SET status = 'pending', run_after = ?, locked_until = NULL, last_error = ?, updated_at = ?
+            WHERE job_id = ? AND mbid = ?
+            """,
+            (time.time() + delay, error, now, int(job["job_id"]), job["mbid"]),
+        )
     conn.commit()
     conn.close()
+    return status
 
 
-def get_alert_for_user(alert_id: int, user_id: int):
+def get_artwork_job_status(rating_key: int) -> Optional[dict[str, Any]]:
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
         """
-        SELECT alert_id, message, url, created_at, is_read
-        FROM alerts
-        WHERE alert_id = ? AND user_id = ?
-        LIMIT 1
+        SELECT j.status, j.attempts, j.updated_at, r.image_url
+        FROM artwork_jobs j
+        LEFT JOIN ratings r ON r.rating_key = j.rating_key
+        WHERE j.rating_key = ?
         """,
-        (int(alert_id), int(user_id)),
+        (int(rating_key),),
     )
     row = cur.fetchone()
     conn.close()
     if not row:
         return None
+    status, attempts, updated_at, image_url = row
     return {
-        "alert_id": row[0],
-        "message": row[1],
-        "url": row[2],
-        "created_at": row[3],
-        "is_read": bool(row[4]) if row[4] is not None else False,
+        "status": status,
+        "attempts": int(attempts or 0),
+        "updated_at": updated_at,
+        "image_url": image_url or None,
     }
 
 
-# Profile Comments
-def get_profile_comments(profile_user_id):
+###############################################
+# Artwork Index
+###############################################
+
+
+def get_indexed_artwork(mbid: str) -> Optional[str]:
+    """Artwork already resolved for `mbid` (see artwork_index), if any."""
+    mbid = (mbid or "").strip()
+    if not mbid:
+        return None
     conn = get_db_connection()
     cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT
-            profile_comments.comment_id,
-            profile_comments.message,
-            profile_comments.created_at,
-            user_info.user_info_key,
-            user_info.username,
-            user_info.profile_pic
-        FROM profile_comments
-        JOIN user_info ON user_info.user_info_key = profile_comments.author_user_id
-        WHERE profile_comments.profile_user_id = ?
-        ORDER BY profile_comments.comment_id ASC
-        """,
-        (profile_user_id,),
-    )
-    rows = cur.fetchall()
+    cur.execute("SELECT image_url FROM artwork_index WHERE mbid = ?", (mbid,))
+    row = cur.fetchone()
     conn.close()
-    comments = []
-    for row in rows:
-        (
-            comment_id,
-            message,
-            created_at,
-            author_user_id,
-            username,
-            profile_pic,
-        ) = row
-        comments.append(
-            {
-                "comment_id": comment_id,
-                "message": message,
-                "created_at": created_at,
-                "author_user_id": author_user_id,
-                "username": username,
-                "profile_pic": profile_pic,
-            }
-        )
-    return comments
+    return row[0] if row and row[0] else None
 
 
-def add_profile_comment(profile_user_id, author_user_id, message, created_at):
+###############################################
+# Artwork Mirror
+###############################################
+
+ARTWORK_MIRROR_MAX_ATTEMPTS = 3
+
+
+def record_artwork_mirror(
+    source_url: str, local_url: Optional[str], byte_count: Optional[int] = None
+) -> None:
+    """Records a mirror attempt; a None local_url counts as a failed attempt."""
+    now = datetime.now(timezone.utc).isoformat()
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
         """
-        INSERT INTO profile_comments (profile_user_id, author_user_id, message, created_at)
-        VALUES (?,?,?,?)
+        INSERT INTO artwork_mirror (source_url, local_url, status, attempts, bytes, updated_at)
+        VALUES (?, ?, ?, 1, ?, ?)
+        ON CONFLICT(source_url) DO UPDATE SET
+            local_url = excluded.local_url,
+            status = excluded.status,
+            attempts = artwork_mirror.attempts + 1,
+            bytes = excluded.bytes,
+            updated_at = excluded.updated_at
         """,
-        (profile_user_id, author_user_id, message, created_at),
+        (source_url, local_url, "done" if local_url else "failed", byte_count, now),
     )
     conn.commit()
     conn.close()
 
 
-def update_profile_comment(comment_id, author_user_id, message):
+def claim_unmirrored_artwork(limit: int = 10) -> list[str]:
+    """
+    Claims remote image URLs still referenced by ratings that have no local
+    copy, so concurrent workers don't download the same one. Skips URLs that
+    failed ARTWORK_MIRROR_MAX_ATTEMPTS times or within the last hour; claims
+    older than ten minutes are treated as abandoned.
+    """
+    now = datetime.now(timezone.utc)
+    retry_before = (now - timedelta(hours=1)).isoformat()
+    abandoned_before = (now - timedelta(minutes=10)).isoformat()
+    candidates = """
+        FROM ratings r
+        LEFT JOIN artwork_mirror m ON m.source_url = r.image_url
+        WHERE r.image_url LIKE 'http%'
+          AND (r.image_url LIKE 'http://%' OR r.image_url LIKE 'https://%')
+          AND (
+            m.source_url IS NULL
+            OR (m.status = 'failed' AND m.attempts < ? AND m.updated_at < ?)
+            OR (m.status = 'pending' AND m.updated_at < ?)
+          )
+    """
+    params = (ARTWORK_MIRROR_MAX_ATTEMPTS, retry_before, abandoned_before)
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        # Most polls find nothing; only take the write lock when there is
+        # something to claim.
+        cur.execute(f"SELECT 1 {candidates} LIMIT 1", params)
+        if cur.fetchone() is None:
+            return []
+        cur.execute("BEGIN IMMEDIATE")
+        cur.execute(f"SELECT DISTINCT r.image_url {candidates} LIMIT ?", (*params, int(limit)))
+        urls = [r[0] for r in cur.fetchall()]
+        cur.executemany(
+            """
+            INSERT INTO artwork_mirror (source_url, status, attempts, updated_at)
+            VALUES (?, 'pending', 0, ?)
+            ON CONFLICT(source_url) DO UPDATE SET
+                status = 'pending',
+                updated_at = excluded.updated_at
+            """,
+            [(url, now.isoformat()) for url in urls],
+        )
+        conn.commit()
+    except sqlite3.OperationalError:
+        # Another worker holds the write lock; try again on the next poll.
+        conn.rollback()
+        return []
+    finally:
+        conn.close()
+    return urls
+
+
+def get_stale_mirrored_artwork(limit: int = 50) -> list[tuple[str, str]]:
+    """
+    (source_url, local_url) pairs for remote images that are already mirrored
+    but still referenced by ratings, e.g. written by an artwork job or the
+    backfill after the mirror's rewrite.
+    """
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
         """
-        UPDATE profile_comments
-        SET message = ?
-        WHERE comment_id = ? AND author_user_id = ?
+        SELECT DISTINCT r.image_url, m.local_url
+        FROM ratings r
+        JOIN artwork_mirror m ON m.source_url = r.image_url
+        WHERE r.image_url LIKE 'http%'
+          AND m.status = 'done'
+          AND COALESCE(m.local_url, '') != ''
+        LIMIT ?
         """,
-        (message, comment_id, author_user_id),
+        (int(limit),),
     )
-    conn.commit()
+    rows = [(source_url, local_url) for source_url, local_url in cur.fetchall()]
     conn.close()
+    return rows
 
 
-def delete_profile_comment(comment_id, author_user_id):
+def rewrite_rating_image_urls(source_url: str, local_url: str) -> int:
+    """Points every rating (and the artwork index) using `source_url` at its local copy."""
     conn = get_db_connection()
     cur = conn.cursor()
+    cur.execute("UPDATE ratings SET image_url = ? WHERE image_url = ?", (local_url, source_url))
+    updated = cur.rowcount
     cur.execute(
-        """
-        DELETE FROM profile_comments
-        WHERE comment_id = ? AND author_user_id = ?
-        """,
-        (comment_id, author_user_id),
+        "UPDATE artwork_index SET image_url = ? WHERE image_url = ?", (local_url, source_url)
     )
     conn.commit()
     conn.close()
+    return updated
 
 
-def is_following(followed_user_id, follower_user_id) -> bool:
+###############################################
+# Backfill
+###############################################
+
+
+def get_backfill_checkpoint(name: str) -> Optional[dict[str, Any]]:
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
-        """
-        SELECT unfollowed
-        FROM follow_info
-        WHERE user_followed_key = ? AND followed_by_user_key = ?
-        ORDER BY follow_info_key DESC
-        LIMIT 1
-        """,
-        (followed_user_id, follower_user_id),
+        "SELECT last_rating_key, stats, updated_at FROM backfill_checkpoints WHERE name = ?",
+        (name,),
     )
     row = cur.fetchone()
     conn.close()
     if not row:
-        return False
-    unfollowed = row[0]
-    return not bool(unfollowed)
+        return None
+    return {
+        "last_rating_key": int(row[0] or 0),
+        "stats": json.loads(row[1]) if row[1] else {},
+        "updated_at": row[2],
+    }
 
 
-def follow_user(followed_user_id, follower_user_id):
+def save_backfill_checkpoint(name: str, last_rating_key: int, stats: dict[str, Any]) -> None:
+    now = datetime.now(timezone.utc).isoformat()
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
         """
-        SELECT follow_info_key
-        FROM follow_info
-        WHERE user_followed_key = ? AND followed_by_user_key = ?
-        ORDER BY follow_info_key DESC
-        LIMIT 1
+        INSERT INTO backfill_checkpoints (name, last_rating_key, stats, updated_at)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET
+            last_rating_key = excluded.last_rating_key,
+            stats = excluded.stats,
+            updated_at = excluded.updated_at
         """,
-        (followed_user_id, follower_user_id),
+        (name, int(last_rating_key), json.dumps(stats), now),
     )
-    row = cur.fetchone()
-    if row:
-        cur.execute(
-            "UPDATE follow_info SET unfollowed = 0 WHERE follow_info_key = ?",
-            (row[0],),
-        )
-    else:
-        cur.execute(
-            """
-            INSERT INTO follow_info (user_followed_key, followed_by_user_key, unfollowed)
-            VALUES (?,?,0)
-            """,
-            (followed_user_id, follower_user_id),
-        )
     conn.commit()
     conn.close()
 
 
-def unfollow_user(followed_user_id, follower_user_id):
+def delete_backfill_checkpoint(name: str) -> None:
     conn = get_db_connection()
     cur = conn.cursor()
-    cur.execute(
-        """
-        UPDATE follow_info
-        SET unfollowed = 1
-        WHERE user_followed_key = ? AND followed_by_user_key = ?
-        """,
-        (followed_user_id, follower_user_id),
-    )
+    cur.execute("DELETE FROM backfill_checkpoints WHERE name = ?", (name,))
     conn.commit()
     conn.close()
 
 
-def get_followers(user_id: int, limit: int = 200, offset: int = 0):
+def get_ratings_missing_metadata(
+    after_rating_key: int, limit: int, kinds: Optional[list[str]] = None
+) -> list[dict[str, Any]]:
+    """Ratings after `after_rating_key` (in key order) lacking an mbid or an image."""
+    kinds = [k for k in (kinds or ["album", "song", "artist"]) if k in {"album", "song", "artist"}]
+    if not kinds:
+        return []
+    placeholders = ",".join("?" for _ in kinds)
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
-        """
-        SELECT DISTINCT
-            user_info.user_info_key,
-            user_info.username,
-            user_info.profile_pic
-        FROM follow_info
-        JOIN user_info ON user_info.user_info_key = follow_info.followed_by_user_key
-        WHERE follow_info.user_followed_key = ?
-          AND (follow_info.unfollowed IS NULL OR follow_info.unfollowed = 0)
-        ORDER BY user_info.username COLLATE NOCASE ASC
-                LIMIT ?
-                OFFSET ?
+        f"""
+        SELECT rating_key, LOWER(TRIM(rating_type)), rating_name, content_info_artist, mbid, image_url
+        FROM ratings
+        WHERE rating_key > ?
+          AND LOWER(TRIM(rating_type)) IN ({placeholders})
+          AND (COALESCE(TRIM(mbid), '') = '' OR COALESCE(TRIM(image_url), '') = '')
+        ORDER BY rating_key
+        LIMIT ?
         """,
-        (int(user_id), int(limit), int(offset)),
+        (int(after_rating_key), *kinds, int(limit)),
     )
     rows = cur.fetchall()
     conn.close()
     return [
-        {"user_id": row[0], "username": row[1], "profile_pic": row[2]} for row in rows
+        {
+            "rating_key": int(r[0]),
+            "kind": r[1],
+            "name": r[2] or "",
+            "artist": r[3] or "",
+            "mbid": (r[4] or "").strip(),
+            "image_url": (r[5] or "").strip(),
+        }
+        for r in rows
     ]
 
 
-def count_followers(user_id: int) -> int:
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT COUNT(1)
-        FROM follow_info
-        WHERE user_followed_key = ?
-          AND (unfollowed IS NULL OR unfollowed = 0)
-        """,
-        (int(user_id),),
-    )
-    row = cur.fetchone()
-    conn.close()
-    try:
-        return int(row[0]) if row and row[0] is not None else 0
-    except (TypeError, ValueError):
-        return 0
-
-
-def get_unread_alert_sig(user_id: int) -> tuple[int, int]:
-    """
-    Lightweight signature for unread alerts.
-    Returns (unread_count, max_unread_alert_id).
-    """
+def count_ratings_missing_metadata(after_rating_key: int = 0) -> int:
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
         """
-        SELECT
-            COUNT(1) AS c,
-            COALESCE(MAX(alert_id), 0) AS max_id
-        FROM alerts
-        WHERE user_id = ?
-          AND (is_read IS NULL OR is_read = 0)
+        SELECT COUNT(1) FROM ratings
+        WHERE rating_key > ?
+          AND LOWER(TRIM(rating_type)) IN ('album', 'song', 'artist')
+          AND (COALESCE(TRIM(mbid), '') = '' OR COALESCE(TRIM(image_url), '') = '')
         """,
-        (int(user_id),),
+        (int(after_rating_key),),
     )
-    row = cur.fetchone()
+    count = int(cur.fetchone()[0] or 0)
     conn.close()
-    try:
-        c = int(row[0]) if row and row[0] is not None else 0
-    except (TypeError, ValueError):
-        c = 0
-    try:
-        max_id = int(row[1]) if row and row[1] is not None else 0
-    except (TypeError, ValueError):
-        max_id = 0
-    return (max(0, c), max(0, max_id))
+    return count
 
 
-def get_following(user_id: int, limit: int = 200, offset: int = 0):
+def set_rating_mbid(rating_key: int, mbid: str, mb_url: Optional[str]) -> bool:
+    """Fills in a rating's mbid unless it got one meanwhile."""
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
         """
-        SELECT DISTINCT
-            user_info.user_info_key,
-            user_info.username,
-            user_info.profile_pic
-        FROM follow_info
-        JOIN user_info ON user_info.user_info_key = follow_info.user_followed_key
-        WHERE follow_info.followed_by_user_key = ?
-          AND (follow_info.unfollowed IS NULL OR follow_info.unfollowed = 0)
-        ORDER BY user_info.username COLLATE NOCASE ASC
-                LIMIT ?
-                OFFSET ?
+        UPDATE ratings SET mbid = ?, mb_url = COALESCE(NULLIF(mb_url, ''), ?)
+        WHERE rating_key = ? AND COALESCE(TRIM(mbid), '') = ''
         """,
-        (int(user_id), int(limit), int(offset)),
+        (mbid, mb_url, int(rating_key)),
     )
-    rows = cur.fetchall()
+    updated = cur.rowcount > 0
+    conn.commit()
     conn.close()
-    return [
-        {"user_id": row[0], "username": row[1], "profile_pic": row[2]} for row in rows
-    ]
+    return updated
 
 
-def count_following(user_id: int) -> int:
+def set_rating_artwork(rating_key: int, mbid: str, image_url: str) -> bool:
+    """Fills in a rating's image unless it changed mbid or got an image meanwhile."""
     conn = get_db_connection()
     cur = conn.cursor()
     cur.execute(
         """
-        SELECT COUNT(1)
-        FROM follow_info
-        WHERE followed_by_user_key = ?
-          AND (unfollowed IS NULL OR unfollowed = 0)
+        UPDATE ratings SET image_url = ?
+        WHERE rating_key = ? AND mbid = ? AND COALESCE(image_url, '') = ''
         """,
-        (int(user_id),),
+        (image_url, int(rating_key), mbid),
     )
-    row = cur.fetchone()
+    updated = cur.rowcount > 0
+    conn.commit()
     conn.close()
-    try:
-        return int(row[0]) if row and row[0] is not None else 0
-    except (TypeError, ValueError):
-        return 0
+    return updated
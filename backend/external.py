@@ -0,0 +1,712 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from backend._db_setup import DB_PATH
+
+
+###############################################
+# External APIs
+###############################################
+
+# Outbound calls to MusicBrainz, the Cover Art Archive and Wikidata go through
+# get_json(), which answers from a persistent response cache when it can and
+# only waits on the service's shared rate limit on a miss. Both live in one
+# SQLite file next to DB_PATH so every worker process shares them.
+
+
+def _env_int(name: str, default: int, lo: int, hi: int) -> int:
+    try:
+        value = int(os.environ.get(name) or default)
+    except ValueError:
+        value = default
+    return max(lo, min(hi, value))
+
+
+def _base_url(name: str, default: str) -> str:
+    return (os.environ.get(name) or default).strip().rstrip("/")
+
+
+# Upstream roots. Point these at a local stand-in (benchmarks/standin.py) to
+# run lookups without the network.
+MUSICBRAINZ_BASE_URL = _base_url("MUSICBRAINZ_BASE_URL", "https://musicbrainz.org")
+COVERART_BASE_URL = _base_url("COVERART_BASE_URL", "https://coverartarchive.org")
+WIKIDATA_BASE_URL = _base_url("WIKIDATA_BASE_URL", "https://www.wikidata.org")
+COMMONS_BASE_URL = _base_url("COMMONS_BASE_URL", "https://commons.wikimedia.org")
+
+
+# Seconds a successful response stays fresh, per endpoint. Searches change as
+# MusicBrainz is edited; entity lookups and cover art rarely do.
+ENDPOINT_TTLS: dict[str, int] = {
+    "mb_search": _env_int("EXTERNAL_TTL_MB_SEARCH", 86_400, 0, 30 * 86_400),
+    "mb_lookup": _env_int("EXTERNAL_TTL_MB_LOOKUP", 7 * 86_400, 0, 90 * 86_400),
+    "caa": _env_int("EXTERNAL_TTL_CAA", 7 * 86_400, 0, 90 * 86_400),
+    "wikidata": _env_int("EXTERNAL_TTL_WIKIDATA", 7 * 86_400, 0, 90 * 86_400),
+}
+# 404s (e.g. a release with no cover art) are cached for this long.
+NEGATIVE_TTL = _env_int("EXTERNAL_NEGATIVE_TTL", 86_400, 0, 30 * 86_400)
+# Expired entries are kept this long past expiry so they can still be served
+# while an upstream is failing (see CIRCUIT_BREAKERS).
+STALE_GRACE = _env_int("EXTERNAL_STALE_SECONDS", 7 * 86_400, 0, 90 * 86_400)
+EXTERNAL_CACHE_MAX_ENTRIES = _env_int("EXTERNAL_CACHE_MAX_ENTRIES", 50_000, 0, 5_000_000)
+
+_cache_path_env = (os.environ.get("EXTERNAL_CACHE_PATH") or "").strip()
+EXTERNAL_CACHE_PATH = (
+    Path(_cache_path_env) if _cache_path_env else DB_PATH.with_name("external_cache.sqlite3")
+)
+
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+
+def _store() -> sqlite3.Connection:
+    """This thread's connection to the shared cache / rate limit file."""
+    global _schema_ready
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(EXTERNAL_CACHE_PATH, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _local.conn = conn
+    if not _schema_ready:
+        with _schema_lock:
+            if not _schema_ready:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    endpoint TEXT NOT NULL,
+                    status INTEGER NOT NULL,
+                    body TEXT,
+                    fetched_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                    )
+                    """
+                )
+                conn.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_responses_last_used
+                    ON responses (last_used_at)
+                    """
+                )
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS rate_limits (
+                    name TEXT PRIMARY KEY,
+                    next_at REAL NOT NULL
+                    )
+                    """
+                )
+                conn.commit()
+                _schema_ready = True
+    return conn
+
+
+class _ResponseCache:
+    """
+    Persistent (url, params) -> (status, body) store. Entries are evicted least
+    recently used past `max_entries`.
+    """
+
+    # Only refresh last_used_at on a hit once it's this stale, so hits stay reads.
+    _TOUCH_AFTER = 300
+    # Eviction runs after this many writes rather than on every one.
+    _EVICT_EVERY = 200
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def _count(self, endpoint: str, stat: str) -> None:
+        with self._lock:
+            counters = self._stats.setdefault(
+                endpoint,
+                {"hits": 0, "negative_hits": 0, "stale_hits": 0, "misses": 0, "stores": 0},
+            )
+            counters[stat] += 1
+
+    def get(self, endpoint: str, key: str, *, count_miss: bool = True):
+        """Returns (status, body) for a fresh entry, else None."""
+        if self.max_entries <= 0:
+            return None
+        now = time.time()
+        try:
+            conn = _store()
+            row = conn.execute(
+                "SELECT status, body, expires_at, last_used_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None or row[2] <= now:
+                if count_miss:
+                    self._count(endpoint, "misses")
+                return None
+            if now - row[3] > self._TOUCH_AFTER:
+                conn.execute("UPDATE responses SET last_used_at = ? WHERE key = ?", (now, key))
+                conn.commit()
+        except sqlite3.Error:
+            # The cache is an optimization; never fail a lookup because of it.
+            if count_miss:
+                self._count(endpoint, "misses")
+            return None
+        status, body = int(row[0]), row[1]
+        self._count(endpoint, "hits" if status < 400 else "negative_hits")
+        return status, json.loads(body) if body is not None else None
+
+    def get_stale(self, endpoint: str, key: str):
+        """Returns (status, body) for an expired entry still within STALE_GRACE."""
+        if self.max_entries <= 0 or STALE_GRACE <= 0:
+            return None
+        try:
+            row = _store().execute(
+                "SELECT status, body FROM responses WHERE key = ? AND expires_at > ?",
+                (key, time.time() - STALE_GRACE),
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        self._count(endpoint, "stale_hits")
+        return int(row[0]), json.loads(row[1]) if row[1] is not None else None
+
+    def put(self, endpoint: str, key: str, status: int, data, ttl: int) -> None:
+        if self.max_entries <= 0 or ttl <= 0:
+            return
+        now = time.time()
+        body = json.dumps(data, separators=(",", ":")) if data is not None else None
+        try:
+            conn = _store()
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO responses
+                    (key, endpoint, status, body, fetched_at, expires_at, last_used_at)
+                VALUES (?,?,?,?,?,?,?)
+                """,
+                (key, endpoint, int(status), body, now, now + ttl, now),
+            )
+            conn.commit()
+        except sqlite3.Error:
+            return
+        self._count(endpoint, "stores")
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % self._EVICT_EVERY == 0
+        if evict:
+            self.evict()
+
+    def evict(self) -> None:
+        try:
+            conn = _store()
+            conn.execute(
+                "DELETE FROM responses WHERE expires_at <= ?", (time.time() - STALE_GRACE,)
+            )
+            conn.execute(
+                """
+                DELETE FROM responses
+                WHERE key IN (
+                    SELECT key FROM responses
+                    ORDER BY last_used_at DESC
+                    LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+            conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            per_endpoint = {name: dict(c) for name, c in self._stats.items()}
+        hits = sum(c["hits"] + c["negative_hits"] for c in per_endpoint.values())
+        lookups = hits + sum(c["misses"] for c in per_endpoint.values())
+        try:
+            size = _store().execute("SELECT COUNT(1) FROM responses").fetchone()[0]
+        except sqlite3.Error:
+            size = None
+        return {
+            "endpoints": per_endpoint,
+            "lookups": lookups,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            "size": size,
+            "max_entries": self.max_entries,
+        }
+
+
+_cache = _ResponseCache(EXTERNAL_CACHE_MAX_ENTRIES)
+
+
+class RateLimited(requests.RequestException):
+    """
+    No request slot within the caller's max_wait. Subclasses RequestException so
+    callers that already treat transport errors as "lookup unavailable" handle
+    it the same way.
+    """
+
+
+def _min_interval(env_name: str) -> float:
+    try:
+        value = float(os.environ.get(env_name) or "1.0")
+    except ValueError:
+        value = 1.0
+    return max(0.2, min(10.0, value))
+
+
+class _SharedRateLimiter:
+    """
+    Politeness limit shared by every worker process: one request per
+    `interval` seconds. Each caller reserves the next free slot in the
+    rate_limits table (a short BEGIN IMMEDIATE transaction) and then sleeps
+    until it without holding any lock, so threads don't queue behind each
+    other's sleeps. Falls back to a per-process schedule if the file is
+    unavailable.
+    """
+
+    def __init__(self, name: str, interval: float):
+        self.name = name
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._local_next_at = 0.0
+        self._stats = {"acquired": 0, "waited": 0, "rejected": 0, "fallbacks": 0}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _reserve(self, now: float, max_wait: float | None) -> float | None:
+        """Claims a slot and returns its time, or None if it's beyond max_wait."""
+        try:
+            conn = _store()
+            if conn.in_transaction:
+                conn.commit()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT next_at FROM rate_limits WHERE name = ?", (self.name,)
+                ).fetchone()
+                slot = max(float(row[0]) if row else 0.0, now)
+                if max_wait is not None and slot - now > max_wait:
+                    conn.rollback()
+                    return None
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_limits (name, next_at) VALUES (?, ?)",
+                    (self.name, slot + self.interval),
+                )
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            return slot
+        except sqlite3.Error:
+            with self._lock:
+                self._stats["fallbacks"] += 1
+                slot = max(self._local_next_at, now)
+                if max_wait is not None and slot - now > max_wait:
+                    return None
+                self._local_next_at = slot + self.interval
+            return slot
+
+    def acquire(self, max_wait: float | None = None) -> bool:
+        """
+        Waits for a request slot. With `max_wait`, gives up (returning False)
+        instead of waiting longer than that; max_wait=0 is a pure try-acquire.
+        """
+        now = time.time()
+        slot = self._reserve(now, max_wait)
+        if slot is None:
+            with self._lock:
+                self._stats["rejected"] += 1
+            return False
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        with self._lock:
+            self._stats["acquired"] += 1
+            if wait > 0:
+                self._stats["waited"] += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            wait_total, wait_max = self._wait_total, self._wait_max
+        return {
+            **stats,
+            "interval_seconds": self.interval,
+            "mean_wait_seconds": round(wait_total / stats["acquired"], 4)
+            if stats["acquired"]
+            else None,
+            "max_wait_seconds": round(wait_max, 4),
+        }
+
+
+LIMITERS: dict[str, _SharedRateLimiter] = {
+    "musicbrainz": _SharedRateLimiter(
+        "musicbrainz", _min_interval("MUSICBRAINZ_MIN_INTERVAL_SECONDS")
+    ),
+    "coverart": _SharedRateLimiter("coverart", _min_interval("COVERART_MIN_INTERVAL_SECONDS")),
+    "wikidata": _SharedRateLimiter("wikidata", _min_interval("WIKIDATA_MIN_INTERVAL_SECONDS")),
+}
+
+
+class CircuitOpen(requests.RequestException):
+    """An upstream's circuit breaker is open and nothing stale was cached."""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"{name} is unavailable; retrying in {retry_after:.0f}s")
+
+
+class _CircuitBreaker:
+    """
+    Per-process breaker for an upstream. After `failures` consecutive timeouts,
+    connection errors or 5xx responses it opens for `cooldown` seconds, during
+    which lookups fail fast (or are answered stale from the cache). Then a
+    single probe is let through: success closes it, failure reopens it.
+    """
+
+    def __init__(self, name: str, failures: int, cooldown: float):
+        self.name = name
+        self.failures = failures
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._stats = {"failures": 0, "trips": 0, "short_circuited": 0}
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == "closed":
+                return True
+            if self._state == "open" and time.time() - self._opened_at >= self.cooldown:
+                self._state = "half_open"
+            if self._state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            self._stats["short_circuited"] += 1
+            return False
+
+    def retry_after(self) -> float:
+        with self._lock:
+            return max(0.0, self._opened_at + self.cooldown - time.time())
+
+    def release(self) -> None:
+        """Gives back a half-open probe that never reached the upstream."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = "closed"
+            self._consecutive = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._stats["failures"] += 1
+            self._consecutive += 1
+            if self._state == "half_open" or self._consecutive >= self.failures:
+                if self._state != "open":
+                    self._stats["trips"] += 1
+                self._state = "open"
+                self._opened_at = time.time()
+            self._probing = False
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "state": self._state,
+                "consecutive_failures": self._consecutive,
+                "failure_threshold": self.failures,
+                "cooldown_seconds": self.cooldown,
+                "retry_after_seconds": round(
+                    max(0.0, self._opened_at + self.cooldown - time.time()), 1
+                )
+                if self._state == "open"
+                else 0.0,
+            }
+
+
+# Keyed by limiter name; lookups through that limiter go through the breaker.
+CIRCUIT_BREAKERS: dict[str, _CircuitBreaker] = {
+    "musicbrainz": _CircuitBreaker(
+        "musicbrainz",
+        _env_int("MUSICBRAINZ_BREAKER_FAILURES", 3, 1, 100),
+        _env_int("MUSICBRAINZ_BREAKER_COOLDOWN_SECONDS", 30, 1, 3600),
+    ),
+}
+
+
+def user_agent() -> str:
+    # MusicBrainz requires a descriptive User-Agent with contact info.
+    # Override in production via env var.
+    return (
+        os.environ.get("MUSICBRAINZ_USER_AGENT")
+        or "RealTop/1.0 (set MUSICBRAINZ_USER_AGENT; contact: required)"
+    ).strip()
+
+
+EXTERNAL_POOL_SIZE = _env_int("EXTERNAL_POOL_SIZE", 8, 1, 64)
+
+_RATE_LIMITED_HOSTS = frozenset(
+    urlsplit(base).netloc.lower()
+    for base in (MUSICBRAINZ_BASE_URL, COVERART_BASE_URL, WIKIDATA_BASE_URL)
+)
+
+_sessions: dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def _session_for(url: str) -> requests.Session:
+    """
+    Keep-alive session for the url's host, created on first use, so each worker
+    pays the TCP/TLS handshake once per host instead of once per lookup.
+    """
+    host = urlsplit(url).netloc.lower()
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            # Hosts behind a shared rate limiter get no transport retries: a
+            # resend wouldn't take a slot (and MusicBrainz answers 503 when
+            # over its limit). get_json retries those itself, one slot per
+            # attempt. Elsewhere a refused connection is retried once, at once.
+            if host in _RATE_LIMITED_HOSTS:
+                retry = Retry(total=0, raise_on_status=False)
+            else:
+                retry = Retry(
+                    total=1,
+                    connect=1,
+                    read=0,
+                    status=0,
+                    allowed_methods=frozenset({"GET"}),
+                    raise_on_status=False,
+                )
+            adapter = HTTPAdapter(
+                pool_connections=1, pool_maxsize=EXTERNAL_POOL_SIZE, max_retries=retry
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"User-Agent": user_agent(), "Accept": "application/json"})
+            _sessions[host] = session
+    return session
+
+
+def _cache_key(url: str, params: dict | None) -> str:
+    query = urlencode(sorted((params or {}).items()))
+    return hashlib.sha1(f"{url}?{query}".encode("utf-8")).hexdigest()
+
+
+class _SingleFlight:
+    """
+    Coalesces identical concurrent lookups within a worker: the first caller
+    for a key makes the request and every caller that arrives while it is in
+    flight waits for, and shares, its result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, dict[str, Any]] = {}
+        self._coalesced: dict[str, int] = {}
+
+    def do(self, endpoint: str, key: str, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = {"done": threading.Event(), "result": None, "error": None}
+                self._calls[key] = call
+            else:
+                self._coalesced[endpoint] = self._coalesced.get(endpoint, 0) + 1
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"]
+        try:
+            call["result"] = fn()
+            return call["result"]
+        except BaseException as exc:
+            call["error"] = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call["done"].set()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"in_flight": len(self._calls), "coalesced": dict(self._coalesced)}
+
+
+_flights = _SingleFlight()
+
+# get_json retries connection errors and gateway errors a few times with
+# exponential backoff (or the server's Retry-After, if longer), as long as
+# the wait fits within the caller's max_wait.
+EXTERNAL_RETRIES = _env_int("EXTERNAL_RETRIES", 2, 0, 5)
+EXTERNAL_RETRY_BACKOFF_SECONDS = 1.0
+EXTERNAL_RETRY_MAX_DELAY_SECONDS = 30.0
+RETRY_STATUSES = (502, 503, 504)
+
+
+def _retry_delay(attempt: int, retry_after: str | None, max_wait: float | None) -> float | None:
+    """Seconds to wait before retrying, or None when the call should give up."""
+    if attempt >= EXTERNAL_RETRIES:
+        return None
+    delay = EXTERNAL_RETRY_BACKOFF_SECONDS * (2**attempt)
+    try:
+        # Only the delay-seconds form; an HTTP date falls back to the backoff.
+        delay = max(delay, float(retry_after or 0))
+    except ValueError:
+        pass
+    if delay > (max_wait if max_wait is not None else EXTERNAL_RETRY_MAX_DELAY_SECONDS):
+        return None
+    return delay
+
+
+def get_json(
+    endpoint: str,
+    url: str,
+    *,
+    params: dict | None = None,
+    headers: dict | None = None,
+    timeout: float = 10,
+    limiter: str | None = None,
+    max_wait: float | None = None,
+) -> tuple[int, Any]:
+    """
+    GET `url` and return (status, parsed JSON or None), answering from the
+    response cache when possible. On a miss, waits for a slot from the named
+    shared rate limiter, raising RateLimited if none comes within `max_wait`.
+    Concurrent misses for the same url and params share one request; callers
+    must treat the returned data as read-only. Requests go through a pooled
+    keep-alive session for the host. Connection errors and 502/503/504 are
+    retried (see _retry_delay), each attempt taking a new slot and counting
+    towards the circuit breaker; transport errors that remain raise
+    requests.RequestException.
+    """
+    key = _cache_key(url, params)
+    cached = _cache.get(endpoint, key)
+    if cached is not None:
+        return cached
+
+    def fetch() -> tuple[int, Any]:
+        # A flight for this key may have finished between our cache miss and
+        # taking the lead; don't repeat it.
+        cached = _cache.get(endpoint, key, count_miss=False)
+        if cached is not None:
+            return cached
+        breaker = CIRCUIT_BREAKERS.get(limiter) if limiter is not None else None
+        for attempt in range(EXTERNAL_RETRIES + 1):
+            if breaker is not None and not breaker.allow():
+                stale = _cache.get_stale(endpoint, key)
+                if stale is not None:
+                    return stale
+                raise CircuitOpen(breaker.name, breaker.retry_after())
+            # Every attempt, retries included, takes its own rate limit slot.
+            if limiter is not None and not LIMITERS[limiter].acquire(max_wait):
+                if breaker is not None:
+                    breaker.release()
+                raise RateLimited(f"{limiter} rate limit: no slot within {max_wait}s")
+            try:
+                resp = _session_for(url).get(url, params=params, headers=headers, timeout=timeout)
+            except requests.RequestException as exc:
+                if breaker is not None:
+                    breaker.record_failure()
+                delay = _retry_delay(attempt, None, max_wait)
+                if isinstance(exc, requests.ConnectionError) and delay is not None:
+                    time.sleep(delay)
+                    continue
+                if breaker is None:
+                    raise
+                stale = _cache.get_stale(endpoint, key)
+                if stale is not None:
+                    return stale
+                raise
+            if breaker is not None:
+                if resp.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            if resp.status_code in RETRY_STATUSES:
+                delay = _retry_delay(attempt, resp.headers.get("Retry-After"), max_wait)
+                if delay is not None:
+                    resp.close()
+                    time.sleep(delay)
+                    continue
+            if resp.status_code >= 500 and breaker is not None:
+                stale = _cache.get_stale(endpoint, key)
+                if stale is not None:
+                    return stale
+            break
+        if resp.status_code == 404:
+            _cache.put(endpoint, key, 404, None, NEGATIVE_TTL)
+            return 404, None
+        if resp.status_code != 200:
+            # 5xx and 429 are transient; don't remember them.
+            return resp.status_code, None
+        try:
+            data = resp.json()
+        except ValueError:
+            return resp.status_code, None
+        _cache.put(endpoint, key, 200, data, ENDPOINT_TTLS.get(endpoint, 0))
+        return 200, data
+
+    return _flights.do(endpoint, key, fetch)
+
+
+def get_bytes(
+    url: str,
+    *,
+    timeout: float = 15,
+    limiter: str | None = None,
+    max_bytes: int = 5_000_000,
+) -> tuple[int, bytes | None, str]:
+    """
+    GET a binary resource (e.g. an image) through the pooled session for its
+    host, following redirects. Returns (status, body, content type); the body is
+    None unless the status is 200 and it fits in `max_bytes`. Not cached.
+    """
+    if limiter is not None:
+        LIMITERS[limiter].acquire()
+    with _session_for(url).get(
+        url, timeout=timeout, stream=True, headers={"Accept": "image/*"}
+    ) as resp:
+        content_type = (resp.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        if resp.status_code != 200:
+            return resp.status_code, None, content_type
+        body = resp.raw.read(max_bytes + 1, decode_content=True)
+        if len(body) > max_bytes:
+            return 413, None, content_type
+        return 200, body, content_type
+
+
+def external_cache_stats() -> dict[str, Any]:
+    return {**_cache.stats(), "single_flight": _flights.stats()}
+
+
+def rate_limit_stats() -> dict[str, Any]:
+    return {name: limiter.stats() for name, limiter in LIMITERS.items()}
+
+
+def circuit_breaker_stats() -> dict[str, Any]:
+    return {name: breaker.stats() for name, breaker in CIRCUIT_BREAKERS.items()}
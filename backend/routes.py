@@ -12,17 +12,19 @@ from datetime import datetime, timezone, timedelta
 from urllib.parse import urlsplit, urlunsplit
 from urllib.parse import urlencode, quote
 import os
-import time
+import threading
 import re
 import requests
 import json
-import threading
 from werkzeug.utils import secure_filename
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from flask_login import login_user, logout_user, login_required, current_user
 import random
 import uuid
 
+from backend.artwork_mirror import is_resolved_artwork
 from backend.database import (
     get_ratings,
     get_ratings_by_type,
@@ -34,10 +36,6 @@ from backend.database import (
     get_user_by_id,
     get_user_by_username_or_email,
     get_user_by_username,
-    search_users_by_username,
-    search_ratings,
-    search_playlists,
-    get_ratings_by_user,
     get_ratings_by_user_paginated,
     verify_password,
     get_rating_owner,
@@ -71,7 +69,6 @@ from backend.database import (
     get_playlist_songs,
     add_song_to_playlist,
     add_song,
-    search_songs,
     remove_song_from_playlist,
     delete_playlist,
     is_playlist_favorited_by_user,
@@ -103,13 +100,47 @@ from backend.database import (
     get_users_who_rated_same_subject,
     count_users_who_rated_same_subject,
     get_subject_activity_timeseries,
-    search_rated_subjects,
     get_subject_overall_summary,
+    get_subject_score_distribution,
+    get_user_counters,
+    get_subjects_comparison,
+    get_trending_subjects,
+    LEADERBOARDS,
+    get_leaderboard,
     get_rating_reactions_summary,
     get_user_rating_reactions,
     toggle_rating_reaction,
     activity_exists,
     get_reaction_counts_for_ratings,
+    mb_catalog_query_fresh,
+    record_mb_catalog_items,
+    search_mb_catalog,
+    enqueue_artwork_job,
+    get_indexed_artwork,
+    get_artwork_job_status,
+)
+from backend.external import (
+    COMMONS_BASE_URL,
+    COVERART_BASE_URL,
+    MUSICBRAINZ_BASE_URL,
+    WIKIDATA_BASE_URL,
+    CircuitOpen,
+    RateLimited,
+    circuit_breaker_stats,
+    external_cache_stats,
+    get_json,
+    rate_limit_stats,
+)
+from backend.search import (
+    did_you_mean,
+    filter_ratings,
+    fuzzy_search_users,
+    search_all,
+    search_cache_stats,
+    search_discussions,
+    search_entity,
+    search_songs,
+    suggest_rated_subjects,
 )
 
 # Initialize routes with Blueprint
@@ -121,92 +152,43 @@ app = Blueprint("main", __name__)
 # MusicBrainz
 ###############################################
 
-_MB_LAST_CALL_AT: float = 0.0
-_MB_THROTTLE_LOCK = threading.Lock()
-
-_CAA_LAST_CALL_AT: float = 0.0
-_CAA_THROTTLE_LOCK = threading.Lock()
 
-_WIKIDATA_LAST_CALL_AT: float = 0.0
-_WIKIDATA_THROTTLE_LOCK = threading.Lock()
+def _mb_search_max_wait() -> float:
+    # Interactive searches give up on the shared MusicBrainz budget after this
+    # long instead of tying up a request thread.
+    try:
+        value = float(os.environ.get("MUSICBRAINZ_SEARCH_MAX_WAIT_SECONDS") or "2.0")
+    except ValueError:
+        value = 2.0
+    return max(0.0, min(10.0, value))
 
 
-def _musicbrainz_user_agent() -> str:
-    # MusicBrainz requires a descriptive User-Agent with contact info.
-    # Override in production via env var.
-    return (
-        os.environ.get("MUSICBRAINZ_USER_AGENT")
-        or "RealTop/1.0 (set MUSICBRAINZ_USER_AGENT; contact: required)"
-    ).strip()
+def _artwork_json(endpoint: str, url: str, *, strict: bool, **kwargs):
+    """
+    get_json() for artwork lookups, with failures reported as (None, None).
+    With `strict`, failures that may pass (transport errors, rate limits, an
+    open circuit breaker, 5xx) raise instead, so a caller like the backfill
+    can tell "no artwork" from "couldn't look".
+    """
+    try:
+        status, data = get_json(endpoint, url, **kwargs)
+    except requests.RequestException:
+        if strict:
+            raise
+        return None, None
+    if strict and status >= 500:
+        raise requests.HTTPError(f"{endpoint} lookup failed with HTTP {status}")
+    return status, data
 
 
-def _mb_throttle() -> None:
-    # Basic politeness throttle (MusicBrainz rate limits).
-    global _MB_LAST_CALL_AT
-    with _MB_THROTTLE_LOCK:
-        try:
-            min_interval = float(
-                os.environ.get("MUSICBRAINZ_MIN_INTERVAL_SECONDS") or "1.0"
-            )
-        except ValueError:
-            min_interval = 1.0
-        min_interval = max(0.2, min(10.0, min_interval))
-        now = time.time()
-        wait = (_MB_LAST_CALL_AT + min_interval) - now
-        if wait > 0:
-            time.sleep(min(wait, min_interval + 0.25))
-        _MB_LAST_CALL_AT = time.time()
-
-
-def _caa_throttle() -> None:
-    """Politeness throttle for Cover Art Archive requests."""
-    global _CAA_LAST_CALL_AT
-    with _CAA_THROTTLE_LOCK:
-        try:
-            min_interval = float(os.environ.get("COVERART_MIN_INTERVAL_SECONDS") or "1.0")
-        except ValueError:
-            min_interval = 1.0
-        min_interval = max(0.2, min(10.0, min_interval))
-        now = time.time()
-        wait = (_CAA_LAST_CALL_AT + min_interval) - now
-        if wait > 0:
-            time.sleep(min(wait, min_interval + 0.25))
-        _CAA_LAST_CALL_AT = time.time()
-
-
-def _wikidata_throttle() -> None:
-    """Politeness throttle for Wikidata requests."""
-    global _WIKIDATA_LAST_CALL_AT
-    with _WIKIDATA_THROTTLE_LOCK:
-        try:
-            min_interval = float(os.environ.get("WIKIDATA_MIN_INTERVAL_SECONDS") or "1.0")
-        except ValueError:
-            min_interval = 1.0
-        min_interval = max(0.2, min(10.0, min_interval))
-        now = time.time()
-        wait = (_WIKIDATA_LAST_CALL_AT + min_interval) - now
-        if wait > 0:
-            time.sleep(min(wait, min_interval + 0.25))
-        _WIKIDATA_LAST_CALL_AT = time.time()
-
-
-def _cover_art_url_for_release_group(release_group_mbid: str) -> str | None:
+def _cover_art_url_for_release_group(release_group_mbid: str, strict: bool = False) -> str | None:
     mbid = (release_group_mbid or "").strip()
     if not mbid:
         return None
     # Cover Art Archive supports release-group lookup.
-    url = f"https://coverartarchive.org/release-group/{mbid}"
-    headers = {"Accept": "application/json", "User-Agent": _musicbrainz_user_agent()}
-    try:
-        _caa_throttle()
-        resp = requests.get(url, headers=headers, timeout=8)
-    except requests.RequestException:
-        return None
-    if resp.status_code != 200:
-        return None
-    try:
-        data = resp.json()
-    except ValueError:
+    url = f"{COVERART_BASE_URL}/release-group/{mbid}"
+    status, data = _artwork_json("caa", url, strict=strict, timeout=8, limiter="coverart")
+    if status != 200 or data is None:
         return None
     images = data.get("images") or []
     if not images:
@@ -229,22 +211,13 @@ def _cover_art_url_for_release_group(release_group_mbid: str) -> str | None:
     )
 
 
-def _cover_art_url_for_release(release_mbid: str) -> str | None:
+def _cover_art_url_for_release(release_mbid: str, strict: bool = False) -> str | None:
     mbid = (release_mbid or "").strip()
     if not mbid:
         return None
-    url = f"https://coverartarchive.org/release/{mbid}"
-    headers = {"Accept": "application/json", "User-Agent": _musicbrainz_user_agent()}
-    try:
-        _caa_throttle()
-        resp = requests.get(url, headers=headers, timeout=8)
-    except requests.RequestException:
-        return None
-    if resp.status_code != 200:
-        return None
-    try:
-        data = resp.json()
-    except ValueError:
+    url = f"{COVERART_BASE_URL}/release/{mbid}"
+    status, data = _artwork_json("caa", url, strict=strict, timeout=8, limiter="coverart")
+    if status != 200 or data is None:
         return None
     images = data.get("images") or []
     if not images:
@@ -267,90 +240,106 @@ def _cover_art_url_for_release(release_mbid: str) -> str | None:
     )
 
 
-def _cover_art_url_for_recording(recording_mbid: str) -> str | None:
+def _cover_art_url_for_recording(recording_mbid: str, strict: bool = False) -> str | None:
     mbid = (recording_mbid or "").strip()
     if not mbid:
         return None
 
-    # Recordings don't have cover art; fetch a related release and use its cover.
-    url = f"https://musicbrainz.org/ws/2/recording/{mbid}"
-    headers = {"User-Agent": _musicbrainz_user_agent(), "Accept": "application/json"}
-    try:
-        _mb_throttle()
-        resp = requests.get(url, params={"fmt": "json", "inc": "releases"}, headers=headers, timeout=12)
-    except requests.RequestException:
-        return None
-    if resp.status_code != 200:
-        return None
-    try:
-        data = resp.json()
-    except ValueError:
+    # Recordings don't have cover art. A single lookup returns the recording's
+    # releases together with their release groups, so the candidate covers
+    # (each release, then its album/release-group) are known up front.
+    url = f"{MUSICBRAINZ_BASE_URL}/ws/2/recording/{mbid}"
+    status, data = _artwork_json(
+        "mb_lookup",
+        url,
+        strict=strict,
+        params={"fmt": "json", "inc": "releases+release-groups"},
+        timeout=12,
+        limiter="musicbrainz",
+    )
+    if status != 200 or data is None:
         return None
 
     releases = data.get("releases") or []
     if not releases:
         return None
 
-    def _release_group_id_for_release(release_id: str) -> str | None:
-        rid = (release_id or "").strip()
-        if not rid:
-            return None
-        url = f"https://musicbrainz.org/ws/2/release/{rid}"
-        headers = {"User-Agent": _musicbrainz_user_agent(), "Accept": "application/json"}
-        try:
-            _mb_throttle()
-            resp = requests.get(
-                url,
-                params={"fmt": "json", "inc": "release-groups"},
-                headers=headers,
-                timeout=12,
-            )
-        except requests.RequestException:
-            return None
-        if resp.status_code != 200:
-            return None
-        try:
-            data = resp.json()
-        except ValueError:
-            return None
-        rg = data.get("release-group") or {}
-        rgid = (rg.get("id") or "").strip()
-        return rgid or None
-
-    # Try a few releases; if no direct release cover exists, fall back to the
-    # album/release-group cover art.
+    candidates = []
+    seen_groups = set()
     for rel in releases[:5]:
         release_id = (rel.get("id") or "").strip()
-        if not release_id:
-            continue
-        cover = _cover_art_url_for_release(release_id)
-        if cover:
-            return cover
-        rgid = _release_group_id_for_release(release_id)
-        if rgid:
-            cover = _cover_art_url_for_release_group(rgid)
+        if release_id:
+            candidates.append((_cover_art_url_for_release, release_id))
+        rgid = ((rel.get("release-group") or {}).get("id") or "").strip()
+        if rgid and rgid not in seen_groups:
+            seen_groups.add(rgid)
+            candidates.append((_cover_art_url_for_release_group, rgid))
+
+    return _first_cover(candidates, strict=strict)
+
+
+def _cover_probe_concurrency() -> int:
+    raw = (os.getenv("COVER_PROBE_CONCURRENCY") or "").strip()
+    try:
+        value = int(raw) if raw else 2
+    except ValueError:
+        value = 2
+    return max(1, min(value, 4))
+
+
+_cover_probe_pool = ThreadPoolExecutor(
+    max_workers=_cover_probe_concurrency(), thread_name_prefix="cover-probe"
+)
+
+
+def _first_cover(candidates, strict: bool = False) -> str | None:
+    """Probe candidate covers a few at a time and return the first hit.
+
+    Probes still go through the shared coverart limiter, so running them
+    concurrently overlaps network latency without exceeding the rate budget.
+    Candidates are considered in order; once one has art, probes that have
+    not started yet are cancelled. With `strict`, a miss where some probe
+    failed raises that failure instead of returning None.
+    """
+    window = _cover_probe_concurrency()
+    pending = list(candidates)
+    inflight = []
+    error = None
+    try:
+        while pending or inflight:
+            while pending and len(inflight) < window:
+                fn, arg = pending.pop(0)
+                inflight.append(_cover_probe_pool.submit(fn, arg, strict))
+            future = inflight.pop(0)
+            try:
+                cover = future.result()
+            except Exception as exc:
+                error = error or exc
+                cover = None
             if cover:
                 return cover
-
-    return None
+        if strict and error is not None:
+            raise error
+        return None
+    finally:
+        for future in inflight:
+            future.cancel()
 
 
-def _wikidata_qid_from_artist(mbid: str) -> str | None:
+def _wikidata_qid_from_artist(mbid: str, strict: bool = False) -> str | None:
     mbid = (mbid or "").strip()
     if not mbid:
         return None
-    url = f"https://musicbrainz.org/ws/2/artist/{mbid}"
-    headers = {"User-Agent": _musicbrainz_user_agent(), "Accept": "application/json"}
-    try:
-        _mb_throttle()
-        resp = requests.get(url, params={"fmt": "json", "inc": "url-rels"}, headers=headers, timeout=12)
-    except requests.RequestException:
-        return None
-    if resp.status_code != 200:
-        return None
-    try:
-        data = resp.json()
-    except ValueError:
+    url = f"{MUSICBRAINZ_BASE_URL}/ws/2/artist/{mbid}"
+    status, data = _artwork_json(
+        "mb_lookup",
+        url,
+        strict=strict,
+        params={"fmt": "json", "inc": "url-rels"},
+        timeout=12,
+        limiter="musicbrainz",
+    )
+    if status != 200 or data is None:
         return None
 
     rels = data.get("relations") or []
@@ -364,23 +353,14 @@ def _wikidata_qid_from_artist(mbid: str) -> str | None:
     return None
 
 
-def _artist_image_url(artist_mbid: str) -> str | None:
-    qid = _wikidata_qid_from_artist(artist_mbid)
+def _artist_image_url(artist_mbid: str, strict: bool = False) -> str | None:
+    qid = _wikidata_qid_from_artist(artist_mbid, strict)
     if not qid:
         return None
 
-    url = f"https://www.wikidata.org/wiki/Special:EntityData/{qid}.json"
-    headers = {"Accept": "application/json", "User-Agent": _musicbrainz_user_agent()}
-    try:
-        _wikidata_throttle()
-        resp = requests.get(url, headers=headers, timeout=10)
-    except requests.RequestException:
-        return None
-    if resp.status_code != 200:
-        return None
-    try:
-        data = resp.json()
-    except ValueError:
+    url = f"{WIKIDATA_BASE_URL}/wiki/Special:EntityData/{qid}.json"
+    status, data = _artwork_json("wikidata", url, strict=strict, timeout=10, limiter="wikidata")
+    if status != 200 or data is None:
         return None
 
     entity = ((data.get("entities") or {}).get(qid) or {})
@@ -403,7 +383,23 @@ def _artist_image_url(artist_mbid: str) -> str | None:
     width = max(200, min(2000, width))
 
     safe = quote(filename.replace(" ", "_"), safe="")
-    return f"https://commons.wikimedia.org/wiki/Special:FilePath/{safe}?width={width}"
+    return f"{COMMONS_BASE_URL}/wiki/Special:FilePath/{safe}?width={width}"
+
+
+def resolve_artwork_url(kind: str, mbid: str, strict: bool = False) -> str | None:
+    """
+    Cover art (albums, songs) or a Wikidata image (artists) for an mbid. With
+    `strict`, lookups that failed raise (see _artwork_json) rather than
+    looking like missing artwork.
+    """
+    kind = (kind or "").strip().lower()
+    if kind == "album":
+        return _cover_art_url_for_release_group(mbid, strict) or None
+    if kind == "song":
+        return _cover_art_url_for_recording(mbid, strict) or None
+    if kind == "artist":
+        return _artist_image_url(mbid, strict) or None
+    return None
 
 
 def _artist_credit_to_string(credit) -> str:
@@ -466,6 +462,71 @@ def _mb_field_expr(field: str, text: str) -> str:
     return "(" + " AND ".join([f"{field}:{t}*" for t in tokens]) + ")"
 
 
+class _MbQueryPlanner:
+    """
+    Orders _mb_search query variants by how likely each is to return results.
+    A query that has been answered before goes straight to the variant that
+    won last time; otherwise variants are ranked by their observed hit rate for
+    the search kind, seeded with a prior that favors the fielded query.
+    """
+
+    _PRIORS = {"fielded": 0.7, "combined": 0.5, "plain": 0.3}
+
+    def __init__(self, max_winners: int = 2000):
+        self.max_winners = max_winners
+        self._lock = threading.Lock()
+        self._winners: OrderedDict[tuple[str, str, str], str] = OrderedDict()
+        self._tries: dict[tuple[str, str], list[int]] = {}
+
+    def _score(self, kind: str, name: str) -> float:
+        hits, tries = self._tries.get((kind, name), (0, 0))
+        prior = self._PRIORS.get(name, 0.1)
+        return (hits + 2 * prior) / (tries + 2)
+
+    def plan(self, plan_key, variants: list[tuple[str, str]]) -> list[tuple[str, str]]:
+        kind = plan_key[0]
+        with self._lock:
+            winner = self._winners.get(plan_key)
+            if winner is not None:
+                self._winners.move_to_end(plan_key)
+            order = {name: i for i, (name, _) in enumerate(variants)}
+            return sorted(
+                variants,
+                key=lambda v: (v[0] != winner, -self._score(kind, v[0]), order[v[0]]),
+            )
+
+    def record(self, plan_key, tried: list[str], winner: str | None) -> None:
+        kind = plan_key[0]
+        with self._lock:
+            for name in tried:
+                counts = self._tries.setdefault((kind, name), [0, 0])
+                counts[1] += 1
+                if name == winner:
+                    counts[0] += 1
+            if winner is None:
+                self._winners.pop(plan_key, None)
+                return
+            self._winners[plan_key] = winner
+            self._winners.move_to_end(plan_key)
+            while len(self._winners) > self.max_winners:
+                self._winners.popitem(last=False)
+
+
+_mb_planner = _MbQueryPlanner()
+_mb_variant_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="mb-variant")
+_SKIPPED = object()
+
+
+def _mb_hedge_seconds() -> float:
+    # Start the next variant early once the current one has been pending this
+    # long. Hedging sooner than a typical response just spends rate budget.
+    try:
+        value = float(os.environ.get("MUSICBRAINZ_HEDGE_SECONDS") or "1.0")
+    except ValueError:
+        value = 1.0
+    return max(0.0, min(12.0, value))
+
+
 def _mb_search(kind: str, q: str, *, limit: int, offset: int, artist: str | None = None):
     kind = (kind or "").strip().lower()
     q = (q or "").strip()
@@ -485,7 +546,7 @@ def _mb_search(kind: str, q: str, *, limit: int, offset: int, artist: str | None
         key = "recordings"
         kind_label = "Song"
 
-    url = f"https://musicbrainz.org/ws/2/{endpoint}"
+    url = f"{MUSICBRAINZ_BASE_URL}/ws/2/{endpoint}"
 
     title_field = "name"
     if kind == "song":
@@ -495,44 +556,112 @@ def _mb_search(kind: str, q: str, *, limit: int, offset: int, artist: str | None
 
     title_expr = _mb_field_expr(title_field, q)
     artist_expr = _mb_field_expr("artist", artist) if artist else ""
-    queries: list[str] = []
+    variants: list[tuple[str, str]] = []
 
-    # 1) Flexible fielded match (word/partial-word), 2) broad fallback.
+    # 1) Flexible fielded match (word/partial-word), 2) broad fallbacks.
     if title_expr and artist_expr and kind in {"song", "album"}:
-        queries.append(f"{title_expr} AND {artist_expr}")
+        variants.append(("fielded", f"{title_expr} AND {artist_expr}"))
     elif title_expr:
-        queries.append(title_expr)
+        variants.append(("fielded", title_expr))
 
     if artist and kind in {"song", "album"}:
-        queries.append(f"{q} {artist}".strip())
-    queries.append(q)
+        variants.append(("combined", f"{q} {artist}".strip()))
+    variants.append(("plain", q))
 
     # De-dupe while preserving order.
     seen_q: set[str] = set()
-    normalized_queries: list[str] = []
-    for qq in queries:
+    normalized_variants: list[tuple[str, str]] = []
+    for name, qq in variants:
         key_q = (qq or "").strip()
         if not key_q or key_q in seen_q:
             continue
         seen_q.add(key_q)
-        normalized_queries.append(key_q)
+        normalized_variants.append((name, key_q))
 
-    headers = {"User-Agent": _musicbrainz_user_agent(), "Accept": "application/json"}
+    plan_key = (kind, " ".join(q.lower().split()), " ".join(artist.lower().split()))
+    planned = _mb_planner.plan(plan_key, normalized_variants)
+
+    stop = threading.Event()
+
+    def _run(query: str, hedged: bool = False):
+        # A hedged variant only goes out if a rate limit slot is free right
+        # now and no earlier variant has answered yet; otherwise it is skipped
+        # and, if still needed, rerun in order.
+        if hedged and stop.is_set():
+            return _SKIPPED
+        params = {"query": query, "fmt": "json", "limit": int(limit), "offset": int(offset)}
+        try:
+            status, payload = get_json(
+                "mb_search",
+                url,
+                params=params,
+                timeout=12,
+                limiter="musicbrainz",
+                max_wait=0 if hedged else _mb_search_max_wait(),
+            )
+        except RateLimited:
+            if hedged:
+                return _SKIPPED
+            raise
+        if status >= 400:
+            return None
+        if payload is None:
+            raise ValueError("MusicBrainz returned invalid JSON")
+        return payload
+
+    # Variants run in planned order on the request thread, but the next one is
+    # started early (hedged) on _mb_variant_pool when the current one hasn't
+    # answered within MUSICBRAINZ_HEDGE_SECONDS, so a miss doesn't cost a full
+    # round trip before the fallback even begins. A hedge never waits for the
+    # shared rate limit: while searches queue for MusicBrainz, the time spent
+    # waiting isn't a slow response, and an extra request would only lengthen
+    # the queue. Only hedges use the pool, so a busy pool never holds up a
+    # search.
+    hedge = _mb_hedge_seconds()
+    hedged: dict[int, Future] = {}
+
+    def _start_hedge(index: int) -> None:
+        if not stop.is_set():
+            hedged[index] = _mb_variant_pool.submit(_run, planned[index][1], True)
 
     data = {}
     raw_items = []
     total_count = 0
-    for query in normalized_queries:
-        params = {"query": query, "fmt": "json", "limit": int(limit), "offset": int(offset)}
-        _mb_throttle()
-        resp = requests.get(url, params=params, headers=headers, timeout=12)
-        if resp.status_code >= 400:
-            continue
-        data = resp.json()
-        raw_items = data.get(key) or []
-        total_count = int(data.get("count") or 0)
-        if raw_items:
-            break
+    tried: list[str] = []
+    winner = None
+    try:
+        for i, (name, query) in enumerate(planned):
+            payload = _SKIPPED
+            future = hedged.pop(i, None)
+            # A hedge still queued behind other searches' hedges is run here
+            # instead.
+            if future is not None and not future.cancel():
+                payload = future.result()
+            if payload is _SKIPPED:
+                timer = None
+                if i + 1 < len(planned):
+                    timer = threading.Timer(hedge, _start_hedge, (i + 1,))
+                    timer.daemon = True
+                    timer.start()
+                try:
+                    payload = _run(query)
+                finally:
+                    if timer is not None:
+                        timer.cancel()
+                        timer.join()
+            tried.append(name)
+            if payload is not None:
+                data = payload
+                raw_items = data.get(key) or []
+                total_count = int(data.get("count") or 0)
+                if raw_items:
+                    winner = name
+                    break
+    finally:
+        stop.set()
+        for future in hedged.values():
+            future.cancel()
+    _mb_planner.record(plan_key, tried, winner)
 
     if not raw_items and not data:
         return [], 0
@@ -615,6 +744,24 @@ def _mb_search(kind: str, q: str, *, limit: int, offset: int, artist: str | None
     return deduped, total_count
 
 
+def _mb_local_min_results() -> int:
+    # How many local catalog hits make a remote MusicBrainz search unnecessary.
+    try:
+        value = int((os.environ.get("MUSICBRAINZ_LOCAL_MIN_RESULTS") or "5").strip())
+    except ValueError:
+        value = 5
+    return max(1, min(20, value))
+
+
+def _mb_local_ttl_seconds() -> float:
+    # How long a local catalog answer stands before MusicBrainz is asked again.
+    try:
+        value = float((os.environ.get("MUSICBRAINZ_LOCAL_TTL_SECONDS") or "604800").strip())
+    except ValueError:
+        value = 604800.0
+    return max(0.0, value)
+
+
 @app.route("/api/musicbrainz/search", methods=["GET"])
 def musicbrainz_search_api():
     q = (request.args.get("q") or "").strip()
@@ -627,14 +774,46 @@ def musicbrainz_search_api():
         limit = 8
     limit = max(1, min(20, limit))
 
+    # Answer from entities we've already seen when there are enough of them
+    # and MusicBrainz answered this search (or a prefix of it) within the TTL;
+    # only go to MusicBrainz (throttled) otherwise.
+    local = search_mb_catalog(kind, q, artist=artist, limit=limit)
+    if len(local) >= min(limit, _mb_local_min_results()) and mb_catalog_query_fresh(
+        kind, q, artist=artist, max_age_seconds=_mb_local_ttl_seconds()
+    ):
+        return jsonify(
+            {"ok": True, "kind": kind, "count": len(local), "items": local, "source": "local"}
+        )
+
     try:
         items, count = _mb_search(kind, q, limit=limit, offset=0, artist=artist)
-        return jsonify({"ok": True, "kind": kind, "count": count, "items": items})
-    except requests.RequestException:
-        return jsonify({"ok": False, "error": "Something went wrong. Try again."}), 502
-    except ValueError:
+    except (requests.RequestException, ValueError) as exc:
+        if local:
+            return jsonify(
+                {"ok": True, "kind": kind, "count": len(local), "items": local, "source": "local"}
+            )
+        if isinstance(exc, CircuitOpen):
+            retry_after = max(1, int(exc.retry_after + 0.5))
+            resp = jsonify(
+                {
+                    "ok": False,
+                    "error": "MusicBrainz is unavailable right now. "
+                    f"Try again in {retry_after}s.",
+                    "retry_after": retry_after,
+                }
+            )
+            resp.headers["Retry-After"] = str(retry_after)
+            return resp, 503
+        if isinstance(exc, RateLimited):
+            return jsonify({"ok": False, "error": "Search is busy. Try again in a moment."}), 503
         return jsonify({"ok": False, "error": "Something went wrong. Try again."}), 502
 
+    record_mb_catalog_items(kind, items, query=q, artist=artist)
+    seen = {it.get("mbid") for it in items}
+    items = items + [it for it in local if it["mbid"] not in seen][: max(0, limit - len(items))]
+    return jsonify({"ok": True, "kind": kind, "count": count, "items": items, "source": "remote"})
+
+
 # Home page
 @app.route("/")
 def home():
@@ -676,10 +855,22 @@ def browse():
     raw_order = (request.args.get("order") or "recent").strip().lower()
     active_order = raw_order if raw_order in {"recent", "oldest"} else "recent"
 
+    filter_text = (request.args.get("filter") or "").strip()[:300]
+    filter_errors: list[str] = []
+
     page, per_page, offset = _parse_pagination()
     limit = per_page + 1
 
-    if active_type == "songs":
+    if filter_text:
+        # The type tabs still apply: they just add a type term.
+        type_term = "" if active_type == "all" else f"type:{active_type} "
+        raw_ratings, filter_errors = filter_ratings(
+            type_term + filter_text,
+            limit=limit,
+            offset=offset,
+            order=active_order,
+        )
+    elif active_type == "songs":
         raw_ratings = get_ratings_by_type(
             "Song",
             limit=limit,
@@ -715,6 +906,8 @@ def browse():
         ratings=ratings,
         active_type=active_type,
         active_order=active_order,
+        filter_text=filter_text,
+        filter_errors=filter_errors,
         owner_pics=owner_pics,
         reactions_map=reactions_map,
         percent_map=percent_map,
@@ -736,6 +929,8 @@ def search():
         {"key": "users", "label": "Users"},
         {"key": "playlists", "label": "Playlists"},
         {"key": "ratings", "label": "Ratings"},
+        {"key": "songs", "label": "Songs"},
+        {"key": "discussions", "label": "Discussions"},
     ]
     allowed_tabs = {t["key"] for t in tabs}
     active_tab = (request.args.get("tab") or "all").strip().lower()
@@ -745,33 +940,47 @@ def search():
     page, per_page, offset = _parse_pagination()
     limit = per_page + 1
 
-    users_raw = []
-    playlists_raw = []
-    ratings_raw = []
+    raw_items = []
     if query:
-        if active_tab in {"all", "users"}:
-            users_raw = search_users_by_username(query, limit=limit, offset=offset)
-        if active_tab in {"all", "playlists"}:
-            playlists_raw = search_playlists(query, limit=limit, offset=offset)
-        if active_tab in {"all", "ratings"}:
-            ratings_raw = search_ratings(query, limit=limit, offset=offset)
-
-    if active_tab == "users":
-        has_next = len(users_raw) > per_page
-    elif active_tab == "playlists":
-        has_next = len(playlists_raw) > per_page
-    elif active_tab == "ratings":
-        has_next = len(ratings_raw) > per_page
-    else:
-        has_next = (
-            len(users_raw) > per_page
-            or len(playlists_raw) > per_page
-            or len(ratings_raw) > per_page
-        )
+        if active_tab == "all":
+            raw_items = search_all(query, limit=limit, offset=offset)
+        elif active_tab == "discussions":
+            raw_items = search_discussions(
+                query,
+                limit=limit,
+                offset=offset,
+                viewer_user_id=current_user.id if current_user.is_authenticated else None,
+            )
+        else:
+            raw_items = search_entity(active_tab, query, limit=limit, offset=offset)
+
+    # Nothing matched as typed: offer close usernames on the users tab and a
+    # spelling suggestion everywhere, instead of an empty page.
+    fuzzy = False
+    suggestion = None
+    if query and not raw_items and page == 1:
+        if active_tab == "users":
+            raw_items = fuzzy_search_users(query, limit=per_page)
+            fuzzy = bool(raw_items)
+        if not raw_items:
+            suggestion = did_you_mean(query)
 
-    users = users_raw[:per_page]
-    playlists = playlists_raw[:per_page]
-    ratings = ratings_raw[:per_page]
+    has_next = len(raw_items) > per_page
+    items = raw_items[:per_page]
+
+    results = items if active_tab == "all" else []
+    users = items if active_tab == "users" else [h["item"] for h in results if h["type"] == "user"]
+    playlists = items if active_tab == "playlists" else []
+    songs = items if active_tab == "songs" else []
+    discussions = [
+        {**hit, "time_ago": _format_time_ago(hit["item"]["created_at"] or "")}
+        for hit in (items if active_tab == "discussions" else [])
+    ]
+    ratings = (
+        items
+        if active_tab == "ratings"
+        else [h["item"] for h in results if h["type"] == "rating"]
+    )
 
     owner_pics = _get_owner_pics_for_ratings(ratings)
     reactions_map = _build_reactions_map(ratings)
@@ -781,9 +990,14 @@ def search():
         tabs=tabs,
         active_tab=active_tab,
         query=query,
+        fuzzy=fuzzy,
+        suggestion=suggestion,
+        results=results,
         users=users,
         playlists=playlists,
         ratings=ratings,
+        songs=songs,
+        discussions=discussions,
         owner_pics=owner_pics,
         reactions_map=reactions_map,
         percent_map=percent_map,
@@ -791,23 +1005,31 @@ def search():
             page=page,
             per_page=per_page,
             has_next=has_next,
-            item_count=(
-                len(users)
-                if active_tab == "users"
-                else (
-                    len(playlists)
-                    if active_tab == "playlists"
-                    else (
-                        len(ratings)
-                        if active_tab == "ratings"
-                        else (len(users) + len(playlists) + len(ratings))
-                    )
-                )
-            ),
+            item_count=len(items),
         ),
     )
 
 
+@app.route("/api/external/cache-stats", methods=["GET"])
+def external_cache_stats_api():
+    return jsonify({"ok": True, "cache": external_cache_stats()})
+
+
+@app.route("/api/external/rate-limits", methods=["GET"])
+def external_rate_limits_api():
+    return jsonify({"ok": True, "limiters": rate_limit_stats()})
+
+
+@app.route("/api/external/circuit-breakers", methods=["GET"])
+def external_circuit_breakers_api():
+    return jsonify({"ok": True, "breakers": circuit_breaker_stats()})
+
+
+@app.route("/api/search/cache-stats", methods=["GET"])
+def search_cache_stats_api():
+    return jsonify({"ok": True, "cache": search_cache_stats()})
+
+
 @app.route("/favorites")
 def favorites():
     raw_tab = request.args.get("tab", "ratings").strip().lower()
@@ -1204,7 +1426,46 @@ def playlists_create():
 
 @app.route("/charts")
 def charts():
-    return render_template("charts.html")
+    tabs = [
+        {"key": "explore", "label": "Explore"},
+        {"key": "trending", "label": "Trending"},
+    ]
+    allowed_tabs = {t["key"] for t in tabs}
+    active_tab = (request.args.get("tab") or "explore").strip().lower()
+    if active_tab not in allowed_tabs:
+        active_tab = "explore"
+
+    raw_kind = (request.args.get("kind") or "all").strip().lower()
+    trending_kind = raw_kind if raw_kind in {"all", "song", "album", "artist"} else "all"
+
+    trending = []
+    if active_tab == "trending":
+        trending = get_trending_subjects(
+            kind=None if trending_kind == "all" else trending_kind,
+            limit=25,
+        )
+
+    return render_template(
+        "charts.html",
+        tabs=tabs,
+        active_tab=active_tab,
+        trending=trending,
+        trending_kind=trending_kind,
+    )
+
+
+@app.route("/api/charts/trending", methods=["GET"])
+def charts_trending_api():
+    raw_kind = (request.args.get("kind") or "all").strip().lower()
+    kind = raw_kind if raw_kind in {"all", "song", "album", "artist"} else "all"
+    try:
+        limit = int((request.args.get("limit") or "10").strip())
+    except ValueError:
+        limit = 10
+    limit = max(1, min(50, limit))
+
+    items = get_trending_subjects(kind=None if kind == "all" else kind, limit=limit)
+    return jsonify({"ok": True, "kind": kind, "items": items})
 
 
 @app.route("/api/charts/subjects", methods=["GET"])
@@ -1219,7 +1480,7 @@ def charts_subjects_api():
         limit = 10
     limit = max(1, min(50, limit))
 
-    items = search_rated_subjects(kind=kind, q=q, artist=artist, limit=limit)
+    items = suggest_rated_subjects(kind=kind, q=q, artist=artist, limit=limit)
     return jsonify({"ok": True, "kind": kind, "items": items})
 
 
@@ -1302,6 +1563,115 @@ def charts_subject_summary_api():
     return jsonify({"ok": True, "summary": summary})
 
 
+@app.route("/api/charts/subject-distribution", methods=["GET"])
+def charts_subject_distribution_api():
+    raw_kind = (request.args.get("kind") or "song").strip().lower()
+    kind = raw_kind if raw_kind in {"song", "album", "artist"} else "song"
+    rating_type = {"song": "Song", "album": "Album", "artist": "Artist"}[kind]
+
+    mbid = (request.args.get("mbid") or "").strip() or None
+    name = (request.args.get("name") or "").strip()
+    artist = (request.args.get("artist") or "").strip()
+
+    if not mbid and not name:
+        return jsonify({"ok": False, "error": "Missing subject"}), 400
+
+    distribution = get_subject_score_distribution(
+        mbid=mbid,
+        rating_type=rating_type,
+        rating_name=name,
+        content_artist=artist if kind != "artist" else "",
+    )
+    return jsonify({"ok": True, "distribution": distribution})
+
+
+@app.route("/api/charts/compare", methods=["GET"])
+def charts_compare_api():
+    """
+    Activity series + overall summary for several subjects in one request.
+
+    Subjects are passed as aligned repeated params: `name`, `artist` and `mbid`
+    (e.g. ?name=DAMN.&artist=Kendrick+Lamar&mbid=&name=Madvillainy&artist=Madvillain&mbid=).
+    """
+    raw_kind = (request.args.get("kind") or "song").strip().lower()
+    kind = raw_kind if raw_kind in {"song", "album", "artist"} else "song"
+    rating_type = {"song": "Song", "album": "Album", "artist": "Artist"}[kind]
+
+    raw_action = (request.args.get("action") or "rating_create").strip().lower()
+    allowed_actions = {
+        "rating_create",
+        "rating_view",
+        "rating_like",
+        "rating_unlike",
+        "rating_edit",
+        "rating_delete",
+    }
+    action = raw_action if raw_action in allowed_actions else "rating_create"
+
+    raw_days = (request.args.get("days") or "90").strip()
+    try:
+        days = int(raw_days)
+    except ValueError:
+        days = 90
+    days = max(1, min(3650, days))
+    cutoff_iso = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+    names = request.args.getlist("name")
+    artists = request.args.getlist("artist")
+    mbids = request.args.getlist("mbid")
+    count = max(len(names), len(mbids))
+    if count == 0:
+        return jsonify({"ok": False, "error": "Missing subject"}), 400
+    if count > 10:
+        return jsonify({"ok": False, "error": "Compare up to 10 subjects at a time"}), 400
+
+    subjects = []
+    for i in range(count):
+        name = (names[i] if i < len(names) else "").strip()
+        artist = (artists[i] if i < len(artists) else "").strip()
+        mbid = (mbids[i] if i < len(mbids) else "").strip()
+        if not mbid and not name:
+            return jsonify({"ok": False, "error": "Missing subject"}), 400
+        subjects.append(
+            {
+                "mbid": mbid or None,
+                "rating_type": rating_type,
+                "rating_name": name,
+                "content_artist": artist if kind != "artist" else "",
+            }
+        )
+
+    result = get_subjects_comparison(
+        subjects=subjects,
+        action=action,
+        cutoff_iso=cutoff_iso,
+    )
+
+    items = []
+    for subject, item in zip(subjects, result["items"]):
+        items.append(
+            {
+                "name": subject["rating_name"],
+                "artist": subject["content_artist"],
+                "mbid": subject["mbid"],
+                "events": item["events"],
+                "users": item["users"],
+                "summary": item["summary"],
+            }
+        )
+
+    return jsonify(
+        {
+            "ok": True,
+            "kind": kind,
+            "action": action,
+            "days": days,
+            "labels": result["labels"],
+            "items": items,
+        }
+    )
+
+
 @app.route("/api/sidebar/refresh", methods=["GET"])
 @login_required
 def sidebar_refresh_api():
@@ -1510,6 +1880,58 @@ def users():
     )
 
 
+@app.route("/leaderboards")
+def leaderboards():
+    tabs = [{"key": b["key"], "label": b["label"]} for b in LEADERBOARDS]
+    allowed_tabs = {t["key"] for t in tabs}
+    active_tab = (request.args.get("tab") or tabs[0]["key"]).strip().lower()
+    if active_tab not in allowed_tabs:
+        active_tab = tabs[0]["key"]
+    value_label = next(b["value_label"] for b in LEADERBOARDS if b["key"] == active_tab)
+
+    page, per_page, offset = _parse_pagination(default_per_page=20)
+    board = get_leaderboard(active_tab, limit=per_page + 1, offset=offset)
+    raw_items = board["items"]
+    has_next = len(raw_items) > per_page
+    items = raw_items[:per_page]
+
+    return render_template(
+        "leaderboards.html",
+        tabs=tabs,
+        active_tab=active_tab,
+        value_label=value_label,
+        items=items,
+        refreshed_at=board["refreshed_at"],
+        refreshed_ago=_format_time_ago(board["refreshed_at"] or "") if board["refreshed_at"] else None,
+        pagination=_pagination_context(
+            page=page,
+            per_page=per_page,
+            has_next=has_next,
+            item_count=len(items),
+        ),
+    )
+
+
+@app.route("/api/leaderboards/<board>", methods=["GET"])
+def leaderboard_api(board: str):
+    board = (board or "").strip().lower()
+    if board not in {b["key"] for b in LEADERBOARDS}:
+        return jsonify({"ok": False, "error": "unknown board"}), 404
+    try:
+        limit = int((request.args.get("limit") or "20").strip())
+    except ValueError:
+        limit = 20
+    limit = max(1, min(100, limit))
+    try:
+        offset = int((request.args.get("offset") or "0").strip())
+    except ValueError:
+        offset = 0
+    offset = max(0, offset)
+
+    data = get_leaderboard(board, limit=limit, offset=offset)
+    return jsonify({"ok": True, **data})
+
+
 @app.route("/genres")
 def genres():
     return render_template("genres.html")
@@ -1948,6 +2370,7 @@ def rating_detail(rating_key):
     subject_mbid = (rating[-4] if len(rating) > 16 else None) or None
 
     owner = get_rating_owner(rating_key)
+    artwork_job = None if rating_image_url else get_artwork_job_status(rating_key)
 
     liked = False
     if current_user.is_authenticated:
@@ -2001,6 +2424,7 @@ def rating_detail(rating_key):
         percent=percent,
         liked=liked,
         rating_image_url=rating_image_url,
+        artwork_pending=bool(artwork_job and artwork_job["status"] in {"pending", "running"}),
         subject_artist=subject_artist,
         subject_mbid=subject_mbid,
         category_vote_summary=category_vote_summary,
@@ -2014,6 +2438,14 @@ def rating_detail(rating_key):
     )
 
 
+@app.route("/api/rating/<int:rating_key>/artwork", methods=["GET"])
+def rating_artwork_status_api(rating_key: int):
+    job = get_artwork_job_status(rating_key)
+    if not job:
+        return jsonify({"ok": True, "status": "none", "image_url": None})
+    return jsonify({"ok": True, **job})
+
+
 @app.route("/rating/<int:rating_key>/also-rated")
 def rating_also_rated(rating_key: int):
     rating = get_rating_by_key(rating_key)
@@ -2480,15 +2912,9 @@ def add():
             url_prefix = (current_app.config.get("UPLOAD_URL_PREFIX") or "/uploads").rstrip("/")
             rating_image_url = f"{url_prefix}/ratings/{filename}"
 
-        # If no manual upload provided, try to fetch an image from MusicBrainz-related sources.
+        # No upload: reuse artwork already resolved for this subject, if any.
         if not rating_image_url and mbid:
-            rt = (rating_type or "").strip().lower()
-            if rt == "album":
-                rating_image_url = _cover_art_url_for_release_group(mbid) or None
-            elif rt == "song":
-                rating_image_url = _cover_art_url_for_recording(mbid) or None
-            elif rt == "artist":
-                rating_image_url = _artist_image_url(mbid) or None
+            rating_image_url = get_indexed_artwork(mbid)
 
         if rating_type:
             rating_key = add_rating(
@@ -2510,6 +2936,10 @@ def add():
                 mb_url or None,
                 content_artist or None,
             )
+            # Otherwise fetch artwork from MusicBrainz-related sources in the
+            # background; the rating page polls for it.
+            if rating_key and not rating_image_url and mbid:
+                enqueue_artwork_job(rating_key, rating_type, mbid)
             category = _category_from_rating_type(rating_type)
             add_activity(
                 current_user.id,
@@ -2622,18 +3052,21 @@ def _render_profile(profile_user):
     if profile_user.profile_pic and not _pic_exists(profile_user.profile_pic):
         profile_user.profile_pic = None
     comments = _build_profile_comments(profile_user.id)
-    profile_ratings = get_ratings_by_user(profile_user.username)
+    counters = get_user_counters(profile_user.id)
+    # Tab badges come from the counters; the lists only need what's shown in
+    # the cards and "All" modals (the full lists are paginated pages).
+    profile_ratings = get_ratings_by_user_paginated(profile_user.username, limit=60)
     profile_percent_map = _build_percent_map(profile_ratings)
     favorite_ratings = get_liked_ratings_for_user(profile_user.id, limit=60)
     favorite_percent_map = _build_percent_map(favorite_ratings)
-    profile_playlists = get_playlists_by_creator(profile_user.username, limit=200)
+    profile_playlists = get_playlists_by_creator(profile_user.username, limit=60)
     is_owner = current_user.is_authenticated and current_user.id == profile_user.id
     active_follow_tab = request.args.get("follow_tab")
     active_profile_tab = request.args.get("profile_tab")
     if active_profile_tab not in {"ratings", "playlists", "favorites"}:
         active_profile_tab = "ratings"
-    follower_count = count_followers(profile_user.id)
-    following_count = count_following(profile_user.id)
+    follower_count = counters["follower_count"]
+    following_count = counters["following_count"]
     following = get_following(profile_user.id, limit=10, offset=0)
     followers = get_followers(profile_user.id, limit=10, offset=0)
     viewer_follows = (
@@ -2650,6 +3083,7 @@ def _render_profile(profile_user):
         profile_playlists=profile_playlists,
         favorite_ratings=favorite_ratings,
         favorite_percent_map=favorite_percent_map,
+        counters=counters,
         is_owner=is_owner,
         active_follow_tab=active_follow_tab,
         active_profile_tab=active_profile_tab,
@@ -3098,15 +3532,20 @@ def edit(rating_key):
             url_prefix = (current_app.config.get("UPLOAD_URL_PREFIX") or "/uploads").rstrip("/")
             rating_image_url = f"{url_prefix}/ratings/{filename}"
 
-        # If no manual upload provided, try to fetch an image from MusicBrainz-related sources.
-        if not rating_image_url and mbid:
-            rt = (rating_type or "").strip().lower()
-            if rt == "album":
-                rating_image_url = _cover_art_url_for_release_group(mbid) or None
-            elif rt == "song":
-                rating_image_url = _cover_art_url_for_recording(mbid) or None
-            elif rt == "artist":
-                rating_image_url = _artist_image_url(mbid) or None
+        # A different subject and no new upload: artwork resolved for the old
+        # mbid isn't this subject's cover.
+        if (
+            (mbid or None) != (current_mbid or None)
+            and rating_image_url == current_image_url
+            and is_resolved_artwork(rating_image_url)
+        ):
+            rating_image_url = None
+
+        # No upload: reuse artwork already resolved for this subject, else fetch
+        # it in the background once the edit is saved.
+        if mbid and not rating_image_url:
+            rating_image_url = get_indexed_artwork(mbid)
+        needs_artwork = bool(mbid) and not rating_image_url
 
         def _to_int(v):
             try:
@@ -3136,6 +3575,8 @@ def edit(rating_key):
         )
 
         if not did_change:
+            if needs_artwork:
+                enqueue_artwork_job(rating_key, rating_type, mbid)
             return redirect(f"/rating/{rating_key}")
 
         if rating_type:
@@ -3158,6 +3599,8 @@ def edit(rating_key):
                 mb_url,
                 content_artist,
             )
+            if needs_artwork:
+                enqueue_artwork_job(rating_key, rating_type, mbid)
             category = _category_from_rating_type(rating_type)
             add_activity(
                 current_user.id,
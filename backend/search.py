@@ -0,0 +1,1064 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from queue import Empty, Full, LifoQueue
+from typing import Any
+
+from backend._db_setup import DB_PATH
+from backend.database import _fts_available, _search_pattern, search_rated_subjects
+
+
+###############################################
+# Search engine
+###############################################
+
+# Site search lives here: every entity has an FTS5 index (see _ensure_fts_index
+# in _db_setup.py) with a LIKE fallback, and the "all" tab runs the entity
+# searches concurrently and merges them by score.
+
+
+def _env_int(name: str, default: int, lo: int, hi: int) -> int:
+    try:
+        value = int(os.environ.get(name) or default)
+    except ValueError:
+        value = default
+    return max(lo, min(hi, value))
+
+
+SEARCH_POOL_SIZE = _env_int("SEARCH_POOL_SIZE", 4, 1, 32)
+SEARCH_WORKERS = _env_int("SEARCH_WORKERS", 4, 1, 32)
+SEARCH_CACHE_SIZE = _env_int("SEARCH_CACHE_SIZE", 512, 0, 100_000)
+SEARCH_CACHE_TTL = _env_int("SEARCH_CACHE_TTL", 120, 1, 86_400)
+FUZZY_CANDIDATES = _env_int("FUZZY_CANDIDATES", 100, 10, 1000)
+
+
+class _ConnectionPool:
+    """
+    Small pool of read connections so concurrent searches don't each pay for
+    sqlite3.connect(). Connections beyond `size` are opened on demand and closed
+    on release.
+    """
+
+    def __init__(self, db_path, size: int):
+        self._db_path = db_path
+        self._idle: LifoQueue = LifoQueue(maxsize=size)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._db_path, check_same_thread=False)
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except Empty:
+            conn = self._connect()
+        broken = False
+        try:
+            yield conn
+        except sqlite3.Error:
+            broken = True
+            raise
+        finally:
+            if broken:
+                conn.close()
+            else:
+                try:
+                    self._idle.put_nowait(conn)
+                except Full:
+                    conn.close()
+
+
+class _SearchCache:
+    """
+    Bounded LRU of search results with a TTL. Each entry remembers the
+    search_versions it was computed against and is dropped on lookup if any of
+    them has moved, so writes invalidate results across worker processes.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "invalidated": 0, "evicted": 0}
+
+    def get(self, key: tuple, versions: tuple):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            stored_at, stored_versions, value = entry
+            if stored_versions != versions:
+                del self._entries[key]
+                self._stats["invalidated"] += 1
+                self._stats["misses"] += 1
+                return None
+            if now - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def put(self, key: tuple, versions: tuple, value) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), versions, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evicted"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            size = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        return {
+            **stats,
+            "lookups": lookups,
+            "hit_rate": round(stats["hits"] / lookups, 4) if lookups else None,
+            "size": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+_pool = _ConnectionPool(DB_PATH, SEARCH_POOL_SIZE)
+_cache = _SearchCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL)
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=SEARCH_WORKERS, thread_name_prefix="search"
+            )
+        return _executor
+
+
+def _normalize_query(query, *, tokenized: bool = True) -> str:
+    """
+    Cache key form of a query. Site search only sees the tokens (the same split
+    _search_pattern uses); substring searches keep punctuation.
+    """
+    query = (query or "").strip().lower()
+    if tokenized:
+        return " ".join(t for t in re.split(r"[\s\W_]+", query) if t)
+    return " ".join(query.split())
+
+
+def _read_versions(names) -> tuple:
+    with _pool.connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT name, version FROM search_versions")
+        versions = dict(cur.fetchall())
+    return tuple(versions.get(name, 0) for name in names)
+
+
+def _cached(key: tuple, depends_on: tuple, compute):
+    if _cache.max_entries <= 0:
+        return compute()
+    versions = _read_versions(depends_on)
+    value = _cache.get(key, versions)
+    if value is None:
+        value = compute()
+        _cache.put(key, versions, value)
+    return value
+
+
+def search_cache_stats() -> dict[str, Any]:
+    return _cache.stats()
+
+
+def _fts_match_query(query) -> str:
+    """
+    FTS5 MATCH expression for a search box query: every token must match, and
+    each is a prefix so partially typed words still hit (e.g. "kend lam").
+    """
+    tokens = [token for token in re.split(r"[\s\W_]+", (query or "").strip()) if token]
+    return " ".join('"' + token.replace('"', '""') + '"*' for token in tokens)
+
+
+# Per-entity search definitions.
+# - columns: selected from the base table (aliased `t`), in the row shape the
+#   templates already use.
+# - bm25: column weights, in the FTS table's column order.
+# - like: columns matched by the LIKE fallback.
+# - weight: multiplier applied when merging entities on the "all" tab.
+# - primary: index of the column an exact query match is checked against.
+SEARCH_ENTITIES: dict[str, dict[str, Any]] = {
+    "users": {
+        "table": "user_info",
+        "key": "user_info_key",
+        "fts": "users_fts",
+        "columns": ["user_info_key", "username", "profile_pic"],
+        "bm25": (10.0, 1.0),
+        "like": ["username"],
+        "like_order": "t.username COLLATE NOCASE ASC",
+        "weight": 1.2,
+        "primary": 1,
+    },
+    "playlists": {
+        "table": "playlist_info",
+        "key": "playlist_key",
+        "fts": "playlists_fts",
+        "columns": ["playlist_key", "created_by", "playlist_title", "playlist_description"],
+        "bm25": (10.0, 3.0, 2.0),
+        "like": ["playlist_title", "playlist_description", "created_by"],
+        "like_order": "t.playlist_key DESC",
+        "weight": 1.0,
+        "primary": 2,
+    },
+    "ratings": {
+        "table": "ratings",
+        "key": "rating_key",
+        "fts": "ratings_fts",
+        "columns": [
+            "rating_key",
+            "rating_type",
+            "rating_name",
+            "lyrics_rating",
+            "beat_rating",
+            "flow_rating",
+            "melody_rating",
+            "cohesive_rating",
+            "user",
+            "image_url",
+        ],
+        # name, artist, type, user, then the five reasons.
+        "bm25": (10.0, 6.0, 2.0, 4.0, 1.0, 1.0, 1.0, 1.0, 1.0),
+        "like": ["rating_name", "rating_type", "user"],
+        "like_order": "t.rating_key DESC",
+        "weight": 1.0,
+        "primary": 2,
+    },
+    "songs": {
+        "table": "song",
+        "key": "song_key",
+        "fts": "songs_fts",
+        "columns": ["song_key", "song_title", "artist_name", "artist_link", "song_link"],
+        "bm25": (10.0, 5.0),
+        "like": ["song_title", "artist_name"],
+        "like_order": "t.song_key DESC",
+        "weight": 0.8,
+        "primary": 1,
+    },
+}
+
+
+def _search_entity(
+    conn: sqlite3.Connection, entity: str, query: str, limit: int, offset: int
+) -> list[tuple[tuple, float]]:
+    """Returns [(row, score)], best first. Higher scores are better."""
+    spec = SEARCH_ENTITIES[entity]
+    cols = ", ".join(f"t.{c}" for c in spec["columns"])
+    cur = conn.cursor()
+
+    match = _fts_match_query(query)
+    if match and _fts_available(cur, spec["fts"]):
+        weights = ", ".join(str(w) for w in spec["bm25"])
+        cur.execute(
+            f"""
+            SELECT {cols}, bm25({spec["fts"]}, {weights}) AS score
+            FROM {spec["fts"]}
+            JOIN {spec["table"]} t
+                ON t.{spec["key"]} = {spec["fts"]}.rowid
+            WHERE {spec["fts"]} MATCH ?
+            ORDER BY score, t.{spec["key"]} DESC
+            LIMIT ?
+            OFFSET ?
+            """,
+            (match, int(limit), int(offset)),
+        )
+        # bm25() is "lower is better" and negative; flip it.
+        return [(tuple(row[:-1]), -float(row[-1] or 0.0)) for row in cur.fetchall()]
+
+    pattern = _search_pattern(query)
+    if not pattern:
+        return []
+    where = " OR ".join(f"t.{c} LIKE ? COLLATE NOCASE" for c in spec["like"])
+    cur.execute(
+        f"""
+        SELECT {cols}
+        FROM {spec["table"]} t
+        WHERE {where}
+        ORDER BY {spec["like_order"]}
+        LIMIT ?
+        OFFSET ?
+        """,
+        (*([pattern] * len(spec["like"])), int(limit), int(offset)),
+    )
+    return [(tuple(row), 0.0) for row in cur.fetchall()]
+
+
+def _run_entity(entity: str, query: str, limit: int, offset: int):
+    with _pool.connection() as conn:
+        return _search_entity(conn, entity, query, limit, offset)
+
+
+def _shape(entity: str, row: tuple):
+    # Users are dicts, everything else stays a tuple, as the templates expect.
+    if entity == "users":
+        return {"user_id": row[0], "username": row[1], "profile_pic": row[2]}
+    return row
+
+
+def search_entity(entity: str, query, limit: int = 20, offset: int = 0) -> list:
+    """Ranked results for a single entity ("users", "playlists", "ratings", "songs")."""
+    query = (query or "").strip()
+    if not query or entity not in SEARCH_ENTITIES:
+        return []
+    return _cached(
+        (entity, _normalize_query(query), int(limit), int(offset)),
+        (entity,),
+        lambda: [_shape(entity, row) for row, _ in _run_entity(entity, query, limit, offset)],
+    )
+
+
+def _match_quality(text: str, query: str, tokens: list[str]) -> float:
+    """
+    1.0 exact, 0.8 prefix, 0.6 all tokens present, 0.3 matched elsewhere.
+    Compared in _normalize_query form, like the cache key, so "ac/dc" and
+    "ac dc" rank the same way whichever of them filled the cache.
+    """
+    text = _normalize_query(text)
+    query = _normalize_query(query)
+    if query and text == query:
+        return 1.0
+    if query and text.startswith(query):
+        return 0.8
+    words = text.split()
+    if tokens and all(any(w.startswith(t) for w in words) for t in tokens):
+        return 0.6
+    return 0.3
+
+
+def search_all(query, limit: int = 20, offset: int = 0) -> list[dict[str, Any]]:
+    """
+    Top results across every entity, merged by score.
+
+    Each entity search runs concurrently on its own pooled connection and
+    returns its best offset+limit rows, so the merged page is exact.
+    Returns [{"type", "score", "item"}].
+    """
+    query = (query or "").strip()
+    if not query:
+        return []
+    return _cached(
+        ("all", _normalize_query(query), int(limit), int(offset)),
+        tuple(SEARCH_ENTITIES),
+        lambda: _search_all(query, limit, offset),
+    )
+
+
+def _search_all(query: str, limit: int, offset: int) -> list[dict[str, Any]]:
+    depth = int(offset) + int(limit)
+    futures = {
+        entity: _get_executor().submit(_run_entity, entity, query, depth, 0)
+        for entity in SEARCH_ENTITIES
+    }
+
+    tokens = [t for t in re.split(r"[\s\W_]+", query.lower()) if t]
+    merged: list[dict[str, Any]] = []
+    for entity, future in futures.items():
+        spec = SEARCH_ENTITIES[entity]
+        hits = future.result()
+        # bm25 isn't comparable across tables (IDF depends on each table's
+        # size), so scale it within the entity and blend with how well the
+        # entity's main field matches the query.
+        best = max((score for _, score in hits), default=0.0)
+        for rank, (row, score) in enumerate(hits):
+            relevance = score / best if best > 0 else 1.0
+            quality = _match_quality(str(row[spec["primary"]] or ""), query, tokens)
+            merged.append(
+                {
+                    "type": entity[:-1],
+                    "score": round(spec["weight"] * (0.5 * relevance + 0.5 * quality), 4),
+                    # Tie-break (e.g. LIKE fallback) by per-entity rank.
+                    "_rank": rank,
+                    "item": _shape(entity, row),
+                }
+            )
+
+    merged.sort(key=lambda hit: (-hit["score"], hit["_rank"]))
+    page = merged[int(offset) : depth]
+    for hit in page:
+        hit.pop("_rank", None)
+    return page
+
+
+def search_users_by_username(query, limit: int = 20, offset: int = 0):
+    return search_entity("users", query, limit=limit, offset=offset)
+
+
+def search_playlists(query, limit: int = 20, offset: int = 0):
+    return search_entity("playlists", query, limit=limit, offset=offset)
+
+
+def search_ratings(query, limit: int = 20, offset: int = 0):
+    return search_entity("ratings", query, limit=limit, offset=offset)
+
+
+def search_songs(query: str, limit: int = 30):
+    return search_entity("songs", query, limit=limit)
+
+
+def suggest_rated_subjects(*, kind: str, q: str, artist: str | None = None, limit: int = 10):
+    """
+    Cached search_rated_subjects() for the charts autocomplete. Falls back to
+    fuzzy matches when a typed name has no substring hits.
+    """
+
+    def compute():
+        items = search_rated_subjects(kind=kind, q=q, artist=artist, limit=limit)
+        if not items and len((q or "").strip()) >= 3:
+            items = _fuzzy_subjects(q, kind=kind, artist=artist, limit=limit)
+        return items
+
+    return _cached(
+        (
+            "rated_subjects",
+            (kind or "").strip().lower(),
+            _normalize_query(q, tokenized=False),
+            _normalize_query(artist, tokenized=False),
+            int(limit),
+        ),
+        ("ratings",),
+        compute,
+    )
+
+
+###############################################
+# Fuzzy matching
+###############################################
+
+# Typo tolerance for usernames and rated subjects. Candidates come from trigram
+# FTS indexes (users_trgm, rated_subjects_fts): any row sharing a trigram with
+# the query, best bm25 first, capped at FUZZY_CANDIDATES. Those are re-ranked by
+# edit distance, so the cost per query is one bounded index lookup plus at most
+# FUZZY_CANDIDATES short Levenshtein computations.
+
+FUZZY_MIN_SIMILARITY = 0.6
+_FUZZY_MAX_TRIGRAMS = 24
+
+
+def _fuzzy_text(text) -> str:
+    return " ".join((text or "").lower().split())
+
+
+def _trigram_match_query(query: str) -> str:
+    """OR of the query's distinct trigrams, evenly sampled down to _FUZZY_MAX_TRIGRAMS."""
+    text = _fuzzy_text(query)
+    grams = list(dict.fromkeys(text[i : i + 3] for i in range(len(text) - 2)))
+    grams = [g for g in grams if g.strip()]
+    if len(grams) > _FUZZY_MAX_TRIGRAMS:
+        step = len(grams) / _FUZZY_MAX_TRIGRAMS
+        grams = [grams[int(i * step)] for i in range(_FUZZY_MAX_TRIGRAMS)]
+    return " OR ".join('"' + g.replace('"', '""') + '"' for g in grams)
+
+
+def _levenshtein(a: str, b: str, max_distance: int) -> int:
+    """Edit distance, or max_distance + 1 as soon as it is known to exceed it."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (ca != cb),
+                )
+            )
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def _similarity(a: str, b: str) -> float:
+    longest = max(len(a), len(b))
+    if not longest:
+        return 0.0
+    # Anything below FUZZY_MIN_SIMILARITY is irrelevant, so bound the DP there.
+    max_distance = int(longest * (1 - FUZZY_MIN_SIMILARITY))
+    return 1 - _levenshtein(a, b, max_distance) / longest
+
+
+def _fuzzy_score(query: str, text: str) -> float:
+    """
+    Best of whole-string similarity and per-word similarity, so "kendirck"
+    still matches "Kendrick Lamar" and "to pimp a buterfly" matches its album.
+    """
+    query, text = _fuzzy_text(query), _fuzzy_text(text)
+    if not query or not text:
+        return 0.0
+    whole = _similarity(query, text)
+    q_words = [w for w in re.split(r"[\s\W_]+", query) if w]
+    t_words = [w for w in re.split(r"[\s\W_]+", text) if w]
+    if not q_words or not t_words:
+        return whole
+    matched = sum(len(w) * max(_similarity(w, t) for t in t_words) for w in q_words)
+    per_word = matched / sum(len(w) for w in q_words)
+    # Per-word matching ignores the rest of the text; keep whole-string hits ahead.
+    return max(whole, 0.95 * per_word)
+
+
+def _rank_fuzzy(query: str, candidates: list, text_of, limit: int) -> list:
+    scored = [(_fuzzy_score(query, text_of(c)), i, c) for i, c in enumerate(candidates)]
+    scored = [item for item in scored if item[0] >= FUZZY_MIN_SIMILARITY]
+    # Ties keep the candidate order (bm25, then popularity).
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return [(c, round(score, 4)) for score, _, c in scored[: int(limit)]]
+
+
+def _fuzzy_users(query, limit: int = 20) -> list[tuple[dict[str, Any], float]]:
+    match = _trigram_match_query(query)
+    if not match:
+        return []
+    with _pool.connection() as conn:
+        cur = conn.cursor()
+        if not _fts_available(cur, "users_trgm"):
+            return []
+        cur.execute(
+            """
+            SELECT t.user_info_key, t.username, t.profile_pic
+            FROM users_trgm
+            CROSS JOIN user_info t
+                ON t.user_info_key = users_trgm.rowid
+            WHERE users_trgm MATCH ?
+            ORDER BY bm25(users_trgm)
+            LIMIT ?
+            """,
+            (match, FUZZY_CANDIDATES),
+        )
+        rows = cur.fetchall()
+    users = [_shape("users", tuple(row)) for row in rows]
+    return _rank_fuzzy(query, users, lambda u: u["username"], limit)
+
+
+def _fuzzy_subjects(
+    query, *, kind: str | None = None, artist: str | None = None, limit: int = 10
+) -> list[dict[str, Any]]:
+    """Rated subjects whose name is close to `query`, in search_rated_subjects()' item shape."""
+    match = _trigram_match_query(query)
+    if not match:
+        return []
+    kind = (kind or "").strip().lower()
+    artist = (artist or "").strip()
+    with _pool.connection() as conn:
+        cur = conn.cursor()
+        if not _fts_available(cur, "rated_subjects_fts"):
+            return []
+        cur.execute(
+            """
+            SELECT s.rating_name, s.content_artist, s.rating_count, s.mbid, s.image_url, s.kind
+            FROM rated_subjects_fts
+            CROSS JOIN rated_subjects s
+                ON s.subject_id = rated_subjects_fts.rowid
+            WHERE rated_subjects_fts MATCH ?
+              AND (? = '' OR s.kind = ?)
+              AND (? = '' OR s.content_artist LIKE ? COLLATE NOCASE)
+            ORDER BY bm25(rated_subjects_fts), s.rating_count DESC
+            LIMIT ?
+            """,
+            ("rating_name : (" + match + ")", kind, kind, artist, f"%{artist}%", FUZZY_CANDIDATES),
+        )
+        rows = cur.fetchall()
+    ranked = _rank_fuzzy(query, rows, lambda row: row[0], limit)
+    return [
+        {
+            "name": name or "",
+            "artist": a or "",
+            "rating_count": int(rating_count or 0),
+            "mbid": (mbid or "").strip() or None,
+            "image_url": (image_url or "").strip() or None,
+            "kind": row_kind,
+            "similarity": score,
+        }
+        for (name, a, rating_count, mbid, image_url, row_kind), score in ranked
+    ]
+
+
+def fuzzy_search_users(query, limit: int = 20) -> list[dict[str, Any]]:
+    """Users whose username is close to `query`, for when exact search finds none."""
+    query = (query or "").strip()
+    if len(query) < 3:
+        return []
+    return _cached(
+        ("fuzzy_users", _fuzzy_text(query), int(limit)),
+        ("users",),
+        lambda: [user for user, _ in _fuzzy_users(query, limit)],
+    )
+
+
+def did_you_mean(query) -> str | None:
+    """Closest username or rated subject name to a query that found nothing."""
+    query = (query or "").strip()
+    if len(query) < 3:
+        return None
+
+    def compute():
+        options = [(score, user["username"]) for user, score in _fuzzy_users(query, 1)]
+        options += [(item["similarity"], item["name"]) for item in _fuzzy_subjects(query, limit=1)]
+        if not options:
+            return ""
+        _, best = max(options, key=lambda option: option[0])
+        return "" if _fuzzy_text(best) == _fuzzy_text(query) else best
+
+    # "" (no suggestion) is cached too; None would read as a miss.
+    return _cached(("did_you_mean", _fuzzy_text(query)), ("users", "ratings"), compute) or None
+
+
+###############################################
+# Discussions
+###############################################
+
+# Free text people wrote: rating comments, profile comments, bulletin posts and
+# the five rating reasons. Each source is an FTS index kept current by the
+# triggers _ensure_fts_index installs, so writes are indexed as they happen.
+# Bulletins are only searchable by their author and followers, as in the feed.
+
+_REASON_COLUMNS = [
+    "lyrics_reason",
+    "beat_reason",
+    "flow_reason",
+    "melody_reason",
+    "cohesive_reason",
+]
+
+# Per-source search definitions.
+# - select: (key, author, context, url, created_at, *texts) from the base table
+#   (aliased `t`) and `joins`.
+# - column_filter: FTS columns the query is restricted to, when the index has
+#   more than the discussion text.
+# - like: columns matched by the LIKE fallback.
+# - followers_only: only the author and their followers may see the row.
+DISCUSSION_SOURCES: dict[str, dict[str, Any]] = {
+    "rating_comment": {
+        "table": "rating_comments",
+        "key": "comment_id",
+        "fts": "rating_comments_fts",
+        "select": """
+            t.comment_id, u.username, r.rating_name, '/rating/' || t.rating_key,
+            t.created_at, t.message
+        """,
+        "joins": """
+            LEFT JOIN user_info u ON u.user_info_key = t.author_user_id
+            LEFT JOIN ratings r ON r.rating_key = t.rating_key
+        """,
+        "like": ["message"],
+    },
+    "profile_comment": {
+        "table": "profile_comments",
+        "key": "comment_id",
+        "fts": "profile_comments_fts",
+        "select": """
+            t.comment_id, u.username, '@' || p.username, '/user/' || p.username,
+            t.created_at, t.message
+        """,
+        "joins": """
+            LEFT JOIN user_info u ON u.user_info_key = t.author_user_id
+            JOIN user_info p ON p.user_info_key = t.profile_user_id
+        """,
+        "like": ["message"],
+    },
+    "bulletin": {
+        "table": "bulletin",
+        "key": "bulletin_key",
+        "fts": "bulletin_fts",
+        "select": """
+            t.bulletin_key, t.created_by, t.title, '/bulletin/' || t.bulletin_key,
+            t.created_at, t.message
+        """,
+        "joins": "",
+        "like": ["title", "message"],
+        "followers_only": True,
+    },
+    "rating_reason": {
+        "table": "ratings",
+        "key": "rating_key",
+        "fts": "ratings_fts",
+        "column_filter": _REASON_COLUMNS,
+        "select": """
+            t.rating_key, t.user, t.rating_name, '/rating/' || t.rating_key,
+            NULL, """
+        + ", ".join(f"t.{c}" for c in _REASON_COLUMNS),
+        "joins": "",
+        "like": _REASON_COLUMNS,
+    },
+}
+
+_FOLLOWERS_ONLY_WHERE = """
+    (
+        t.created_by_user_id = ?
+        OR t.created_by_user_id IN (
+            SELECT user_followed_key
+            FROM follow_info
+            WHERE followed_by_user_key = ?
+              AND (unfollowed IS NULL OR unfollowed = 0)
+        )
+    )
+"""
+
+
+def _search_discussion_source(
+    conn: sqlite3.Connection, source: str, query: str, limit: int, viewer_user_id
+) -> list[tuple[tuple, float]]:
+    """Returns [(row, score)], best first. Higher scores are better."""
+    spec = DISCUSSION_SOURCES[source]
+    visibility, visibility_args = "1", ()
+    if spec.get("followers_only"):
+        if viewer_user_id is None:
+            return []
+        visibility = _FOLLOWERS_ONLY_WHERE
+        visibility_args = (int(viewer_user_id), int(viewer_user_id))
+    cur = conn.cursor()
+
+    match = _fts_match_query(query)
+    if match and _fts_available(cur, spec["fts"]):
+        if spec.get("column_filter"):
+            match = "{" + " ".join(spec["column_filter"]) + "} : (" + match + ")"
+        cur.execute(
+            f"""
+            SELECT {spec["select"]}, bm25({spec["fts"]}) AS score
+            FROM {spec["fts"]}
+            JOIN {spec["table"]} t
+                ON t.{spec["key"]} = {spec["fts"]}.rowid
+            {spec["joins"]}
+            WHERE {spec["fts"]} MATCH ?
+              AND {visibility}
+            ORDER BY score, t.{spec["key"]} DESC
+            LIMIT ?
+            """,
+            (match, *visibility_args, int(limit)),
+        )
+        return [(tuple(row[:-1]), -float(row[-1] or 0.0)) for row in cur.fetchall()]
+
+    pattern = _search_pattern(query)
+    if not pattern:
+        return []
+    where = " OR ".join(f"t.{c} LIKE ? COLLATE NOCASE" for c in spec["like"])
+    cur.execute(
+        f"""
+        SELECT {spec["select"]}
+        FROM {spec["table"]} t
+        {spec["joins"]}
+        WHERE ({where})
+          AND {visibility}
+        ORDER BY t.{spec["key"]} DESC
+        LIMIT ?
+        """,
+        (*([pattern] * len(spec["like"])), *visibility_args, int(limit)),
+    )
+    return [(tuple(row), 0.0) for row in cur.fetchall()]
+
+
+def _run_discussion_source(source: str, query: str, limit: int, viewer_user_id):
+    with _pool.connection() as conn:
+        return _search_discussion_source(conn, source, query, limit, viewer_user_id)
+
+
+def _snippet(texts, tokens: list[str], width: int = 160) -> str:
+    """The part of the best-matching text around its first matched token."""
+    texts = [str(t) for t in texts if t and str(t).strip()]
+    if not texts:
+        return ""
+    text = max(texts, key=lambda t: sum(token in t.lower() for token in tokens))
+    lowered = text.lower()
+    hits = [lowered.find(token) for token in tokens if token in lowered]
+    start = max(0, min(hits) - width // 4) if hits else 0
+    body = text[start : start + width].strip()
+    return ("…" if start else "") + body + ("…" if start + width < len(text) else "")
+
+
+def search_discussions(
+    query, limit: int = 20, offset: int = 0, viewer_user_id: int | None = None
+) -> list[dict[str, Any]]:
+    """
+    Comments, bulletin posts and rating reasons matching `query`, merged by
+    score. Bulletins are included only for a signed-in viewer who can see them.
+    Returns [{"type", "score", "item"}].
+    """
+    query = (query or "").strip()
+    if not query:
+        return []
+    return _cached(
+        ("discussions", _normalize_query(query), int(limit), int(offset), viewer_user_id),
+        ("discussions", "ratings", "users", "follows"),
+        lambda: _search_discussions(query, limit, offset, viewer_user_id),
+    )
+
+
+def _search_discussions(
+    query: str, limit: int, offset: int, viewer_user_id
+) -> list[dict[str, Any]]:
+    depth = int(offset) + int(limit)
+    futures = {
+        source: _get_executor().submit(
+            _run_discussion_source, source, query, depth, viewer_user_id
+        )
+        for source in DISCUSSION_SOURCES
+    }
+
+    tokens = [t for t in re.split(r"[\s\W_]+", query.lower()) if t]
+    merged: list[dict[str, Any]] = []
+    for source, future in futures.items():
+        hits = future.result()
+        # As in _search_all: bm25 is only comparable within one index.
+        best = max((score for _, score in hits), default=0.0)
+        for rank, (row, score) in enumerate(hits):
+            key, author, context, url, created_at, *texts = row
+            merged.append(
+                {
+                    "type": source,
+                    "score": round(score / best if best > 0 else 1.0, 4),
+                    "_rank": rank,
+                    "item": {
+                        "id": key,
+                        "author": author or "",
+                        "context": context or "",
+                        "url": url,
+                        "created_at": created_at,
+                        "snippet": _snippet(texts, tokens),
+                    },
+                }
+            )
+
+    merged.sort(key=lambda hit: (-hit["score"], hit["_rank"]))
+    page = merged[int(offset) : depth]
+    for hit in page:
+        hit.pop("_rank", None)
+    return page
+
+
+###############################################
+# Rating filters
+###############################################
+
+# Structured filters for browse, e.g. `beat>=8 artist:"MF DOOM" likes>10`.
+# Each term becomes a parameterized WHERE clause over ratings; the ones likely
+# to be selective (type, rater, artist, date, likes) have composite indexes, and
+# likes/percent read the per-rating counters rather than aggregating.
+
+_FILTER_TERM = re.compile(
+    r'(?P<field>[A-Za-z_]+)\s*(?P<op>>=|<=|!=|>|<|=|:)\s*(?:"(?P<quoted>[^"]*)"|(?P<value>[^\s"]+))'
+    r'|"(?P<phrase>[^"]*)"'
+    r"|(?P<word>\S+)"
+)
+
+_AVG_SQL = (
+    "((r.lyrics_rating + r.beat_rating + r.flow_rating + r.melody_rating + r.cohesive_rating) / 5.0)"
+)
+
+# Numeric fields: SQL expression and allowed value range.
+_NUMERIC_FILTERS: dict[str, tuple[str, float, float]] = {
+    "lyrics": ("r.lyrics_rating", 0, 10),
+    "beat": ("r.beat_rating", 0, 10),
+    "flow": ("r.flow_rating", 0, 10),
+    "melody": ("r.melody_rating", 0, 10),
+    "cohesive": ("r.cohesive_rating", 0, 10),
+    "avg": (_AVG_SQL, 0, 10),
+    "likes": ("r.like_count", 0, 1_000_000),
+}
+
+_FILTER_ALIASES = {
+    "overall": "avg",
+    "score": "avg",
+    "like": "likes",
+    "pct": "percent",
+    "user": "rater",
+    "by": "rater",
+    "kind": "type",
+}
+
+_RATING_TYPES = {
+    "album": "Album",
+    "albums": "Album",
+    "song": "Song",
+    "songs": "Song",
+    "artist": "Artist",
+    "artists": "Artist",
+}
+
+_SQL_OPS = {">=": ">=", "<=": "<=", ">": ">", "<": "<", "=": "=", ":": "=", "!=": "!="}
+
+
+def _parse_number(value: str) -> float | None:
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _date_bounds(value: str) -> tuple[str, str] | None:
+    """[start, end) ISO bounds for YYYY, YYYY-MM or YYYY-MM-DD."""
+    m = re.fullmatch(r"(\d{4})(?:-(\d{1,2})(?:-(\d{1,2}))?)?", value)
+    if not m:
+        return None
+    year, month, day = int(m.group(1)), m.group(2), m.group(3)
+    try:
+        if day:
+            start = datetime(year, int(month), int(day))
+            end = start + timedelta(days=1)
+        elif month:
+            start = datetime(year, int(month), 1)
+            end = datetime(year + (start.month == 12), start.month % 12 + 1, 1)
+        else:
+            start, end = datetime(year, 1, 1), datetime(year + 1, 1, 1)
+    except ValueError:
+        return None
+    return start.date().isoformat(), end.date().isoformat()
+
+
+def parse_rating_filters(text) -> tuple[list[tuple[str, list]], list[str]]:
+    """
+    Parses a filter query into ([(sql, params)], errors). Terms are ANDed.
+
+    Numeric fields (lyrics, beat, flow, melody, cohesive, avg, likes, percent)
+    take >=, <=, >, <, =, != or a `lo..hi` range; rater, artist and type take a
+    name; date, after and before take YYYY[-MM[-DD]]. Anything else is matched
+    against the rating name.
+    """
+    clauses: list[tuple[str, list]] = []
+    errors: list[str] = []
+    words: list[str] = []
+    for m in _FILTER_TERM.finditer((text or "").strip()):
+        if m.group("word") is not None or m.group("phrase") is not None:
+            words.append(m.group("word") if m.group("word") is not None else m.group("phrase"))
+            continue
+        raw_field = m.group("field")
+        field = _FILTER_ALIASES.get(raw_field.lower(), raw_field.lower())
+        op = m.group("op")
+        value = (m.group("quoted") if m.group("quoted") is not None else m.group("value")).strip()
+
+        if field in _NUMERIC_FILTERS or field == "percent":
+            lo, hi = (0, 100) if field == "percent" else _NUMERIC_FILTERS[field][1:]
+            expr = (
+                "(r.vote_up_count * 100.0 / NULLIF(r.vote_up_count + r.vote_down_count, 0))"
+                if field == "percent"
+                else _NUMERIC_FILTERS[field][0]
+            )
+            if op in {":", "="} and ".." in value:
+                low, _, high = value.partition("..")
+                a, b = _parse_number(low), _parse_number(high)
+                if a is None or b is None:
+                    errors.append(f"{raw_field}: expected a range like 7..9")
+                    continue
+                clauses.append((f"{expr} BETWEEN ? AND ?", [min(a, b), max(a, b)]))
+                continue
+            number = _parse_number(value)
+            if number is None or not lo <= number <= hi:
+                errors.append(f"{raw_field}: expected a number from {lo} to {hi}")
+                continue
+            clauses.append((f"{expr} {_SQL_OPS[op]} ?", [number]))
+        elif field in {"rater", "artist", "type"}:
+            if op not in {":", "=", "!="} or not value:
+                errors.append(f"{raw_field}: use {raw_field}:name")
+                continue
+            negate = "NOT " if op == "!=" else ""
+            if field == "rater":
+                clauses.append((f"{negate}(r.user = ? COLLATE NOCASE)", [value]))
+            elif field == "artist":
+                clauses.append(
+                    (
+                        f"""{negate}(
+                            r.content_info_artist = ? COLLATE NOCASE
+                            OR (r.rating_type = 'Artist' AND r.rating_name = ? COLLATE NOCASE)
+                        )""",
+                        [value, value],
+                    )
+                )
+            else:
+                rating_type = _RATING_TYPES.get(value.lower())
+                if not rating_type:
+                    errors.append(f"{raw_field}: expected album, song or artist")
+                    continue
+                clauses.append((f"{negate}(r.rating_type = ?)", [rating_type]))
+        elif field in {"date", "after", "before"}:
+            bounds = _date_bounds(value)
+            if not bounds:
+                errors.append(f"{raw_field}: expected a date like 2024, 2024-05 or 2024-05-31")
+                continue
+            start, end = bounds
+            if field == "after":
+                op = ">="
+            elif field == "before":
+                op = "<"
+            if op in {":", "="}:
+                clauses.append(("(r.created_at >= ? AND r.created_at < ?)", [start, end]))
+            elif op == "!=":
+                clauses.append(("NOT (r.created_at >= ? AND r.created_at < ?)", [start, end]))
+            else:
+                bound = {">=": start, ">": end, "<=": end, "<": start}[op]
+                cmp = ">=" if op in {">=", ">"} else "<"
+                clauses.append((f"r.created_at {cmp} ?", [bound]))
+        else:
+            errors.append(f"Unknown filter: {raw_field}")
+
+    pattern = _search_pattern(" ".join(words))
+    if pattern:
+        clauses.append(("r.rating_name LIKE ? COLLATE NOCASE", [pattern]))
+    return clauses, errors
+
+
+def filter_ratings(
+    text, limit: int = 20, offset: int = 0, order: str = "recent"
+) -> tuple[list[tuple], list[str]]:
+    """
+    Ratings matching a filter query, in get_ratings()' row shape.
+    Returns (rows, errors); rows are empty when the query has errors.
+    """
+    clauses, errors = parse_rating_filters(text)
+    if errors:
+        return [], errors
+    direction = "ASC" if order == "oldest" else "DESC"
+    where = " AND ".join(sql for sql, _ in clauses) or "1"
+    params = [p for _, clause_params in clauses for p in clause_params]
+
+    def compute():
+        with _pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                f"""
+                SELECT r.rating_key, r.rating_type, r.rating_name, r.lyrics_rating,
+                       r.beat_rating, r.flow_rating, r.melody_rating, r.cohesive_rating,
+                       r.user, r.image_url
+                FROM ratings r
+                WHERE {where}
+                ORDER BY r.rating_key {direction}
+                LIMIT ?
+                OFFSET ?
+                """,
+                (*params, int(limit), int(offset)),
+            )
+            return [tuple(row) for row in cur.fetchall()]
+
+    key = ("filter", where, tuple(params), direction, int(limit), int(offset))
+    depends_on = ("ratings",)
+    if "r.like_count" in where or "r.vote_up_count" in where:
+        depends_on += ("rating_counters",)
+    return _cached(key, depends_on, compute), []
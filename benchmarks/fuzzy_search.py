@@ -0,0 +1,152 @@
+"""
+Benchmarks typo-tolerant search over usernames and rated subjects.
+
+Compares, for queries with one or two typos:
+- like:       the substring LIKE match search used before (search_rated_subjects
+              for short queries, LIKE on user_info.username)
+- scan:       Levenshtein against every name in Python (no candidate index)
+- fuzzy:      trigram FTS candidates + edit-distance re-ranking (backend.search)
+
+Reports the best-of latency per query and how often the intended name is the
+top result.
+
+Usage:
+    python -m benchmarks.fuzzy_search --users 20000 --subjects 20000 --queries 200
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+_SYLLABLES = ["ka", "len", "dri", "mo", "ra", "tal", "vin", "so", "pe", "lu", "ber", "fly", "ny", "qua"]
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def _typo(rng: random.Random, text: str) -> str:
+    for _ in range(rng.randint(1, 2)):
+        i = rng.randrange(len(text))
+        op = rng.choice(["swap", "drop", "replace"])
+        if op == "swap" and i < len(text) - 1:
+            text = text[:i] + text[i + 1] + text[i] + text[i + 2 :]
+        elif op == "drop" and len(text) > 4:
+            text = text[:i] + text[i + 1 :]
+        else:
+            text = text[:i] + rng.choice(string.ascii_lowercase) + text[i + 1 :]
+    return text
+
+
+def _seed(db_path: str, n_users: int, n_subjects: int) -> tuple[list[str], list[str]]:
+    rng = random.Random(11)
+    usernames = list(dict.fromkeys(f"{_word(rng)}_{_word(rng)}" for _ in range(n_users)))
+    subjects = list(dict.fromkeys(f"{_word(rng)} {_word(rng)}" for _ in range(n_subjects)))
+
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT INTO user_info (username) VALUES (?)", [(u,) for u in usernames])
+    conn.executemany(
+        """
+        INSERT INTO ratings (rating_type, rating_name, content_info_artist, user)
+        VALUES ('Album', ?, 'Bench Artist', 'bench')
+        """,
+        [(s,) for s in subjects],
+    )
+    conn.commit()
+    conn.close()
+    return usernames, subjects
+
+
+def _like_users(db_path: str, query: str) -> list[str]:
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        "SELECT username FROM user_info WHERE username LIKE ? COLLATE NOCASE LIMIT 10",
+        (f"%{query}%",),
+    ).fetchall()
+    conn.close()
+    return [r[0] for r in rows]
+
+
+def _scan(names: list[str], query: str) -> list[str]:
+    from backend.search import _fuzzy_score
+
+    scored = sorted(((_fuzzy_score(query, n), n) for n in names), reverse=True)
+    return [n for score, n in scored[:10] if score > 0]
+
+
+def _measure(fn, cases: list[tuple[str, str]], repeat: int) -> tuple[float, float]:
+    """Returns (best mean ms per query, top-1 accuracy)."""
+    best = float("inf")
+    hits = 0
+    for attempt in range(repeat):
+        hits_this = 0
+        start = time.perf_counter()
+        for query, expected in cases:
+            results = fn(query)
+            if results and results[0].lower() == expected.lower():
+                hits_this += 1
+        best = min(best, (time.perf_counter() - start) / len(cases))
+        hits = hits_this
+    return best * 1000, hits / len(cases)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--subjects", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    db_path = os.path.join(tmp, "bench.sqlite3")
+    os.environ["DB_PATH"] = db_path
+    # Measure the matching itself, not the result cache.
+    os.environ["SEARCH_CACHE_SIZE"] = "0"
+
+    from backend._db_setup import init_db
+    from backend.database import search_rated_subjects
+    from backend.search import _fuzzy_subjects, _fuzzy_users
+
+    init_db()
+    usernames, subjects = _seed(db_path, args.users, args.subjects)
+
+    rng = random.Random(3)
+    user_cases = [(_typo(rng, u), u) for u in rng.sample(usernames, args.queries)]
+    subject_cases = [(_typo(rng, s), s) for s in rng.sample(subjects, args.queries)]
+
+    runs = {
+        "users": {
+            "like": lambda q: _like_users(db_path, q),
+            "scan": lambda q: _scan(usernames, q),
+            "fuzzy": lambda q: [u["username"] for u, _ in _fuzzy_users(q, 10)],
+        },
+        "subjects": {
+            "like": lambda q: [i["name"] for i in search_rated_subjects(kind="album", q=q)],
+            "scan": lambda q: _scan(subjects, q),
+            "fuzzy": lambda q: [i["name"] for i in _fuzzy_subjects(q, kind="album")],
+        },
+    }
+    cases = {"users": user_cases, "subjects": subject_cases}
+
+    print(
+        f"users={len(usernames)} subjects={len(subjects)} "
+        f"queries={args.queries} repeat={args.repeat} (best of)"
+    )
+    for target, fns in runs.items():
+        print(f"  {target}")
+        for name, fn in fns.items():
+            ms, accuracy = _measure(fn, cases[target], args.repeat)
+            print(f"    {name:<6} {ms:9.2f} ms/query   top-1 {accuracy:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Benchmarks cover-art resolution for recording MBIDs against a local stand-in
+for MusicBrainz and the Cover Art Archive.
+
+Compares:
+- serial:  the previous strategy (recording lookup with inc=releases, then per
+           release: CAA release, MB release lookup for its release group, CAA
+           release group, one after another)
+- planned: _cover_art_url_for_recording (release groups come back with the
+           recording lookup; CAA candidates are probed concurrently and the
+           first hit wins)
+
+Each scenario is a recording with five releases over two release groups:
+- release:  the first release has a cover
+- group:    no release covers, the first release group has one
+- missing:  no cover anywhere
+
+The stand-in answers every request after --latency seconds. The response cache
+is disabled and both strategies go through the shared rate limiters (at their
+minimum interval), so the numbers are upstream calls and wall time of a cold
+lookup.
+
+Usage:
+    python -m benchmarks.recording_cover_art --latency 0.15 --repeat 3
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+_GROUPS = ["rg-a", "rg-b"]
+_RELEASES = [(f"rel-{i}", _GROUPS[0] if i < 3 else _GROUPS[1]) for i in range(5)]
+_SCENARIOS = {
+    "release": {"release": {"rel-0"}, "release-group": set()},
+    "group": {"release": set(), "release-group": {"rg-a"}},
+    "missing": {"release": set(), "release-group": set()},
+}
+
+
+class _StandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency: float):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.latency = latency
+        self.covers = _SCENARIOS["missing"]
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def count(self) -> None:
+        with self._lock:
+            self.calls += 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, status: int, payload=None) -> None:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        server = self.server
+        server.count()
+        time.sleep(server.latency)
+        parts = urlsplit(self.path).path.strip("/").split("/")
+        host, kind, mbid = parts[0], parts[-2], parts[-1]
+        if host == "musicbrainz.org" and kind == "recording":
+            releases = [{"id": rid, "release-group": {"id": rgid}} for rid, rgid in _RELEASES]
+            self._send(200, {"id": mbid, "releases": releases})
+        elif host == "musicbrainz.org" and kind == "release":
+            rgid = dict(_RELEASES).get(mbid)
+            self._send(200, {"id": mbid, "release-group": {"id": rgid}})
+        elif host == "coverartarchive.org" and mbid in server.covers.get(kind, ()):
+            image = f"http://covers.invalid/{kind}/{mbid}.jpg"
+            self._send(200, {"images": [{"front": True, "image": image, "thumbnails": {}}]})
+        else:
+            self._send(404)
+
+
+def _route_to(server: _StandIn) -> None:
+    """Sends get_json's https://<host>/... requests to the stand-in instead."""
+    import requests
+
+    from backend import external
+
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    session = requests.Session()
+    real_get = session.get
+
+    def get(url, **kwargs):
+        parts = urlsplit(url)
+        return real_get(f"{base}/{parts.netloc}{parts.path}", **kwargs)
+
+    session.get = get
+    external._session_for = lambda url: session
+
+
+def _serial(recording_mbid: str) -> str | None:
+    from backend.external import get_json
+    from backend.routes import _cover_art_url_for_release, _cover_art_url_for_release_group
+
+    url = f"https://musicbrainz.org/ws/2/recording/{recording_mbid}"
+    status, data = get_json(
+        "mb_lookup", url, params={"fmt": "json", "inc": "releases"}, limiter="musicbrainz"
+    )
+    if status != 200 or data is None:
+        return None
+    for rel in (data.get("releases") or [])[:5]:
+        release_id = rel.get("id")
+        cover = _cover_art_url_for_release(release_id)
+        if cover:
+            return cover
+        status, data = get_json(
+            "mb_lookup",
+            f"https://musicbrainz.org/ws/2/release/{release_id}",
+            params={"fmt": "json", "inc": "release-groups"},
+            limiter="musicbrainz",
+        )
+        rgid = ((data or {}).get("release-group") or {}).get("id")
+        if rgid:
+            cover = _cover_art_url_for_release_group(rgid)
+            if cover:
+                return cover
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.15)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ["DB_PATH"] = os.path.join(tmp, "bench.sqlite3")
+    os.environ["EXTERNAL_CACHE_PATH"] = os.path.join(tmp, "external_cache.sqlite3")
+    # Measure upstream calls, not the response cache.
+    os.environ["EXTERNAL_CACHE_MAX_ENTRIES"] = "0"
+    os.environ["MUSICBRAINZ_MIN_INTERVAL_SECONDS"] = "0.2"
+    os.environ["COVERART_MIN_INTERVAL_SECONDS"] = "0.2"
+
+    from backend.routes import _cover_art_url_for_recording
+
+    server = _StandIn(args.latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _route_to(server)
+
+    strategies = {"serial": _serial, "planned": _cover_art_url_for_recording}
+    print(f"latency={args.latency}s repeat={args.repeat} (best of)")
+    for scenario, covers in _SCENARIOS.items():
+        server.covers = covers
+        print(f"  {scenario}")
+        for name, fn in strategies.items():
+            best = float("inf")
+            calls = 0
+            for i in range(args.repeat):
+                before = server.calls
+                start = time.perf_counter()
+                fn(f"rec-{scenario}-{name}-{i}")
+                best = min(best, time.perf_counter() - start)
+                calls = server.calls - before
+            print(f"    {name:<8} {calls:3d} calls {best * 1000:9.1f} ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
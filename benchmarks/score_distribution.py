@@ -0,0 +1,142 @@
+"""
+Benchmarks subject score analytics on a large synthetic subject.
+
+Compares:
+- sql_avg:   get_subject_overall_summary (one SQL AVG per category)
+- py_loop:   the same distribution stats computed with per-row Python loops
+- numpy:     get_subject_score_distribution (bulk column fetch + NumPy)
+
+Usage:
+    python -m benchmarks.score_distribution --ratings 100000 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _seed(db_path: str, n: int) -> None:
+    rng = random.Random(7)
+    conn = sqlite3.connect(db_path)
+    rows = []
+    for i in range(n):
+        scores = [str(rng.randint(1, 10)) for _ in range(5)]
+        rows.append(
+            (
+                "Album",
+                "Bench Album",
+                "Bench Artist",
+                *scores,
+                f"user{i % 500}",
+                "mb-bench" if i % 2 else None,
+            )
+        )
+    conn.executemany(
+        """
+        INSERT INTO ratings (
+            rating_type, rating_name, content_info_artist,
+            lyrics_rating, beat_rating, flow_rating, melody_rating, cohesive_rating,
+            user, mbid
+        )
+        VALUES (?,?,?,?,?,?,?,?,?,?)
+        """,
+        rows,
+    )
+    conn.commit()
+    conn.close()
+
+
+def _py_loop_distribution(db_path: str) -> dict:
+    # Baseline: the same statistics as get_subject_score_distribution, one row
+    # at a time in pure Python.
+    conn = sqlite3.connect(db_path)
+    cur = conn.execute(
+        """
+        SELECT lyrics_rating, beat_rating, flow_rating, melody_rating, cohesive_rating
+        FROM ratings
+        WHERE mbid = ? OR (rating_type = 'Album' AND rating_name = 'Bench Album')
+        """,
+        ("mb-bench",),
+    )
+    columns: list[list[float]] = [[] for _ in range(5)]
+    histograms = [[0] * 10 for _ in range(5)]
+    for row in cur:
+        for i, v in enumerate(row):
+            try:
+                f = float(v)
+            except (TypeError, ValueError):
+                continue
+            columns[i].append(f)
+            histograms[i][int(round(f)) - 1] += 1
+    conn.close()
+
+    out = []
+    for values, hist in zip(columns, histograms):
+        values.sort()
+        qs = statistics.quantiles(values, n=20, method="inclusive")
+        out.append(
+            {
+                "mean": statistics.fmean(values),
+                "std": statistics.pstdev(values),
+                "p10": qs[1],
+                "p50": qs[9],
+                "p90": qs[17],
+                "histogram": hist,
+            }
+        )
+    return {"columns": out}
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ratings", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    db_path = os.path.join(tmp, "bench.sqlite3")
+    os.environ["DB_PATH"] = db_path
+
+    from backend._db_setup import init_db
+    from backend.database import get_subject_overall_summary, get_subject_score_distribution
+
+    init_db()
+    _seed(db_path, args.ratings)
+
+    subject = {
+        "mbid": "mb-bench",
+        "rating_type": "Album",
+        "rating_name": "Bench Album",
+        "content_artist": "Bench Artist",
+    }
+
+    results = {
+        "sql_avg": _time(lambda: get_subject_overall_summary(**subject), args.repeat),
+        "py_loop": _time(lambda: _py_loop_distribution(db_path), args.repeat),
+        "numpy": _time(lambda: get_subject_score_distribution(**subject), args.repeat),
+    }
+
+    print(f"ratings={args.ratings} repeat={args.repeat} (best of)")
+    for name, seconds in results.items():
+        print(f"  {name:<8} {seconds * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
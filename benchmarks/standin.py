@@ -0,0 +1,332 @@
+"""
+Offline stand-in for MusicBrainz, the Cover Art Archive, Wikidata and
+Wikimedia Commons, so external lookups can be exercised and load-tested
+without the network.
+
+One server answers all four services under path prefixes. Point the app at
+it with the env vars printed on startup:
+
+    MUSICBRAINZ_BASE_URL=http://127.0.0.1:8099/musicbrainz
+    COVERART_BASE_URL=http://127.0.0.1:8099/coverart
+    WIKIDATA_BASE_URL=http://127.0.0.1:8099/wikidata
+    COMMONS_BASE_URL=http://127.0.0.1:8099/commons
+
+Responses come from fixtures (--fixtures, one JSON file per request) when one
+matches, and are otherwise synthesized deterministically from the request
+(search hits, recordings with releases, cover art listings, tiny images). With
+--record, unmatched requests are fetched from the real service once and saved
+as fixtures, with upstream URLs in the body rewritten to point here.
+
+Latency and failures can be injected: --latency/--jitter delay every
+response, --error-rate answers 503, --slow-rate holds a response for
+--slow-seconds (past the app's timeouts), and --cover-miss-rate controls how
+often synthesized cover art is missing. GET /_stats returns request counts.
+
+Usage:
+    python -m benchmarks.standin --port 8099 --latency 0.15 --error-rate 0.05
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+UPSTREAMS = {
+    "musicbrainz": "https://musicbrainz.org",
+    "coverart": "https://coverartarchive.org",
+    "wikidata": "https://www.wikidata.org",
+    "commons": "https://commons.wikimedia.org",
+}
+ENV_NAMES = {
+    "musicbrainz": "MUSICBRAINZ_BASE_URL",
+    "coverart": "COVERART_BASE_URL",
+    "wikidata": "WIKIDATA_BASE_URL",
+    "commons": "COMMONS_BASE_URL",
+}
+
+# Smallest valid GIF; enough for the artwork mirror and <img> tags.
+_PIXEL = base64.b64decode("R0lGODlhAQABAIAAAP///wAAACH5BAEAAAAALAAAAAABAAEAAAICRAEAOw==")
+
+
+def _fixture_key(service: str, path: str, query: dict) -> str:
+    raw = f"{service} {path}?{urlencode(sorted(query.items()))}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _mbid(*parts) -> str:
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, "/".join(str(p) for p in parts)))
+
+
+def _fraction(*parts) -> float:
+    digest = hashlib.sha1("/".join(str(p) for p in parts).encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") / 2**32
+
+
+class StandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str, port: int, args: argparse.Namespace):
+        super().__init__((host, port), _Handler)
+        self.args = args
+        self.base = f"http://{host}:{self.server_address[1]}"
+        self.fixtures_dir = Path(args.fixtures) if args.fixtures else None
+        self.fixtures: dict[str, dict] = {}
+        if self.fixtures_dir and self.fixtures_dir.is_dir():
+            for path in self.fixtures_dir.glob("*.json"):
+                self.fixtures[path.stem] = json.loads(path.read_text(encoding="utf-8"))
+        self._rng = random.Random(args.seed)
+        self._lock = threading.Lock()
+        # Held across each recording fetch and the pause after it, so handler
+        # threads record one request at a time.
+        self._record_lock = threading.Lock()
+        self.stats: dict[str, dict[str, int]] = {}
+
+    def roll(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    def count(self, service: str, outcome: str) -> None:
+        with self._lock:
+            counters = self.stats.setdefault(service, {})
+            counters[outcome] = counters.get(outcome, 0) + 1
+
+    def env(self) -> dict[str, str]:
+        return {ENV_NAMES[s]: f"{self.base}/{s}" for s in UPSTREAMS}
+
+    # Synthesized responses ------------------------------------------------
+
+    def synthesize(self, service: str, path: str, query: dict):
+        parts = [p for p in path.split("/") if p]
+        if service == "musicbrainz" and len(parts) >= 3 and parts[:2] == ["ws", "2"]:
+            entity = parts[2]
+            if len(parts) == 3:
+                return 200, "application/json", self._mb_search(entity, query)
+            return 200, "application/json", self._mb_lookup(entity, parts[3], query)
+        if service == "coverart" and len(parts) == 2:
+            kind, mbid = parts
+            if _fraction("cover", kind, mbid) < self.args.cover_miss_rate:
+                return 404, "application/json", None
+            return 200, "application/json", self._caa_listing(kind, mbid)
+        if service == "coverart" and len(parts) == 3:
+            return 200, "image/gif", _PIXEL
+        if service == "wikidata" and parts[-1].endswith(".json"):
+            qid = parts[-1][: -len(".json")]
+            claim = {"mainsnak": {"datavalue": {"value": f"{qid} portrait.jpg"}}}
+            return 200, "application/json", {"entities": {qid: {"claims": {"P18": [claim]}}}}
+        if service == "commons" and "Special:FilePath" in parts:
+            return 200, "image/gif", _PIXEL
+        return 404, "application/json", None
+
+    def _mb_search(self, entity: str, query: dict) -> dict:
+        q = query.get("query", "")
+        key = {"artist": "artists", "release-group": "release-groups", "recording": "recordings"}
+        title_words, artist_words = [], []
+        for token in q.replace('"', " ").split():
+            if token in {"AND", "OR"}:
+                continue
+            field, _, value = token.strip("()").rpartition(":")
+            (artist_words if field == "artist" else title_words).append(value.strip("*"))
+        name = " ".join(w for w in title_words if w) or "Untitled"
+        # Fielded queries miss a share of the time, like partial words on the
+        # real search, so fallback variants get exercised.
+        if ":" in q and _fraction("miss", entity, q) < self.args.search_miss_rate:
+            return {"count": 0, key.get(entity, "items"): []}
+        limit = int(query.get("limit") or 8)
+        items = []
+        # The top hit echoes the query, so exact-match callers find something.
+        for i in range(min(limit, 5)):
+            mbid = _mbid("search", entity, name.lower(), i)
+            title = name if i == 0 else f"{name} {i}"
+            artist = " ".join(artist_words) if i == 0 and artist_words else f"Artist {i}"
+            credit = [{"name": artist, "joinphrase": "", "artist": {"name": artist}}]
+            if entity == "artist":
+                items.append({"id": mbid, "name": title, "score": 100 - i,
+                              "life-span": {"begin": f"{1990 + i}"}})
+            elif entity == "release-group":
+                items.append({"id": mbid, "title": title, "score": 100 - i,
+                              "artist-credit": credit, "first-release-date": f"{2000 + i}-01-01",
+                              "primary-type": "Album"})
+            else:
+                items.append({"id": mbid, "title": title, "score": 100 - i,
+                              "artist-credit": credit, "first-release-date": f"{2010 + i}-01-01"})
+        return {"count": len(items), key.get(entity, "items"): items}
+
+    def _mb_lookup(self, entity: str, mbid: str, query: dict) -> dict:
+        inc = query.get("inc", "")
+        if entity == "recording":
+            releases = []
+            for i in range(3):
+                release = {"id": _mbid("release", mbid, i)}
+                if "release-groups" in inc:
+                    release["release-group"] = {"id": _mbid("release-group", mbid, i // 2)}
+                releases.append(release)
+            return {"id": mbid, "releases": releases if "releases" in inc else []}
+        if entity == "release":
+            return {"id": mbid, "release-group": {"id": _mbid("release-group", mbid, 0)}}
+        if entity == "artist":
+            qid = f"Q{int(_fraction('qid', mbid) * 10**7) + 1}"
+            relations = [{"type": "wikidata", "url": {"resource": f"https://www.wikidata.org/wiki/{qid}"}}]
+            return {"id": mbid, "relations": relations if "url-rels" in inc else []}
+        return {"id": mbid}
+
+    def _caa_listing(self, kind: str, mbid: str) -> dict:
+        image_base = f"{self.base}/coverart/{kind}/{mbid}/1"
+        thumbs = {size: f"{image_base}-{size}.jpg" for size in ("250", "500", "1200")}
+        return {"images": [{"front": True, "image": f"{image_base}.jpg", "thumbnails": thumbs}]}
+
+    # Recording ------------------------------------------------------------
+
+    def record(self, service: str, path: str, query: dict, key: str):
+        # One request at a time, at most one per second, each key once:
+        # another thread may have recorded this one while we waited.
+        with self._record_lock:
+            with self._lock:
+                fixture = self.fixtures.get(key)
+            if fixture is not None:
+                return fixture
+            return self._record(service, path, query, key)
+
+    def _record(self, service: str, path: str, query: dict, key: str):
+        import requests
+
+        url = f"{UPSTREAMS[service]}{path}"
+        resp = requests.get(
+            url,
+            params=query,
+            timeout=20,
+            headers={"User-Agent": self.args.user_agent},
+        )
+        content_type = (resp.headers.get("Content-Type") or "").split(";")[0].strip()
+        fixture = {
+            "service": service,
+            "path": path,
+            "query": query,
+            "status": resp.status_code,
+            "content_type": content_type,
+        }
+        if content_type.endswith("json"):
+            text = resp.text
+            for name, upstream in UPSTREAMS.items():
+                for root in (upstream, upstream.replace("https://", "http://")):
+                    text = text.replace(root, f"{self.base}/{name}")
+            fixture["body"] = json.loads(text) if text else None
+        else:
+            fixture["body_b64"] = base64.b64encode(resp.content).decode("ascii")
+        with self._lock:
+            self.fixtures[key] = fixture
+        if self.fixtures_dir:
+            self.fixtures_dir.mkdir(parents=True, exist_ok=True)
+            (self.fixtures_dir / f"{key}.json").write_text(json.dumps(fixture, indent=1), encoding="utf-8")
+        # Stay polite to the real services while recording.
+        time.sleep(1.0)
+        return fixture
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, status: int, content_type: str, body) -> None:
+        if body is None:
+            payload = b""
+        elif isinstance(body, bytes):
+            payload = body
+        else:
+            payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self) -> None:
+        server: StandIn = self.server
+        parts = urlsplit(self.path)
+        if parts.path == "/_stats":
+            self._send(200, "application/json", server.stats)
+            return
+        service, _, rest = parts.path.lstrip("/").partition("/")
+        if service not in UPSTREAMS:
+            self._send(404, "application/json", None)
+            return
+        path = "/" + rest
+        query = dict(parse_qsl(parts.query))
+        args = server.args
+
+        delay = max(0.0, args.latency + (server.roll() * 2 - 1) * args.jitter)
+        if server.roll() < args.slow_rate:
+            delay = args.slow_seconds
+        time.sleep(delay)
+        if server.roll() < args.error_rate:
+            server.count(service, "injected_errors")
+            self._send(503, "application/json", {"error": "injected"})
+            return
+
+        key = _fixture_key(service, path, query)
+        fixture = server.fixtures.get(key)
+        if fixture is None and args.record:
+            fixture = server.record(service, path, query, key)
+        if fixture is not None:
+            server.count(service, "fixture")
+            body = fixture.get("body")
+            if "body_b64" in fixture:
+                body = base64.b64decode(fixture["body_b64"])
+            self._send(int(fixture["status"]), fixture.get("content_type") or "application/json", body)
+            return
+        server.count(service, "synthesized")
+        self._send(*server.synthesize(service, path, query))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--fixtures", default=str(Path(__file__).resolve().parent / "fixtures"))
+    parser.add_argument("--record", action="store_true")
+    parser.add_argument("--user-agent", default="RealTop-standin/1.0 (fixture recording)")
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-seconds", type=float, default=15.0)
+    parser.add_argument("--cover-miss-rate", type=float, default=0.3)
+    parser.add_argument("--search-miss-rate", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=7)
+    return parser
+
+
+def _server(argv: list[str] | None) -> StandIn:
+    args = build_parser().parse_args(argv)
+    return StandIn(args.host, args.port, args)
+
+
+def start(argv: list[str] | None = None) -> StandIn:
+    """Starts a stand-in on a background thread (--port 0 picks a free port)."""
+    server = _server(argv)
+    threading.Thread(target=server.serve_forever, name="standin", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    server = _server(sys.argv[1:])
+    for name, value in server.env().items():
+        print(f"export {name}={value}")
+    print(f"# {len(server.fixtures)} fixtures; stats at {server.base}/_stats", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()